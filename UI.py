@@ -1,12 +1,22 @@
-import os
-from typing import List, Tuple
+import datetime
+from typing import List, Optional, Tuple
 from wordleEngine import *
 from users import *
+from solver import Solver
+from wordBankWatcher import WordBankWatcher
+from screen import Screen
+from keyInput import KeyReader, KeyboardState, ENTER, BACKSPACE, TAB, KEYBOARD_ROWS
+from instrumentation import timed
 
 class UI:
     def __init__(self) -> None:
-        self.wordleEngine = WordleEngine()
+        self.wordleEngine = WordleEngine() # reads nothing yet, the first screen shows straight away
+        self.wordleEngine.prefetch() # word sets and prefix indexes are loaded in the background while the user is in the menus
+        self.bankWatcher = WordBankWatcher(self.wordleEngine) # picks up words other processes add to the bank while we play
+        self.bankWatcher.start()
         self.users = Users()
+        self.screen = Screen() # only the lines that changed since the last screen are redrawn
+        self.keyReader = KeyReader() if KeyReader.supported() else None # guesses are read key by key when stdin is a terminal
 
 
     def gameMenu(self) -> None:
@@ -18,14 +28,15 @@ class UI:
             if hasUserQuit:
                 continue # user pressed 'q'
             
-            letterCount, guessCount = self.__getGameSettings()
+            letterCount, guessCount, difficulty = self.__getGameSettings()
             try:
-                secret = self.wordleEngine.getWord(letterCount) # get random word from bank
+                secret = self.wordleEngine.getWord(letterCount, userName, difficulty=difficulty) # get random word from bank, no repeats for this user until every word was played
                 hasUserQuit = self.__startGameMenu(secret, letterCount, guessCount, userName)
             except NoWordExists:
                 self.__printScreen(
                     'No words currently are being stored for this Length\nPlease try again later', ''
                 )
+                self.users.close()
                 return
 
         self.__printScreen(
@@ -33,9 +44,11 @@ class UI:
             'Catch you next time... 👋😄\n',
             ''
         )
+        self.users.close()
 
     def __loginMenu(self) -> str:
         '''Allows user to login or create new user, either way the username of logged in account is returned'''
+        self.users.refresh() # users made in other game windows since this one started
         userDict = self.users.usersDict
 
         option = ''
@@ -74,14 +87,15 @@ class UI:
 
     def __displayMainScreen(self, name: str) -> bool:
         '''Main menu allows user to start game, or navigate menu, true is returned if user quits, else true'''
-        highScore = round(self.users.usersDict[name].maxScore, 3)
         userChoice = 'h'
         #Color codes
         GREEN = "\033[92m"
         YELLOW = "\033[93m"
         RESET = "\033[0m"
 
-        while userChoice.lower() in ['h', 'w']: # keep asking the user for a option while he decides to look at history or add a word
+        while userChoice.lower() in ['h', 'w', 'l', 'd', 's']: # keep asking the user for a option while he decides to look at history, stats, the leaderboard, add a word or play the daily challenge
+            self.users.refresh() # games played in other windows count towards the scores and the leaderboard
+            highScore = round(self.users.usersDict[name].maxScore, 3)
             self.__printScreen(                 # this is done so that after user returns from either menu they are still at the main menu
                 f"""
     🎉 Welcome to Wordle, {name}!
@@ -91,7 +105,10 @@ class UI:
     ✅ Feedback:  {GREEN}C{RESET} = correct | {YELLOW}c{RESET} = misplaced | - = wrong
     📌 Options:
         [Enter]  ▶️  Start Game
+        [D]      📅  Daily Challenge
         [H]      📜  Game History
+        [S]      📊  Statistics
+        [L]      🏅  Leaderboard
         [W]      ➕  Add Word to Word Bank
         [Q]      🚪  Quit""", "Your choice: "
             )
@@ -99,25 +116,23 @@ class UI:
             userChoice = input().strip()
             if userChoice.lower() == 'h':
                 self.__showGameHistory(name) # user decides to look at game history menu
+            elif userChoice.lower() == 's':
+                self.__showStats(name) # user decides to look at their statistics
+            elif userChoice.lower() == 'l':
+                self.__showLeaderboard(name) # user decides to look at the best players
             elif userChoice.lower() == 'w':
                 self.__addWordToWordBank() # user decides to look add a new word
+            elif userChoice.lower() == 'd':
+                if self.__playDailyChallenge(name): # user decides to play today's challenge and quit afterwards
+                    return True
 
         return True if userChoice.lower() == 'q' else False
 
     # --- Game Settings & Session ---
-    def __getGameSettings(self) -> Tuple[int, int]:
-        '''Asks user for both word length and the letter count of the game, a tuple is returned with both (int(wordLength, int(guessCount))'''
-        
-        validWordLength = False
-        errMessage = ''
-        while not validWordLength: # ask user fot a word length until a valid word length is entered
-            self.__printScreen('\n🎲 Set word length (3–8): 🎯\n', '👉 Your length: ', errMessage)
-            userWordLength = input()
-            if self.wordleEngine.validateWordLength(userWordLength):
-                validWordLength = True
-                errMessage = ''
-            else:
-                errMessage = '⚠️ Please enter a number between 3 and 8\n'
+    def __getGameSettings(self) -> Tuple[int, int, Optional[str]]:
+        '''Asks user for the word length, the guess count and the difficulty of the game, a tuple is returned with all three
+        (int(wordLength), int(guessCount), difficulty), difficulty is None when any word will do'''
+        wordLength = self.__getWordLength()
 
         validGuessCount = False
         errMessage = ''
@@ -130,22 +145,96 @@ class UI:
             else:
                 errMessage = '⚠️ Please enter a number between 1 and 10\n'
 
-        return (int(userWordLength), int(userGuessCount))
+        return (wordLength, int(userGuessCount), self.__getDifficulty())
+
+    def __getDifficulty(self) -> Optional[str]:
+        '''Asks user for the difficulty of the secret word, None is returned for any word'''
+        choices = {'': None, '1': 'easy', '2': 'medium', '3': 'hard'}
+        errMessage = ''
+        while True: # ask user for a difficulty until a valid one is entered
+            self.__printScreen('\n🧠 Set difficulty: [1] Easy  [2] Medium  [3] Hard  [Enter] Any 🎲\n', '👉 Your difficulty: ', errMessage)
+            userDifficulty = input().strip().lower()
+            if userDifficulty in choices:
+                return choices[userDifficulty]
+            if userDifficulty in choices.values():
+                return userDifficulty
+            errMessage = '⚠️ Please enter 1, 2, 3 or press Enter\n'
+
+    def __getWordLength(self) -> int:
+        '''Asks user for the word length of a game until a valid one is entered, the length is returned'''
+        validWordLength = False
+        errMessage = ''
+        while not validWordLength: # ask user fot a word length until a valid word length is entered
+            self.__printScreen('\n🎲 Set word length (3–8): 🎯\n', '👉 Your length: ', errMessage)
+            userWordLength = input()
+            if self.wordleEngine.validateWordLength(userWordLength):
+                validWordLength = True
+                errMessage = ''
+            else:
+                errMessage = '⚠️ Please enter a number between 3 and 8\n'
+
+        return int(userWordLength)
+
+    def __playDailyChallenge(self, name: str) -> bool:
+        '''Plays today's challenge of a word length, every player gets the same word and one try per day.
+        If the user already played it today's leaderboard is shown instead. true is returned if user quits else false'''
+        DAILY_GUESSES = 6
+        wordLength = self.__getWordLength()
+        today = datetime.date.today()
+        day = today.isoformat()
+
+        if self.users.leaderboard.hasPlayed(name, wordLength, day):
+            self.__showDailyLeaderboard(name, wordLength, day)
+            return False
+        try:
+            secret = self.wordleEngine.getWord(wordLength, day=today) # the same word for everyone today
+        except NoWordExists:
+            self.__printScreen('\nNo words currently are being stored for this Length\n', 'Press enter to continue: ')
+            input()
+            return False
+        return self.__startGameMenu(secret, wordLength, DAILY_GUESSES, name, daily=day)
+
+    def __showDailyLeaderboard(self, name: str, wordLength: int, day: str) -> None:
+        '''Shows the top 10 players of one day's challenge of a word length and where the user ranks, nothing is returned'''
+        leaderboard = self.users.leaderboard
+
+        lines = [f'📅 DAILY CHALLENGE {day} - {wordLength} letters 📅\n', 'You already played this one today! Top 10:']
+        for position, (player, score) in enumerate(leaderboard.top(10, wordLength, day), 1):
+            lines.append(f'   {position:>2}. {player:<20} {round(score, 3)}')
+        rank = leaderboard.rank(name, wordLength, day)
+        lines.append(f'\nYour rank: {rank if rank else "unranked"}\nCome back tomorrow for a new word!')
+
+        self.__printScreen('\n'.join(lines), 'Press enter to continue: ')
+        input()
 
-    def __startGameMenu(self, secret: str, lettersCount: int, guessesAllowed: int, name: str) -> bool:
-        '''plays the wordle game, true is returned if user quits else false'''
+    def __startGameMenu(self, secret: str, lettersCount: int, guessesAllowed: int, name: str, daily: Optional[str] = None) -> bool:
+        '''plays the wordle game, true is returned if user quits else false. daily is the date when the game is a daily challenge'''
         isWinner = False
         guessScore = 0
         errMessage = ''
         guesses: List[Tuple[str, str]] = []
+        guessLines: List[str] = [] # one display line per guess, a new guess only adds its own line
+        keyboard = KeyboardState() # letter colours so far, every guess only updates its own letters
+        solver = None # only created once the user asks for a suggestion
         
+        self.wordleEngine.getTrie(lettersCount) # builds the prefix index now instead of on the first key press
+
         #main body that is printed
-        body = f'Welcome To Wordle {name}\nPlease guess a {lettersCount} letter word!'
+        body = f'Welcome To Wordle {name}\nPlease guess a {lettersCount} letter word! (type ? for a suggestion)'
         
         # keep playing game until either user wins or the guess score matches the total allowed guesses
         while not isWinner and guessScore != guessesAllowed:
-            self.__printScreen('\n\n' + body + '\n\n', f'{lettersCount}-letter word: ', errMessage)
-            userWord = input() # ask for a word
+            screenBody = '\n\n' + body + '\n\n' + '\n'.join(keyboard.lines())
+            userWord = self.__readGuess(screenBody, lettersCount, errMessage) # ask for a word
+
+            if userWord.strip() == '?': # suggest the guess that narrows down the possible secrets the most
+                if solver is None:
+                    solver = Solver(self.wordleEngine, lettersCount)
+                    for hint, word in guesses:
+                        solver.updateFromHint(hint, word)
+                suggestion = solver.suggest()
+                errMessage = f'💡 Try: {suggestion.upper()}\n' if suggestion else '💡 No word in the word bank fits these hints\n'
+                continue
             
             # if word is invalid then restart while loop
             try:
@@ -157,28 +246,79 @@ class UI:
                 continue             
 
             # get hint from engine based on guess, if the hint is a winning hint then while loop ends
-            hint = self.wordleEngine.generateHint(secret, userWord)
+            code = self.wordleEngine.generateFeedbackCode(secret, userWord)
+            hint = self.wordleEngine.renderHint(code, lettersCount) # the coloured string is only needed for display
             guesses.append((hint, userWord))
-            if self.wordleEngine.isWinner(hint, lettersCount):
+            guessLines.append(self.__guessLine(hint, userWord))
+            keyboard.update(userWord, code)
+            if solver is not None:
+                solver.update(userWord, code)
+            if self.wordleEngine.isWinningCode(code, lettersCount):
                 guessScore += 1
                 isWinner = True # declared as winner
                 continue
 
             errMessage = ''
             guessScore += 1
-            body = self.__generateGameBody(guesses, guessesAllowed) # update body for next round
+            body = self.__generateGameBody(guessLines, guessesAllowed) # update body for next round
 
         # after game is finished new record is stored and closing menu is displayed
-        self.users.addNewRecordToUser(name, lettersCount, guessesAllowed, guessScore, isWinner)
+        self.users.addNewRecordToUser(name, lettersCount, guessesAllowed, guessScore, isWinner, daily,
+                                      secret=secret, guessWords=[word for _, word in guesses]) # the words are kept for replays
         return self.__closeGameMenu(isWinner, guesses, secret, guessesAllowed)
 
-    def __generateGameBody(self, guesses: List[Tuple[str, str]], guessesAllowed) -> str:
-        '''Generate game body text with previous guesses and hints.'''
-        return f'GUESS COUNT {len(guesses)}/{guessesAllowed}\n' + '\n'.join([f'{guess[0]}       {guess[1].upper()}' for guess in guesses])
+    def __readGuess(self, body: str, lettersCount: int, errMessage: str) -> str:
+        '''Reads one guess. In a terminal every key press is shown right away, the letters turn red as soon as
+        no word starts with them and tab completes the word, otherwise the whole line is read with input(). The guess is returned'''
+        RED = '\033[91m'
+        RESET = '\033[0m'
+        prompt = f'{lettersCount}-letter word: '
+        if self.keyReader is None:
+            self.__printScreen(body, prompt, errMessage)
+            return input()
+
+        typed = ''
+        completions: List[str] = []
+        with self.keyReader:
+            self.__printScreen(body, prompt, errMessage)
+            while True:
+                event = self.keyReader.poll()
+                if event is None:
+                    continue
+                if event.key == ENTER:
+                    return typed
+                if event.key == '?' and not typed:
+                    return '?'
+                if event.key == BACKSPACE:
+                    typed = typed[:-1]
+                elif event.key == TAB and completions:
+                    typed = completions[0]
+                elif event.key.isalpha() and event.key.isascii() and len(typed) < lettersCount:
+                    typed += event.key.lower()
+                else:
+                    continue
+
+                completions = self.wordleEngine.completeWord(typed, lettersCount, 4) if 2 <= len(typed) < lettersCount else []
+                if typed and not self.wordleEngine.isValidPrefix(typed, lettersCount): # checked against the prefix index
+                    self.__printScreen(body, prompt + f'{RED}{typed.upper()}{RESET}', f'No {lettersCount} letter word starts with {typed.upper()}\n')
+                elif completions:
+                    self.__printScreen(body, prompt + typed.upper(), f'[Tab] {" ".join(completions).upper()}\n')
+                else:
+                    self.__printScreen(body, prompt + typed.upper(), errMessage)
+                self.keyReader.rendered(event)
+
+    def __generateGameBody(self, guessLines: List[str], guessesAllowed) -> str:
+        '''Generate game body text with the display lines of the previous guesses and hints.'''
+        return f'GUESS COUNT {len(guessLines)}/{guessesAllowed}\n' + '\n'.join(guessLines)
+
+    @staticmethod
+    def __guessLine(hint: str, guess: str) -> str:
+        '''display line of one guess and its hint'''
+        return f'{hint}       {guess.upper()}'
 
     def __closeGameMenu(self, didUserWin: bool, guesses: List[Tuple[str, str]], secret: str, guessesAllowed) -> bool:
         '''Shows closing menu after a game has been finished, true is returned if user quits, true if not'''
-        body = self.__generateGameBody(guesses, guessesAllowed)
+        body = self.__generateGameBody([self.__guessLine(hint, guess) for hint, guess in guesses], guessesAllowed)
 
         if didUserWin:
             body += f'\n\n🥳 Woohoo! You nailed it! 🎉\nYour score: {len(secret) ** 2 / len(guesses):.2f} 🚀'
@@ -191,15 +331,116 @@ class UI:
 
 
     def __showGameHistory(self, name: str) -> None:
-        '''Shows user his game history nothing is returned'''
-        
-        # body of all games
-        gameHistoryList = [
-            f"{game}: {round(points, 3)} points, {'win' if points > 0 else 'loss'}" 
-            for game, points in self.users.usersDict[name].scores.items()
+        '''Shows user his game history one page at a time, only the games on the page are read. nothing is returned'''
+        PAGE_SIZE = 15
+        gameCount = self.users.gameCount(name)
+        pageCount = max(1, -(-gameCount // PAGE_SIZE)) # ceiling division
+        page = pageCount - 1 # start on the newest games
+
+        userChoice = 'n'
+        while userChoice in ['n', 'p']: # keep turning pages until the user presses enter
+            start = page * PAGE_SIZE
+            pageStats = GameAggregate()
+            gameLines = []
+            for gameNumber, record, points in self.users.iterGames(name, start, start + PAGE_SIZE):
+                pageStats.add(record, points)
+                gameLines.append(f"game {gameNumber}: {round(points, 3)} points, {'win' if points > 0 else 'loss'}")
+
+            distribution = ' '.join(f'{guesses}:{count}' for guesses, count in sorted(pageStats.guessDistribution.items())) or '-'
+            body = (
+                f'GAME HISTORY   page {page + 1}/{pageCount}   ({gameCount} games)\n\n'
+                + '\n'.join(gameLines)
+                + f'\n\nThis page: win rate {pageStats.winRate() * 100:.0f}% | average score {pageStats.averageScore():.3f}'
+                + f'\nGuesses needed for wins: {distribution}'
+            )
+            self.__printScreen(body, '[N] next  [P] previous  [R<game>] replay  [Enter] back: ')
+            userChoice = input().strip().lower()
+            if userChoice == 'n':
+                page = min(page + 1, pageCount - 1)
+            elif userChoice == 'p':
+                page = max(page - 1, 0)
+            elif userChoice.startswith('r') and userChoice[1:].strip().isdigit():
+                self.__replayGame(name, int(userChoice[1:]))
+                userChoice = 'n' # back to the same page
+
+    def __replayGame(self, name: str, gameNumber: int) -> None:
+        '''Steps through a stored game one guess at a time, with the keyboard as it was after every guess. nothing is returned'''
+        game = self.users.getTranscript(name, gameNumber)
+        if game is None:
+            self.__printScreen(f'\nGame {gameNumber} has no transcript, only games played since transcripts were added can be replayed.\n', 'Press enter to continue: ')
+            input()
+            return
+
+        length = len(game["secret"])
+        step = 0
+        userChoice = ''
+        while userChoice != 'q':
+            keyboard = KeyboardState()
+            guessLines = []
+            for guess, code in zip(game["guesses"][:step], game["codes"][:step]):
+                keyboard.update(guess, code)
+                guessLines.append(self.__guessLine(self.wordleEngine.renderHint(code, length), guess))
+            daily = f'  (daily challenge {game["daily"]})' if game["daily"] else ''
+            lines = [f'REPLAY game {gameNumber}{daily}', '', self.__generateGameBody(guessLines, game["guessesAllowed"]), '']
+            if step == len(game["guesses"]):
+                lines.append(f'{"Won" if game["win"] else "Lost"}, the word was {game["secret"].upper()}')
+            lines.extend(keyboard.lines())
+            self.__printScreen('\n'.join(lines), '[Enter] next guess  [B] back a guess  [Q] done: ')
+            userChoice = input().strip().lower()
+            if userChoice == 'b':
+                step = max(step - 1, 0)
+            elif userChoice == '' and step < len(game["guesses"]):
+                step += 1
+            elif userChoice == '':
+                userChoice = 'q' # past the last guess
+
+    def __showStats(self, name: str) -> None:
+        '''Shows the user's win rate, streaks, guess distribution per word length and how often each letter they guessed
+        was in the word. The counters are kept up to date with every game so nothing is recounted. nothing is returned'''
+        stats = self.users.stats(name)
+        data = stats.toDict()
+        lines = [
+            '📊 STATISTICS 📊\n',
+            f'Games: {data["games"]}   Wins: {data["wins"]}   Win rate: {stats.winRate() * 100:.0f}%',
+            f'Current streak: {data["streak"]}   Best streak: {data["bestStreak"]}\n',
+            'Guesses needed per word length:',
         ]
-        gameHistoryStr = 'GAME HISTORY\n\n' + '\n'.join(gameHistoryList)
-        self.__printScreen(gameHistoryStr, 'Press enter to continue: ')
+        for length in range(3, 9):
+            counts = data["lengths"].get(str(length))
+            if not counts:
+                continue
+            distribution = ' '.join(f'{needed}:{count}' for needed, count in sorted(stats.guessDistribution(length).items())) or '-'
+            lines.append(f'   {length} letters: {counts["games"]:>4} games, {stats.winRate(length) * 100:3.0f}% won   {distribution}')
+
+        lines.append('\nHow often your guessed letters were in the word:')
+        for row in KEYBOARD_ROWS:
+            cells = []
+            for letter in row:
+                accuracy = stats.letterAccuracy(letter)
+                cells.append(letter.upper() + ('   -' if accuracy is None else f'{accuracy * 100:3.0f}%'))
+            lines.append('   ' + '  '.join(cells))
+
+        self.__printScreen('\n'.join(lines), 'Press enter to continue: ')
+        input()
+
+    def __showLeaderboard(self, name: str) -> None:
+        '''Shows the top 10 players overall, the leader of every word length and where the user ranks, nothing is returned'''
+        leaderboard = self.users.leaderboard
+
+        lines = ['🏅 LEADERBOARD 🏅\n', 'Top 10 overall:']
+        for position, (player, score) in enumerate(leaderboard.top(10), 1):
+            lines.append(f'   {position:>2}. {player:<20} {round(score, 3)}')
+        rank = leaderboard.rank(name)
+        lines.append(f'\nYour rank: {rank if rank else "unranked"}\n')
+
+        lines.append('Best per word length:')
+        for length in range(3, 9):
+            top = leaderboard.top(1, length)
+            rank = leaderboard.rank(name, length)
+            leader = f'{top[0][0]} ({round(top[0][1], 3)})' if top else 'nobody yet'
+            lines.append(f'   {length} letters: {leader:<30} you: {"#" + str(rank) if rank else "-"}')
+
+        self.__printScreen('\n'.join(lines), 'Press enter to continue: ')
         input()
 
     def __addWordToWordBank(self) -> None:
@@ -230,28 +471,23 @@ class UI:
         input()
         
 
-    # --- Utility Methods PRINTS screen and clears terminal ---
+    # --- Utility Methods PRINTS screen ---
+    @timed('ui.printScreen')
     def __printScreen(self, body: str, inputPrompt: str, errMessage: str = '') -> None:
-        '''Prints screen based on the body and input prompt entered. Additionaly there is a optional error message. nothing is returned'''
-        self.__clearScreen()
+        '''Prints screen based on the body and input prompt entered. Additionaly there is a optional error message. nothing is returned.
+        Only the lines that differ from the screen before are redrawn'''
         RED = '\033[91m'
         CYAN = '\033[96m'
         RESET = '\033[0m'
         
+        # every line sets its own colour so any one line can be redrawn on its own
         menu = f'''
 {RED}-----------------------------------------------------------------{RESET}
-{CYAN}             █───█ █▀▀█ █▀▀█ █▀▀▄ █── █▀▀ 
-             █▄█▄█ █──█ █▄▄▀ █──█ █── █▀▀ 
-             ─▀─▀─ ▀▀▀▀ ▀─▀▀ ▀▀▀─ ▀▀▀ ▀▀▀ 𝑷𝑨6 🎲{RESET}
+{CYAN}             █───█ █▀▀█ █▀▀█ █▀▀▄ █── █▀▀ {RESET}
+{CYAN}             █▄█▄█ █──█ █▄▄▀ █──█ █── █▀▀ {RESET}
+{CYAN}             ─▀─▀─ ▀▀▀▀ ▀─▀▀ ▀▀▀─ ▀▀▀ ▀▀▀ 𝑷𝑨6 🎲{RESET}
 {RED}-----------------------------------------------------------------{RESET}
 {body}
 {RED}-----------------------------------------------------------------{RESET}
 {errMessage + inputPrompt}'''
-        print(menu, end='')
-
-    @staticmethod
-    def __clearScreen() -> None:
-        try:
-            os.system('cls' if os.name == 'nt' else 'clear')
-        except Exception as e:
-            return e
\ No newline at end of file
+        self.screen.render(menu)
@@ -0,0 +1,122 @@
+'''Many game processes writing to one user store and one word bank at the same time. Checks that no record, user or
+word is lost and that every process ends up with the same merged view, and reports the throughput.
+
+    python -m benchmarks.benchConcurrency --processes 8 --games 400
+    python -m benchmarks.benchConcurrency --stores journal sqlite --processes 16'''
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+from benchmarks.syntheticData import writeWordBank
+from transcripts import TranscriptLog
+from users import Users, userNameExists
+from userStorage import openStore
+
+SHARED_USER = 'shared' # every process plays as this user too, so records of one user come from many processes
+
+
+def writer(directory: str, kind: str, index: int, games: int, words: int, start, results) -> None:
+    '''one game process: makes its user, plays games as itself and as the shared user, adds words to the bank'''
+    os.chdir(directory)
+    from wordleEngine import WordleEngine # imported here so the index is compiled in the test directory
+    engine = WordleEngine()
+    users = Users(openStore(kind))
+    name = f'player{index}'
+    for userName in (name, SHARED_USER):
+        try:
+            users.addNewUser(userName)
+        except userNameExists:
+            pass # the shared user was made by another process first
+    start.wait()
+
+    latencies = []
+    begin = time.perf_counter()
+    for game in range(games):
+        guessesNeeded = 1 + (index + game) % 6
+        player = name if game % 2 == 0 else SHARED_USER
+        gameStart = time.perf_counter()
+        users.addNewRecordToUser(player, 5, 6, guessesNeeded, game % 3 != 0, None, 'crane', ['slate'] * (guessesNeeded - 1) + ['crane'])
+        latencies.append(time.perf_counter() - gameStart)
+    for word in range(words):
+        engine.addNewWord(f'{chr(97 + index % 26)}{chr(97 + index // 26 % 26)}{chr(97 + word % 26)}{chr(97 + word // 26 % 26)}x')
+    elapsed = time.perf_counter() - begin
+
+    start.wait() # every process is done, the merged view should now be the same everywhere
+    users.refresh()
+    results.put({
+        "index": index, "elapsed": elapsed, "latencies": latencies,
+        "users": len(users.usersDict), "recordScore": users.recordScore, "sharedGames": users.gameCount(SHARED_USER),
+        "sharedStats": users.stats(SHARED_USER).games,
+    })
+    users.close()
+
+
+def run(kind: str, processes: int, games: int, words: int) -> bool:
+    '''runs the writers against a fresh store, prints the results, true iff nothing was lost'''
+    directory = tempfile.mkdtemp(prefix=f'wordleConcurrency{kind}')
+    bankWords = writeWordBank(os.path.join(directory, 'wordBankLarge.txt'), 5000)
+    context = multiprocessing.get_context('spawn') # fresh interpreters, nothing is shared but the files
+    start = context.Barrier(processes + 1)
+    results = context.Queue()
+    workers = [context.Process(target=writer, args=(directory, kind, index, games, words, start, results)) for index in range(processes)]
+    for worker in workers:
+        worker.start()
+    start.wait() # every process is set up, go
+    begin = time.perf_counter()
+    start.wait() # every process is done
+    wall = time.perf_counter() - begin
+    reports = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    os.chdir(directory)
+    users = Users(openStore(kind))
+    expected = processes * games
+    total = users.store.totalRecords()
+    perUser = {f'player{index}': users.gameCount(f'player{index}') for index in range(processes)}
+    with open('wordBankLarge.txt') as file:
+        bank = [line.strip() for line in file]
+    transcripts = sum(1 for _ in TranscriptLog().iterGames())
+    latencies = sorted(latency for report in reports for latency in report["latencies"])
+    views = {(report["users"], report["recordScore"], report["sharedGames"], report["sharedStats"]) for report in reports}
+
+    checks = {
+        "records": total == expected,
+        "per user": all(count == (games + 1) // 2 for count in perUser.values())
+                    and users.gameCount(SHARED_USER) == processes * (games // 2),
+        "transcripts": transcripts == expected,
+        "words": len(bank) == bankWords + processes * words and len(set(bank)) == len(bank),
+        "merged views": views == {(processes + 1, users.recordScore, processes * (games // 2), processes * (games // 2))},
+    }
+    print(f'{kind}: {processes} processes x {games} games')
+    print(f'   records            : {total:,d} of {expected:,d}, {expected - total:,d} lost')
+    print(f'   throughput         : {expected / wall:10,.0f} games/s ({wall:.2f} s wall)')
+    print(f'   addNewRecordToUser : {statistics.median(latencies) * 1000:8.2f} ms p50  {latencies[int(len(latencies) * 0.99)] * 1000:8.2f} ms p99')
+    print(f'   checks             : ' + ', '.join(f'{name} {"ok" if passed else "FAILED"}' for name, passed in checks.items()))
+    users.close()
+    return all(checks.values())
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Parallel writers on one user store and word bank')
+    parser.add_argument('--stores', nargs='+', default=['journal', 'sqlite', 'json'], choices=['journal', 'sqlite', 'json'])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--games', type=int, default=400, help='games per process, the json store gets a tenth')
+    parser.add_argument('--words', type=int, default=20, help='words every process adds to the bank')
+    args = parser.parse_args(argv)
+
+    home = os.getcwd()
+    passed = True
+    for kind in args.stores:
+        games = max(2, args.games // 10) if kind == 'json' else args.games # every json change rewrites the whole file
+        passed = run(kind, args.processes, games, args.words) and passed
+        os.chdir(home)
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
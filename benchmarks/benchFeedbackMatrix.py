@@ -0,0 +1,79 @@
+'''Size, build time and lookup speed of the feedback matrix, and how much faster the solver narrows its candidates with it.
+The matrices are built in a temp directory, the game's own matrix files are never touched.
+
+    python -m benchmarks.benchFeedbackMatrix --lengths 3 4 --workers 8'''
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import List, Optional
+from feedback import feedbackCode
+from feedbackMatrix import MAX_MATRIX_BYTES, FeedbackMatrix
+from solver import Solver
+from wordleEngine import WordleEngine
+
+
+def perCall(run, calls: int) -> float:
+    '''microseconds per call'''
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def narrow(engine: WordleEngine, length: int, words: List[str], games: List[tuple]) -> float:
+    '''milliseconds per game for a solver to take in three guesses of each game'''
+    start = time.perf_counter()
+    for secret, guesses in games:
+        solver = Solver(engine, length, words)
+        for guess in guesses:
+            solver.update(guess, feedbackCode(secret, guess))
+    return (time.perf_counter() - start) / len(games) * 1000
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Feedback matrix size, build time and solver speed up')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[3, 4], help='lengths to build, 5 takes minutes even on many cores')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    engine = WordleEngine()
+    print(f'matrix sizes (build refuses anything over {MAX_MATRIX_BYTES / 2 ** 20:,.0f} MiB)')
+    for length in range(3, 9):
+        words = engine.wordList(length)
+        size = FeedbackMatrix.sizeFor(words)
+        print(f'   {length} letters {len(words):8,d} words {size / 2 ** 20:10,.1f} MiB{"  too large" if size > MAX_MATRIX_BYTES else ""}')
+
+    directory = tempfile.mkdtemp(prefix='wordleMatrix')
+    rng = random.Random(5)
+    for length in args.lengths:
+        words = engine.wordList(length)
+        path = FeedbackMatrix.pathFor(length, directory)
+        start = time.perf_counter()
+        matrix = FeedbackMatrix.build(path, words, args.workers)
+        buildTime = time.perf_counter() - start
+        start = time.perf_counter()
+        FeedbackMatrix.load(path, words).close()
+        loadTime = time.perf_counter() - start
+
+        guess, secret = rng.choice(words), rng.choice(words)
+        games = [(rng.choice(words), [rng.choice(words) for _ in range(3)]) for _ in range(200)]
+        print(f'{length} letter words ({len(words)})')
+        print(f'   build ({args.workers} workers)    : {buildTime:10.2f} s')
+        print(f'   load (checksum, mmap): {loadTime * 1000:10.2f} ms')
+        print(f'   matrix.pattern       : {perCall(lambda: matrix.pattern(guess, secret), 100000):10.2f} us')
+        print(f'   feedbackCode         : {perCall(lambda: feedbackCode(secret, guess), 100000):10.2f} us')
+        engine.feedbackMatrices.pop(length, None)
+        withoutMatrix = narrow(engine, length, words, games)
+        engine.feedbackMatrices[length] = matrix
+        withMatrix = narrow(engine, length, words, games)
+        del engine.feedbackMatrices[length]
+        print(f'   solver, 3 guesses    : {withoutMatrix:10.2f} ms scored  {withMatrix:10.2f} ms with the matrix')
+        matrix.close()
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+import time
+import tracemalloc
+from hashMap import ChainedHashMap, HashMap
+
+
+def readWords(path: str = 'wordBankLarge.txt') -> list:
+    with open(path, 'r') as file:
+        return [line.strip().lower() for line in file if line.strip()]
+
+
+def measure(name: str, makeMap, words: list) -> None:
+    '''prints build time, memory held by the map, contains throughput and getRandomValue latency'''
+    tracemalloc.start()
+    start = time.perf_counter()
+    hashMap = makeMap()
+    for word in words:
+        hashMap.insert(word, word)
+    buildTime = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory() # words are shared with the caller so only the map itself is counted
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for word in words:
+        hashMap.contains(word)
+    containsTime = time.perf_counter() - start
+
+    draws = 1000
+    start = time.perf_counter()
+    for _ in range(draws):
+        hashMap.getRandomValue()
+    randomTime = time.perf_counter() - start
+
+    print(f'{name}')
+    print(f'   insert   : {len(words) / buildTime:12,.0f} words/s')
+    print(f'   contains : {len(words) / containsTime:12,.0f} lookups/s')
+    print(f'   random   : {randomTime / draws * 1e6:12.2f} us/call')
+    print(f'   memory   : {memory / 2 ** 20:12.2f} MiB')
+
+
+def main() -> None:
+    words = readWords()
+    print(f'{len(words)} words from wordBankLarge.txt\n')
+    measure('ChainedHashMap (linked list buckets)', ChainedHashMap, words)
+    measure('HashMap (open addressing)', HashMap, words)
+    measure('HashMap presized', lambda: HashMap(expectedItems=len(words)), words)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+import random
+import time
+from wordleEngine import WordleEngine
+
+
+def rate(name: str, calls: int, run) -> None:
+    start = time.perf_counter()
+    run()
+    print(f'   {name:<36} {calls / (time.perf_counter() - start):12,.0f} pairs/s')
+
+
+def main(pairs: int = 200000) -> None:
+    engine = WordleEngine(seed=7)
+    for length in (5, 8):
+        words = [engine.getWord(length) for _ in range(pairs)]
+        guess, secret = words[0], words[1]
+        print(f'{length} letter words')
+        rate('generateHint (coloured string)', pairs, lambda: [WordleEngine.generateHint(secret, w) for w in words])
+        rate('generateFeedbackCode', pairs, lambda: [WordleEngine.generateFeedbackCode(secret, w) for w in words])
+        rate('scoreGuessAgainstSecrets (batch)', pairs, lambda: WordleEngine.scoreGuessAgainstSecrets(guess, words))
+        rate('scoreGuessesAgainstSecret (batch)', pairs, lambda: WordleEngine.scoreGuessesAgainstSecret(words, secret))
+
+
+if __name__ == '__main__':
+    main()
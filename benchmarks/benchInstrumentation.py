@@ -0,0 +1,49 @@
+'''Overhead of the instrumentation timers on the hottest instrumented calls, off and on.
+
+    python -m benchmarks.benchInstrumentation'''
+import time
+import instrumentation
+from feedback import feedbackCode, renderFeedback
+from wordTrie import WordTrie
+from wordleEngine import WordleEngine
+
+
+def perCall(run, calls: int) -> float:
+    '''nanoseconds per call'''
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def generateHint(secret: str, guess: str) -> str:
+    return renderFeedback(feedbackCode(secret, guess), len(secret))
+
+
+def main(calls: int = 200000) -> None:
+    engine = WordleEngine()
+    words = engine.wordList(5)
+    trie = WordTrie(5, words)
+    secret, guess = words[0], words[len(words) // 2]
+    targets = {'generateHint': (generateHint, (secret, guess)), 'trie.contains': (trie.contains, (guess,))}
+
+    for name, (function, args) in targets.items():
+        instrumentation.ENABLED = False
+        off = instrumentation.timed(name)(function) # the function itself, nothing is wrapped when disabled
+        instrumentation.ENABLED = True
+        on = instrumentation.timed(name)(function)
+        plain = perCall(lambda: function(*args), calls)
+        print(f'{name}')
+        print(f'   plain      : {plain:8.0f} ns')
+        print(f'   timer off  : {perCall(lambda: off(*args), calls):8.0f} ns')
+        print(f'   timer on   : {perCall(lambda: on(*args), calls):8.0f} ns')
+    instrumentation.ENABLED = False
+    print(f'increment off : {perCall(lambda: instrumentation.increment("counter"), calls):8.0f} ns')
+    instrumentation.ENABLED = True
+    print(f'increment on  : {perCall(lambda: instrumentation.increment("counter"), calls):8.0f} ns')
+    print()
+    print(instrumentation.report())
+
+
+if __name__ == '__main__':
+    main()
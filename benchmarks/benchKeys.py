@@ -0,0 +1,56 @@
+'''Key press to render latency of the live guess input. Keys are typed into a pseudo terminal, read back with KeyReader,
+checked as a prefix against the word set and drawn with Screen (into memory), like UI does for every key.
+
+    python -m benchmarks.benchKeys'''
+import io
+import os
+import time
+from keyInput import KeyReader, KeyboardState, BACKSPACE
+from screen import Screen
+from wordleEngine import WordleEngine
+
+
+def main(words: int = 2000) -> None:
+    os.environ.setdefault('COLUMNS', '120')
+    os.environ.setdefault('LINES', '50')
+    engine = WordleEngine(seed=11)
+    keyboard = KeyboardState()
+    secret = engine.getWord(5)
+    master, slave = os.openpty()
+    terminal = os.fdopen(slave, 'r')
+    screen = Screen(io.StringIO())
+    body = 'GUESS COUNT 0/6\n\n' + '\n'.join(keyboard.lines())
+
+    latencies = []
+    reader = KeyReader(terminal)
+    with reader:
+        for _ in range(words):
+            word = engine.getWord(5)
+            typed = ''
+            for key in word + '\x7f':
+                os.write(master, key.encode())
+                event = reader.poll(1)
+                typed = typed[:-1] if event.key == BACKSPACE else typed + event.key
+                valid = not typed or engine.isValidPrefix(typed, 5)
+                screen.render(f'{body}\n{"" if valid else "no word starts with that"}\n5-letter word: {typed.upper()}')
+                reader.rendered(event)
+                latencies.append(reader.lastLatency)
+            keyboard.update(word, engine.generateFeedbackCode(secret, word))
+    terminal.close()
+    os.close(master)
+
+    latencies.sort()
+    print(f'{len(latencies)} key presses')
+    print(f'   average        : {reader.averageLatency() * 1000:8.3f} ms')
+    print(f'   p50            : {latencies[len(latencies) // 2] * 1000:8.3f} ms')
+    print(f'   p99            : {latencies[int(len(latencies) * 0.99)] * 1000:8.3f} ms')
+    print(f'   max            : {reader.maxLatency * 1000:8.3f} ms')
+
+    start = time.perf_counter()
+    for _ in range(100000):
+        keyboard.update(secret, engine.generateFeedbackCode(secret, secret))
+    print(f'   keyboard update: {(time.perf_counter() - start) / 100000 * 1e6:8.2f} us/guess')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from leaderboard import Leaderboard
+
+
+def main(records: int = 1000000, players: int = 100000) -> None:
+    os.chdir(tempfile.mkdtemp(prefix='wordleLeaderboard'))
+    rng = random.Random(1)
+    games = [(f'player{rng.randrange(players)}', {"wordLength": rng.randint(3, 8), "guesses": 6,
+              "guessesNeeded": rng.randint(1, 6), "win": rng.random() < 0.6}) for _ in range(records)]
+
+    leaderboard = Leaderboard(saveEvery=records + 1) # saving is measured on its own below
+    start = time.perf_counter()
+    for name, record in games:
+        leaderboard.addRecord(name, record)
+    addTime = time.perf_counter() - start
+    print(f'{records} records from {players} players')
+    print(f'   addRecord        : {addTime / records * 1e6:10.2f} us/record')
+
+    queries = 10000
+    names = [f'player{rng.randrange(players)}' for _ in range(queries)]
+    start = time.perf_counter()
+    for _ in range(queries):
+        leaderboard.top(10)
+    print(f'   top 10           : {(time.perf_counter() - start) / queries * 1e6:10.2f} us/query')
+    start = time.perf_counter()
+    for name in names:
+        leaderboard.rank(name)
+    print(f'   rank of a player : {(time.perf_counter() - start) / queries * 1e6:10.2f} us/query')
+    start = time.perf_counter()
+    for name in names:
+        leaderboard.rank(name, 5)
+    print(f'   rank, 5 letters  : {(time.perf_counter() - start) / queries * 1e6:10.2f} us/query')
+
+    start = time.perf_counter()
+    leaderboard.save()
+    print(f'   save             : {(time.perf_counter() - start) * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
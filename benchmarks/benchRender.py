@@ -0,0 +1,61 @@
+'''Frame time and bytes written per frame of the differential Screen against redrawing every frame in full,
+for the screens of a 10 guess game. Output goes to an in memory stream so only the rendering is measured.
+
+    python -m benchmarks.benchRender'''
+import io
+import os
+import shutil
+import subprocess
+import time
+from screen import CLEAR, Screen
+from wordleEngine import WordleEngine
+
+BANNER = '\n' + '\n'.join(['-' * 65, 'W O R D L E', 'P A 6', '-' * 65])
+
+
+def gameFrames(engine: WordleEngine, guessesAllowed: int = 10) -> list:
+    '''the screens a 5 letter game shows, one per guess'''
+    secret = engine.getWord(5)
+    lines = []
+    frames = []
+    for _ in range(guessesAllowed):
+        guess = engine.getWord(5)
+        lines.append(f'{engine.renderHint(engine.generateFeedbackCode(secret, guess), 5)}       {guess.upper()}')
+        body = f'GUESS COUNT {len(lines)}/{guessesAllowed}\n' + '\n'.join(lines)
+        frames.append(f'{BANNER}\n{body}\n{"-" * 65}\n5-letter word: ')
+    return frames
+
+
+def main(games: int = 2000) -> None:
+    os.environ.setdefault('COLUMNS', '120') # the stream is not a terminal, so the size comes from here
+    os.environ.setdefault('LINES', '50')
+    engine = WordleEngine(seed=3)
+    allFrames = [frame for _ in range(games) for frame in gameFrames(engine)]
+
+    fullStream = io.StringIO()
+    start = time.perf_counter()
+    for frame in allFrames:
+        fullStream.write(CLEAR + frame)
+        fullStream.flush()
+    fullTime = time.perf_counter() - start
+
+    stream = io.StringIO()
+    screen = Screen(stream)
+    for frame in allFrames:
+        screen.render(frame)
+
+    frames = len(allFrames)
+    print(f'{frames} frames')
+    print(f'   full redraw    : {fullTime / frames * 1e6:8.1f} us/frame {len(fullStream.getvalue().encode()) / frames:8.0f} bytes/frame')
+    print(f'   differential   : {screen.averageFrameTime() * 1e6:8.1f} us/frame {screen.bytesWritten / frames:8.0f} bytes/frame'
+          f'   (max {screen.maxFrameTime * 1e6:.1f} us, {screen.fullFrames} full frames)')
+
+    if shutil.which('clear'): # what every frame used to cost before anything was printed
+        start = time.perf_counter()
+        for _ in range(50):
+            subprocess.run(['clear'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        print(f'   clear process  : {(time.perf_counter() - start) / 50 * 1e6:8.1f} us/frame')
+
+
+if __name__ == '__main__':
+    main()
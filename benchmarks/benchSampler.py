@@ -0,0 +1,79 @@
+import time
+import tracemalloc
+from hashMap import ChainedHashMap
+from wordleEngine import WordleEngine
+from wordSampler import WordSampler
+
+
+def chiSquare(counts: list, draws: int) -> float:
+    '''Pearson's chi square statistic of the observed counts against a uniform distribution'''
+    expected = draws / len(counts)
+    return sum((count - expected) ** 2 / expected for count in counts)
+
+
+def uniformity(name: str, pickPosition, size: int, draws: int) -> None:
+    '''draws positions and compares the spread with chi square, for a uniform sampler the statistic is about
+    size - 1 give or take sqrt(2 * (size - 1))'''
+    counts = [0] * size
+    for _ in range(draws):
+        counts[pickPosition()] += 1
+    statistic = chiSquare(counts, draws)
+    degrees = size - 1
+    zScore = (statistic - degrees) / (2 * degrees) ** 0.5
+    verdict = 'uniform' if abs(zScore) < 4 else 'NOT uniform'
+    print(f'   {name:<22} chi2 = {statistic:12.1f}  (df {degrees}, z {zScore:+8.2f})  {verdict}')
+
+
+def latency(name: str, pick, calls: int) -> None:
+    start = time.perf_counter()
+    for _ in range(calls):
+        pick()
+    print(f'   {name:<22} {(time.perf_counter() - start) / calls * 1e6:10.2f} us/pick')
+
+
+def main() -> None:
+    engine = WordleEngine()
+    words = engine.wordDict[3] # the smallest length so every word gets drawn many times
+    positions = {words.valueAt(i): i for i in range(len(words))}
+    draws = len(words) * 200
+
+    chained = ChainedHashMap()
+    for i in range(len(words)):
+        chained.insert(words.valueAt(i), words.valueAt(i))
+
+    sampler = WordSampler(seed=1)
+    print(f'uniformity over the {len(words)} three letter words, {draws} draws')
+    uniformity('ChainedHashMap', lambda: positions[chained.getRandomValue()], len(words), draws)
+    uniformity('WordSampler.pick', lambda: positions[sampler.pick(words)], len(words), draws)
+
+    deckCounts = [0] * len(words)
+    for _ in range(draws):
+        deckCounts[positions[sampler.draw('player', words)]] += 1
+    print(f'   {"WordSampler.draw":<22} every word drawn exactly {draws // len(words)} times: {set(deckCounts) == {draws // len(words)}}')
+
+    seeded = [WordSampler(seed=42).pick(engine.wordDict[5]) for _ in range(2)]
+    print(f'   seeded draws repeat     {seeded[0] == seeded[1]}')
+
+    print('\nlatency on the 8 letter words')
+    eight = engine.wordDict[8]
+    chained = ChainedHashMap()
+    for i in range(len(eight)):
+        chained.insert(eight.valueAt(i), eight.valueAt(i))
+    latency('engine.getWord', lambda: engine.getWord(8), 100000)
+    latency('engine.getWord(player)', lambda: engine.getWord(8, 'player'), 100000)
+    latency('ChainedHashMap', chained.getRandomValue, 200)
+
+    players = 2000
+    five = engine.wordDict[5]
+    engine.getWord(5, 'warm up') # the word set is loaded outside the measurement
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for player in range(players):
+        engine.getWord(5, f'player{player}')
+    perPlayer = (tracemalloc.get_traced_memory()[0] - before) / players
+    tracemalloc.stop()
+    print(f'\nmemory of one player\'s deck after one draw from {len(five)} five letter words: {perPlayer / 1024:.2f} KiB')
+
+
+if __name__ == '__main__':
+    main()
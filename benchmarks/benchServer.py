@@ -0,0 +1,152 @@
+'''Load generator for server.py, opens many concurrent connections on localhost and plays one game on each.
+Reports sessions/sec, login, guess and whole session latency percentiles, and how much memory the server kept
+once the sessions were over (linux only), every login makes a new user.
+
+    python -m benchmarks.benchServer --connections 10000'''
+import argparse
+import asyncio
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+try:
+    import resource
+except ImportError: # not on windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def raiseFileLimit(needed: int) -> None:
+    '''every connection is two sockets (client and server side) so the soft limit is raised as far as allowed'''
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = hard if hard != resource.RLIM_INFINITY else needed
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, max(needed, soft)), hard))
+
+
+def startServer(port: int) -> subprocess.Popen:
+    '''runs the server in a fresh directory (so no real users are touched) that links to the word bank'''
+    directory = tempfile.mkdtemp(prefix='wordleServer')
+    for name in ('wordBankLarge.txt', 'wordBankLarge.idx'):
+        if os.path.exists(os.path.join(ROOT, name)):
+            os.symlink(os.path.join(ROOT, name), os.path.join(directory, name))
+    environment = dict(os.environ, PYTHONPATH=ROOT)
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'server.py'), '--port', str(port)],
+                              cwd=directory, env=environment, stdout=subprocess.PIPE, text=True)
+    server.stdout.readline() # waits for the listening line
+    return server
+
+
+def serverMemory(pid: int) -> Dict[str, int]:
+    '''resident and peak resident memory of the server in KiB, empty where /proc is not there'''
+    try:
+        with open(f'/proc/{pid}/status') as file:
+            return {key: int(value.split()[0]) for key, _, value in (line.partition(':') for line in file) if key in ('VmRSS', 'VmHWM')}
+    except OSError:
+        return {}
+
+
+class Barrier:
+    '''lets the games start only once every connection is open (or has given up)'''
+    def __init__(self, parties: int) -> None:
+        self.waiting = parties
+        self.event = asyncio.Event()
+
+    def arrive(self) -> None:
+        self.waiting -= 1
+        if self.waiting == 0:
+            self.event.set()
+
+
+async def playSession(port: int, number: int, words: List[str], barrier: Barrier, latencies: Dict[str, List[float]]) -> bool:
+    for attempt in range(50): # the accept backlog can overflow while thousands connect at once
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            break
+        except OSError:
+            await asyncio.sleep(0.05 * (attempt + 1))
+    else:
+        barrier.arrive()
+        return False
+
+    async def request(line: str, timer: str) -> str:
+        start = time.perf_counter()
+        writer.write(line.encode() + b'\n')
+        await writer.drain()
+        reply = (await reader.readline()).decode().strip()
+        latencies[timer].append(time.perf_counter() - start)
+        return reply
+
+    rng = random.Random(number)
+    barrier.arrive()
+    await barrier.event.wait()
+    sessionStart = time.perf_counter()
+    await request(f'LOGIN bot{number}', 'login') # a new user every time, the server has to write it
+    await request('NEW 5 6', 'new')
+    reply = 'HINT'
+    while reply.startswith('HINT'):
+        reply = await request(f'GUESS {rng.choice(words)}', 'guess')
+    await request('QUIT', 'quit')
+    latencies['session'].append(time.perf_counter() - sessionStart)
+    writer.close()
+    return True
+
+
+async def run(port: int, connections: int, words: List[str], serverPid: int) -> None:
+    memoryBefore = serverMemory(serverPid)
+    barrier = Barrier(connections)
+    latencies: Dict[str, List[float]] = {'login': [], 'new': [], 'guess': [], 'quit': [], 'session': []}
+    tasks = [asyncio.create_task(playSession(port, number, words, barrier, latencies)) for number in range(connections)]
+
+    await barrier.event.wait()
+    start = time.perf_counter()
+    results = await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    completed = sum(results)
+    print(f'{completed}/{connections} concurrent sessions completed in {elapsed:.2f} s (login, game and quit)')
+    print(f'   sessions/sec   : {completed / elapsed:10.1f}')
+    print(f'   guesses        : {len(latencies["guess"]):10d}')
+    for timer in ('login', 'guess', 'session'):
+        timings = sorted(latencies[timer])
+        if timings:
+            print(f'   {timer + " p50":<15}: {timings[len(timings) // 2] * 1000:10.2f} ms')
+            print(f'   {timer + " p99":<15}: {timings[int(len(timings) * 0.99)] * 1000:10.2f} ms')
+
+    await asyncio.sleep(0.5) # the server sees the last connections close
+    memoryAfter = serverMemory(serverPid)
+    if memoryBefore and memoryAfter:
+        kept = (memoryAfter['VmRSS'] - memoryBefore['VmRSS']) / 1024
+        print(f'   server memory  : {memoryAfter["VmRSS"] / 1024:10.1f} MiB after the sessions, {memoryBefore["VmRSS"] / 1024:.1f} MiB before, '
+              f'{memoryAfter["VmHWM"] / 1024:.1f} MiB peak')
+        print(f'   kept per session: {kept * 1024 / max(completed, 1):9.2f} KiB (the user records themselves stay, the game state should not)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--connections', type=int, default=10000)
+    parser.add_argument('--port', type=int, default=7799)
+    args = parser.parse_args()
+
+    raiseFileLimit(args.connections * 2 + 100)
+    with open(os.path.join(ROOT, 'wordBankLarge.txt')) as file:
+        words = [word for word in (line.strip().lower() for line in file) if len(word) == 5]
+
+    server = startServer(args.port)
+    try:
+        asyncio.run(run(args.port, args.connections, words, server.pid))
+    finally:
+        server.send_signal(signal.SIGINT) # lets the server flush its last batch of records
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
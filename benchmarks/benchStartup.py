@@ -0,0 +1,67 @@
+import statistics
+import subprocess
+import sys
+from wordIndex import WordIndex
+
+# every run happens in a fresh interpreter so nothing is cached between runs (except the os page cache)
+COLD_START = '''
+import time
+start = time.perf_counter()
+from wordleEngine import WordleEngine
+engine = WordleEngine(useIndex={useIndex})
+ready = time.perf_counter()
+engine.validateGuess(engine.getWord(5), 5)
+print(ready - start, time.perf_counter() - start)
+'''
+
+# time until the login menu can be drawn, the UI prefetches the word sets in the background from there
+FIRST_SCREEN = '''
+import time
+start = time.perf_counter()
+from UI import UI
+ui = UI()
+screen = time.perf_counter()
+ui.wordleEngine.validateGuess(ui.wordleEngine.getWord(5), 5)
+first = time.perf_counter()
+time.sleep({menuSeconds}) # the user picking a name and settings while the prefetch runs
+start2 = time.perf_counter()
+ui.wordleEngine.validateGuess(ui.wordleEngine.getWord(5), 5)
+print(screen - start, first - screen, time.perf_counter() - start2)
+'''
+
+
+def run(script: str, runs: int) -> list:
+    '''every number the script prints, per run, in seconds'''
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        times.append([float(value) for value in output.split()])
+    return times
+
+
+def column(times: list, position: int) -> list:
+    return [row[position] for row in times]
+
+
+def line(name: str, values: list) -> None:
+    print(f'   {name:<36}: {statistics.median(values) * 1000:9.2f} ms / {min(values) * 1000:9.2f} ms')
+
+
+def main(runs: int = 5) -> None:
+    if WordIndex.isStale('wordBankLarge.txt', 'wordBankLarge.idx'):
+        WordIndex.build('wordBankLarge.txt', 'wordBankLarge.idx') # the one time compile is not part of the cold start
+
+    print(f'cold start over {runs} runs (median / min)')
+    for name, useIndex in (('text word bank', False), ('binary index', True)):
+        times = run(COLD_START.format(useIndex=useIndex), runs)
+        line(f'{name}: engine ready', column(times, 0))
+        line(f'{name}: first guess checked', column(times, 1))
+
+    times = run(FIRST_SCREEN.format(menuSeconds=1.0), runs)
+    line('first screen (import UI + UI())', column(times, 0))
+    line('first guess, no time to prefetch', column(times, 1))
+    line('first guess, 1 s in the menus', column(times, 2))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from users import Users
+from userStorage import JournalStore, JsonStore, SqliteStore
+
+
+def makeUsersJson(path: str, userCount: int, recordsPerUser: int) -> None:
+    '''writes a synthetic users.json in the original layout'''
+    rng = random.Random(1)
+    data = {}
+    for i in range(userCount):
+        records = []
+        for _ in range(recordsPerUser):
+            guessesNeeded = rng.randint(1, 6)
+            records.append({"wordLength": rng.randint(3, 8), "guesses": 6, "guessesNeeded": guessesNeeded, "win": rng.random() < 0.6})
+        data[f'player{i}'] = {"records": records}
+    with open(path, 'w') as file:
+        json.dump(data, file)
+
+
+def measure(name: str, openStore, appends: int) -> None:
+    '''start up time and memory of Users on the store, history load of one user and the cost of appending records'''
+    tracemalloc.start() # tracing slows python down a lot so memory and time are measured on separate starts
+    Users(openStore()).close()
+    _, memory = tracemalloc.get_traced_memory() # peak, the store is closed again by now
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    users = Users(openStore())
+    startup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    users.usersDict['player500'].scores
+    history = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(appends):
+        users.addNewRecordToUser(f'player{i}', 5, 6, 3, True)
+    append = (time.perf_counter() - start) / appends # the first game of each player also builds their statistics from the records
+
+    start = time.perf_counter()
+    for i in range(appends):
+        users.addNewRecordToUser('player0', 5, 6, 3, True)
+    repeatAppend = (time.perf_counter() - start) / appends
+
+    start = time.perf_counter()
+    users.stats('player501')
+    firstStats = time.perf_counter() - start
+
+    start = time.perf_counter()
+    users.store.appendRecords((f'player{i}', {"wordLength": 5, "guesses": 6, "guessesNeeded": 3, "win": True}) for i in range(appends))
+    batch = (time.perf_counter() - start) / appends
+    users.close()
+
+    print(f'{name}')
+    print(f'   start up (Users())   : {startup * 1000:10.1f} ms  {memory / 2 ** 20:8.1f} MiB')
+    print(f'   one user history     : {history * 1000:10.3f} ms')
+    print(f'   addNewRecordToUser   : {append * 1000:10.3f} ms/record')
+    print(f'   ... same player again: {repeatAppend * 1000:10.3f} ms/record')
+    print(f'   statistics, first look: {firstStats * 1000:9.3f} ms')
+    print(f'   batched appendRecords: {batch * 1000:10.3f} ms/record')
+
+
+def main(userCount: int = 100000, recordsPerUser: int = 5) -> None:
+    directory = tempfile.mkdtemp(prefix='wordleStorage')
+    os.chdir(directory) # every store uses its default file names in here
+    makeUsersJson('users.json', userCount, recordsPerUser)
+    print(f'{userCount} users with {recordsPerUser} records each in {directory}\n')
+
+    start = time.perf_counter()
+    JournalStore().close()
+    print(f'migrate users.json -> journal snapshot : {time.perf_counter() - start:6.2f} s')
+    start = time.perf_counter()
+    SqliteStore().close()
+    print(f'migrate users.json -> sqlite           : {time.perf_counter() - start:6.2f} s\n')
+
+    measure('sqlite', SqliteStore, 200)
+    measure('journal', JournalStore, 200)
+    measure('json (users.json rewritten per change)', JsonStore, 3)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
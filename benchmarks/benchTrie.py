@@ -0,0 +1,70 @@
+'''Build time, memory and query latency of the WordTrie prefix index against the hash maps, per word length.
+
+    python -m benchmarks.benchTrie'''
+import time
+import tracemalloc
+from hashMap import ChainedHashMap, HashMap
+from wordleEngine import WordleEngine
+from wordTrie import WordTrie
+
+
+def perCall(run, calls: int) -> float:
+    '''microseconds per call'''
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def memory(build) -> int:
+    '''bytes still allocated by what build returns'''
+    tracemalloc.start()
+    kept = build()
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def fill(table, words):
+    for word in words:
+        table.insert(word, word)
+    return table
+
+
+def withPatterns(length: int, words: list) -> WordTrie:
+    '''a trie whose pattern bitsets have been built'''
+    trie = WordTrie(length, words)
+    trie.match('?' * length)
+    return trie
+
+
+def main() -> None:
+    engine = WordleEngine()
+    patterns = {5: ['c?a?e', '??ar?', '?????'], 8: ['c?a???er', '????ing?', '????????']}
+    for length in (5, 8):
+        words = engine.wordList(length)
+        start = time.perf_counter()
+        trie = WordTrie(length, words)
+        buildTime = time.perf_counter() - start
+
+        print(f'{length} letter words ({len(words)})')
+        print(f'   build                : {buildTime * 1000:10.1f} ms')
+        print(f'   memory trie          : {memory(lambda: WordTrie(length, words)) / 1024:10.0f} KiB')
+        print(f'   memory trie+patterns : {memory(lambda: withPatterns(length, words)) / 1024:10.0f} KiB')
+        print(f'   memory HashMap       : {memory(lambda: fill(HashMap(expectedItems=len(words)), words)) / 1024:10.0f} KiB')
+        print(f'   memory ChainedHashMap: {memory(lambda: fill(ChainedHashMap(len(words)), words)) / 1024:10.0f} KiB')
+
+        word = words[len(words) // 2]
+        print(f'   contains             : {perCall(lambda: trie.contains(word), 100000):10.2f} us')
+        print(f'   hasPrefix (3)        : {perCall(lambda: trie.hasPrefix(word[:3]), 100000):10.2f} us')
+        print(f'   complete (2, 5)      : {perCall(lambda: trie.complete(word[:2], 5), 20000):10.2f} us')
+        trie.match(patterns[length][0]) # builds the pattern bitsets once
+        for pattern in patterns[length]:
+            found = len(trie.match(pattern))
+            print(f'   match {pattern:<15}: {perCall(lambda: trie.match(pattern), 2000):10.2f} us  ({found} words)')
+        print(f'   match ? +ae -rst     : {perCall(lambda: trie.match("?" * length, "ae", "rst"), 2000):10.2f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+'''Benchmark suite for the hot paths of wordleEngine, hashMap and users. Runs on synthetic data (benchmarks.syntheticData)
+in a temp directory, so it needs no word bank or users and every run sees the same input.
+
+    python -m benchmarks.suite --out baseline.json                  save a baseline
+    python -m benchmarks.suite --baseline baseline.json             compare against it, exit code 1 on a regression
+    python -m benchmarks.suite --scale full --only users            users.json up to 10k users / 1M records
+
+Every result is the best of --repeat runs (latency percentiles the median of them). A result that is more than
+--threshold (default 0.25, 25%) worse than the baseline is flagged as a regression, results are only compared
+when they were measured at the same sizes'''
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+import instrumentation
+from benchmarks.syntheticData import syntheticWords, writeUsersJson, writeWordBank
+from hashMap import HashMap
+from users import Users
+from userStorage import JournalStore, JsonStore
+from wordIndex import WordIndex
+from wordleEngine import WordleEngine, wordNotInDict
+
+# words in the bank, hash map sizes, calls per timed loop, (users, records) users.json sizes and appends per size
+SCALES = {
+    'quick': {"words": 20000, "mapSizes": (1000, 10000), "calls": 20000, "userSizes": ((100, 10000),), "appends": 5},
+    'default': {"words": 88000, "mapSizes": (1000, 10000, 100000), "calls": 100000,
+                "userSizes": ((100, 10000), (1000, 100000)), "appends": 5},
+    'full': {"words": 88000, "mapSizes": (1000, 10000, 100000, 1000000), "calls": 200000,
+             "userSizes": ((100, 10000), (1000, 100000), (10000, 1000000)), "appends": 3},
+}
+LENGTHS = (3, 4, 5, 6, 7, 8)
+
+
+def result(value: float, unit: str, better: str = 'lower') -> Dict[str, Any]:
+    return {"value": value, "unit": unit, "better": better}
+
+
+def best(run: Callable[[Any], Any], repeat: int, setup: Callable[[], Any] = lambda: None) -> float:
+    '''fastest seconds of repeat calls of run(setup()), setup is not timed. The fastest run is the one the rest of
+    the machine disturbed least, so it moves the least between runs'''
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def benchWordBank(scale: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, Any]]:
+    '''every length loaded from the text bank, compiling the index and every length loaded from the index'''
+    def loadAll(engine: WordleEngine) -> None:
+        for length in LENGTHS:
+            engine.wordDict.get(length)
+
+    def removeIndex() -> None:
+        if os.path.exists('wordBankLarge.idx'):
+            os.remove('wordBankLarge.idx')
+
+    return {
+        "wordBank.loadText": result(best(lambda _: loadAll(WordleEngine(useIndex=False)), repeat) * 1000, 'ms'),
+        "wordBank.compileIndex": result(best(lambda _: WordIndex.build('wordBankLarge.txt', 'wordBankLarge.idx'), repeat, removeIndex) * 1000, 'ms'),
+        "wordBank.loadIndex": result(best(lambda _: loadAll(WordleEngine(useIndex=True)), repeat) * 1000, 'ms'),
+    }
+
+
+def benchHashMap(scale: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, Any]]:
+    '''insert (growing and presized), contains hit and miss, one rebuild and getRandomValue at every map size'''
+    results = {}
+    for size in scale["mapSizes"]:
+        keys = [f'word{i}' for i in range(size)]
+        missing = [f'none{i}' for i in range(min(size, scale["calls"]))]
+        hits = keys[:scale["calls"]]
+
+        def fill(hashMap: HashMap) -> HashMap:
+            for key in keys:
+                hashMap.insert(key, key)
+            return hashMap
+
+        full = fill(HashMap())
+        perKey = 1e9 / size
+        results[f"hashMap.insert.n={size}"] = result(best(fill, repeat, HashMap) * perKey, 'ns/op')
+        results[f"hashMap.insertPresized.n={size}"] = result(best(fill, repeat, lambda: HashMap(expectedItems=size)) * perKey, 'ns/op')
+        results[f"hashMap.containsHit.n={size}"] = result(
+            best(lambda _: [full.contains(key) for key in hits], repeat) * 1e9 / len(hits), 'ns/op')
+        results[f"hashMap.containsMiss.n={size}"] = result(
+            best(lambda _: [full.contains(key) for key in missing], repeat) * 1e9 / len(missing), 'ns/op')
+        results[f"hashMap.rebuild.n={size}"] = result(
+            best(lambda hashMap: hashMap._HashMap__rebuild(), repeat, lambda: full.copy()) * 1000, 'ms') # the table is doubled once
+        calls = scale["calls"]
+        results[f"hashMap.getRandomValue.n={size}"] = result(
+            best(lambda _: [full.getRandomValue() for _ in range(calls)], repeat) * 1e9 / calls, 'ns/op')
+    return results
+
+
+def benchHints(scale: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, Any]]:
+    '''generateHint and generateFeedbackCode throughput for 5 and 8 letter words'''
+    results = {}
+    words = syntheticWords(scale["words"], seed=2)
+    for length in (5, 8):
+        guesses = [word for word in words if len(word) == length][:scale["calls"]]
+        secret = guesses[-1]
+        results[f"hints.generateHint.len={length}"] = result(
+            len(guesses) / best(lambda _: [WordleEngine.generateHint(secret, guess) for guess in guesses], repeat), 'hints/s', 'higher')
+        results[f"hints.generateFeedbackCode.len={length}"] = result(
+            len(guesses) / best(lambda _: [WordleEngine.generateFeedbackCode(secret, guess) for guess in guesses], repeat), 'codes/s', 'higher')
+    return results
+
+
+def benchValidateGuess(scale: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, Any]]:
+    '''latency of single validateGuess calls on a warm engine, for words in the bank and words that are not'''
+    engine = WordleEngine()
+    words = engine.wordList(5)
+    engine.validateGuess(words[0], 5) # builds the trie, that is word bank load and not part of the latency
+    calls = min(scale["calls"], len(words))
+    valid = words[:calls]
+    invalid = [word[::-1] for word in valid if not engine.wordDict[5].contains(word[::-1])] # words spelled backwards are rarely words
+
+    def latencies(guesses: List[str]) -> List[float]:
+        times = []
+        for guess in guesses:
+            start = time.perf_counter_ns()
+            try:
+                engine.validateGuess(guess, 5)
+            except wordNotInDict:
+                pass
+            times.append(time.perf_counter_ns() - start)
+        return times
+
+    results = {}
+    for name, guesses in (('valid', valid), ('invalid', invalid)):
+        runs = [latencies(guesses) for _ in range(repeat)]
+        for percentile in (50, 99):
+            position = len(guesses) * percentile // 100
+            value = statistics.median(sorted(times)[min(position, len(times) - 1)] for times in runs)
+            results[f"validateGuess.{name}.p{percentile}"] = result(value / 1000, 'us')
+    return results
+
+
+def benchUsers(scale: Dict[str, Any], repeat: int) -> Dict[str, Dict[str, Any]]:
+    '''Users() start up and the cost of a record as users.json grows, on the json store itself and on the journal store
+    migrated from it (the default store)'''
+    results = {}
+    appends = scale["appends"]
+    for userCount, recordCount in scale["userSizes"]:
+        directory = tempfile.mkdtemp(prefix=f'users{userCount}x{recordCount}', dir='.')
+        home = os.getcwd()
+        os.chdir(directory)
+        try:
+            writeUsersJson('users.json', userCount, recordCount)
+            for name, openStore in (('json', JsonStore), ('journal', JournalStore)):
+                label = f'u={userCount},r={recordCount}'
+                start = time.perf_counter()
+                Users(openStore()).close() # migrates users.json and builds the leaderboard, only once per store
+                results[f"users.{name}.firstOpen.{label}"] = result((time.perf_counter() - start) * 1000, 'ms')
+                results[f"users.{name}.load.{label}"] = result(
+                    best(lambda store: Users(store).close(), min(repeat, 3), openStore) * 1000, 'ms')
+
+                users = Users(openStore())
+                users.addNewRecordToUser('player0', 5, 6, 3, True) # statistics of the player are loaded by their first game
+                start = time.perf_counter()
+                for _ in range(appends):
+                    users.addNewRecordToUser('player0', 5, 6, 3, True)
+                results[f"users.{name}.append.{label}"] = result((time.perf_counter() - start) / appends * 1000, 'ms/record')
+                users.close()
+        finally:
+            os.chdir(home)
+    return results
+
+
+CASES = {
+    'wordBank': benchWordBank,
+    'hashMap': benchHashMap,
+    'hints': benchHints,
+    'validateGuess': benchValidateGuess,
+    'users': benchUsers,
+}
+
+
+def runSuite(scaleName: str, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Any]:
+    '''runs the cases (every case when only is None) in a temp directory with a synthetic word bank, returns the results document'''
+    scale = SCALES[scaleName]
+    home = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='wordleSuite') as directory:
+        os.chdir(directory) # the engine and the stores use their default file names in here
+        try:
+            writeWordBank('wordBankLarge.txt', scale["words"])
+            results = {}
+            for name, case in CASES.items():
+                if only and name not in only:
+                    continue
+                start = time.perf_counter()
+                results.update(case(scale, repeat))
+                print(f'{name:<14} done in {time.perf_counter() - start:6.1f} s', file=sys.stderr)
+        finally:
+            os.chdir(home)
+    return {"meta": meta(scaleName, repeat), "results": results}
+
+
+def meta(scaleName: str, repeat: int) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        "scale": scaleName,
+        "repeat": repeat,
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profiling": instrumentation.ENABLED, # timers on make every instrumented call slower
+        "time": datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    '''prints every result next to the baseline, returns the names of the results that are more than threshold worse'''
+    regressions = []
+    if current["meta"]["scale"] != baseline["meta"]["scale"]:
+        print(f'warning: baseline was run at scale {baseline["meta"]["scale"]}, this run at {current["meta"]["scale"]}')
+    print(f'{"benchmark":<44} {"baseline":>12} {"now":>12}  {"change":>8}')
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or before["unit"] != now["unit"]:
+            print(f'{name:<44} {"-":>12} {now["value"]:12.3f}  {"new":>8}  {now["unit"]}')
+            continue
+        # worse > 1 means slower, whichever way the unit goes
+        if now["better"] == 'higher':
+            worse = before["value"] / now["value"] if now["value"] else float('inf')
+        else:
+            worse = now["value"] / before["value"] if before["value"] else 1.0
+        flag = ''
+        if worse > 1 + threshold:
+            flag = 'REGRESSION'
+            regressions.append(name)
+        elif worse < 1 / (1 + threshold):
+            flag = 'faster'
+        print(f'{name:<44} {before["value"]:12.3f} {now["value"]:12.3f}  {(worse - 1) * 100:+7.1f}%  {now["unit"]:<9} {flag}')
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the engine, hash map and user storage hot paths')
+    parser.add_argument('--scale', choices=SCALES, default='default')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', choices=CASES, help='run only these cases')
+    parser.add_argument('--out', help='write the results to this json file')
+    parser.add_argument('--baseline', help='results json of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='how much worse than the baseline is a regression, 0.25 is 25%%')
+    args = parser.parse_args(argv)
+
+    out = os.path.abspath(args.out) if args.out else None
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+
+    current = runSuite(args.scale, args.repeat, args.only)
+    if out:
+        with open(out, 'w') as file:
+            json.dump(current, file, indent=4)
+
+    if baseline is None:
+        for name, value in current["results"].items():
+            print(f'{name:<44} {value["value"]:12.3f}  {value["unit"]}')
+        return 0
+    regressions = compare(current, baseline, args.threshold)
+    if regressions:
+        print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    print(f'\nno regressions over {args.threshold:.0%}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+'''Synthetic word banks and users.json files for the benchmarks, so they run offline on the same input every time.
+
+    python -m benchmarks.syntheticData --dir /tmp/wordleData --words 88000 --users 10000 --records 1000000'''
+import argparse
+import json
+import os
+import random
+from typing import List
+
+# share of each word length in wordBankLarge.txt, so the synthetic bank has about the same partitions
+LENGTH_SHARES = {3: 0.016, 4: 0.060, 5: 0.116, 6: 0.200, 7: 0.270, 8: 0.338}
+# english letter frequencies (percent), the feedback of synthetic words then looks like that of real ones
+LETTER_WEIGHTS = {
+    'a': 8.2, 'b': 1.5, 'c': 2.8, 'd': 4.3, 'e': 12.7, 'f': 2.2, 'g': 2.0, 'h': 6.1, 'i': 7.0, 'j': 0.2, 'k': 0.8, 'l': 4.0, 'm': 2.4,
+    'n': 6.7, 'o': 7.5, 'p': 1.9, 'q': 0.1, 'r': 6.0, 's': 6.3, 't': 9.1, 'u': 2.8, 'v': 1.0, 'w': 2.4, 'x': 0.2, 'y': 2.0, 'z': 0.1,
+}
+
+
+def syntheticWords(count: int, seed: int = 1) -> List[str]:
+    '''count different lower case words of 3-8 letters, the same words for the same seed'''
+    rng = random.Random(seed)
+    letters, weights = list(LETTER_WEIGHTS), list(LETTER_WEIGHTS.values())
+    words: List[str] = []
+    for length, share in LENGTH_SHARES.items():
+        wanted = max(1, round(count * share))
+        seen = set()
+        while len(seen) < min(wanted, 26 ** length // 2): # short lengths run out of words long before 26 ** length
+            word = ''.join(rng.choices(letters, weights, k=length))
+            if word not in seen:
+                seen.add(word)
+                words.append(word)
+    return words
+
+
+def writeWordBank(path: str, count: int, seed: int = 1) -> int:
+    '''writes a synthetic wordBankLarge.txt, returns the number of words'''
+    words = syntheticWords(count, seed)
+    with open(path, 'w') as file:
+        file.write('\n'.join(words) + '\n')
+    return len(words)
+
+
+def writeUsersJson(path: str, userCount: int, recordCount: int, seed: int = 1) -> None:
+    '''writes a users.json in the original layout with recordCount records spread over userCount users (player0, player1, ...).
+    Written a user at a time so a million records never have to be in memory at once'''
+    rng = random.Random(seed)
+    with open(path, 'w') as file:
+        file.write('{')
+        for i in range(userCount):
+            records = []
+            for _ in range(recordCount // userCount + (i < recordCount % userCount)):
+                guesses = rng.randint(4, 8)
+                win = rng.random() < 0.6
+                records.append({"wordLength": rng.randint(3, 8), "guesses": guesses,
+                                "guessesNeeded": rng.randint(1, guesses) if win else guesses, "win": win})
+            file.write(('' if i == 0 else ', ') + json.dumps(f'player{i}') + ': ' + json.dumps({"records": records}))
+        file.write('}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Write a synthetic word bank and users.json')
+    parser.add_argument('--dir', default='.', help='where wordBankLarge.txt and users.json are written')
+    parser.add_argument('--words', type=int, default=88000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    count = writeWordBank(os.path.join(args.dir, 'wordBankLarge.txt'), args.words, args.seed)
+    writeUsersJson(os.path.join(args.dir, 'users.json'), args.users, args.records, args.seed)
+    print(f'{count} words, {args.users} users and {args.records} records written to {args.dir}')
+
+
+if __name__ == '__main__':
+    main()
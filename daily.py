@@ -0,0 +1,113 @@
+import datetime
+import mmap
+import os
+import random
+import struct
+from typing import Callable, List, Optional
+from fileLock import locked
+
+# Layout of the schedule file: header (magic, version, ordinal of the first day, number of days)
+# followed by one fixed width record per (day, word length): day 0 length 3, day 0 length 4 ... day 1 length 3 ...
+MAGIC = b'DAYS'
+VERSION = 1
+HEADER = struct.Struct('<4sHII')
+LENGTHS = range(3, 9)
+WIDTH = max(LENGTHS) # every word is padded to this many bytes
+SEED = 'wordleTUI daily challenge'
+MAX_DAYS = 36600 # days further than this before or after the file's first day have no challenge
+
+
+def drawDailyWord(words: List[str], day: datetime.date, length: int) -> str:
+    '''deterministic pick for a day and length, every player with the same word list gets the same word'''
+    return words[random.Random(f'{SEED}:{day.isoformat()}:{length}').randrange(len(words))] if words else ''
+
+
+class DailySchedule:
+    '''The secret word of every word length for every day, precomputed into a file so a lookup is one slice of the memory mapped file.
+    Once a day is written it never changes, so words added to the bank later do not move any challenge. A day outside
+    the file is added to it (under the file's lock) before its word is read, never drawn from the current words'''
+
+    def __init__(self, wordList: Callable[[int], List[str]], path: str = 'daily.idx', daysAhead: int = 366) -> None:
+        '''wordList(length) returns the words of a length, they are only read when days have to be added to the file'''
+        self.wordList = wordList
+        self.path = path
+        self.data: Optional[mmap.mmap] = None
+        self.firstDay, self.days = self.__readHeader()
+        today = datetime.date.today()
+        self.__cover(today, today + datetime.timedelta(days=daysAhead - 1))
+
+    def __covers(self, first: datetime.date, last: datetime.date) -> bool:
+        return self.days > 0 and self.firstDay <= first and (last - self.firstDay).days < self.days
+
+    def __cover(self, first: datetime.date, last: datetime.date) -> None:
+        '''makes sure the days first to last are in the file and mapped'''
+        if self.data is not None and self.__covers(first, last):
+            return
+        if not self.__covers(first, last):
+            with locked(self.path): # another game may be extending it too, its days are read again before adding any
+                self.firstDay, self.days = self.__readHeader()
+                if not self.__covers(first, last):
+                    oldLast = self.firstDay + datetime.timedelta(days=self.days - 1) if self.days else last
+                    self.__extend(min(first, self.firstDay or first), max(last, oldLast))
+        if self.data is not None:
+            self.data.close()
+        with open(self.path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __readHeader(self) -> tuple:
+        try:
+            with open(self.path, 'rb') as file:
+                magic, version, firstOrdinal, days = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            return None, 0
+        if magic != MAGIC or version != VERSION or os.path.getsize(self.path) < HEADER.size + days * len(LENGTHS) * WIDTH:
+            return None, 0
+        return datetime.date.fromordinal(firstOrdinal), days
+
+    def __extend(self, first: datetime.date, last: datetime.date) -> None:
+        '''rewrites the schedule to run from first to last, the days already in the file are copied unchanged
+        and only the days before and after them are drawn. Called with the file's lock held'''
+        # non ascii words are left out like the index and the trie do, the keyboard can not type them and each record is WIDTH bytes
+        words = {length: [word for word in self.wordList(length) if word.isascii()] for length in LENGTHS}
+
+        def draw(fromDay: datetime.date, days: int) -> bytes:
+            records = bytearray()
+            for dayIndex in range(days):
+                day = fromDay + datetime.timedelta(days=dayIndex)
+                for length in LENGTHS:
+                    records += drawDailyWord(words[length], day, length).encode('ascii').ljust(WIDTH, b' ')
+            return bytes(records)
+
+        before = (self.firstDay - first).days if self.days else 0
+        after = (last - first).days + 1 - before - self.days
+        tempPath = f'{self.path}.{os.getpid()}.tmp'
+        with open(tempPath, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, first.toordinal(), before + self.days + after))
+            file.write(draw(first, before))
+            if self.days:
+                with open(self.path, 'rb') as old:
+                    old.seek(HEADER.size)
+                    file.write(old.read(self.days * len(LENGTHS) * WIDTH))
+            file.write(draw(first + datetime.timedelta(days=before + self.days), after))
+        os.replace(tempPath, self.path)
+        self.firstDay, self.days = first, before + self.days + after
+
+    def wordFor(self, length: int, day: Optional[datetime.date] = None) -> Optional[str]:
+        '''the challenge word of a length on a day (default today), None if there is no word of that length'''
+        day = day or datetime.date.today()
+        if length not in LENGTHS:
+            return None
+        dayIndex = (day - self.firstDay).days
+        if not 0 <= dayIndex < self.days: # not written yet, or written by another process after this one mapped the file
+            if abs(dayIndex) > MAX_DAYS:
+                return None
+            self.__cover(day, day)
+            dayIndex = (day - self.firstDay).days
+
+        offset = HEADER.size + (dayIndex * len(LENGTHS) + length - LENGTHS.start) * WIDTH
+        word = self.data[offset:offset + WIDTH].decode('ascii').strip()
+        return word or None
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
@@ -0,0 +1,195 @@
+'''Word difficulty scores and bands, precomputed into one sidecar file per word length.
+
+    python difficulty.py --lengths 3 4 5 6 7 8 --workers 8
+
+A word is harder the rarer its letters are, the less likely its letters are in their positions, the more letters
+it repeats and the more words are left to tell it apart from after the solver's opening guess (a cheap stand in for
+the average number of solver guesses, which would take minutes per length to simulate). Every part is turned into a
+percentile within the word length, the weighted sum is the score and the words are split into equal bands by score'''
+import argparse
+import math
+import os
+import struct
+import time
+from array import array
+from collections import Counter
+from typing import List, Optional, Tuple
+from feedback import scoreSecrets
+from feedbackMatrix import wordsChecksum
+
+# Layout of a difficulty file: header (magic, version, word length, word count, crc32 of the words), the end of every band,
+# then the positions of the words sorted from easiest to hardest (uint32) and their scores (float32), native byte order
+MAGIC = b'DIFF'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+BANDS = struct.Struct(f'<{len(DIFFICULTIES)}I')
+WEIGHTS = (0.3, 0.25, 0.1, 0.35) # letter rarity, positional surprisal, repeated letters, words left after the opener
+CHUNK_WORDS = 4096
+
+_workerStats: tuple = () # set once per pool process by _initWorker
+
+
+def _initWorker(stats: tuple) -> None:
+    global _workerStats
+    _workerStats = stats
+
+
+def _scoreChunk(words: List[str]) -> List[tuple]:
+    '''the raw parts of the score of every word, (letter rarity, positional surprisal, repeated letters, opener code)'''
+    letterShare, positionShare, opener = _workerStats
+    codes = scoreSecrets(opener, words)
+    parts = []
+    for word, code in zip(words, codes):
+        letters = set(word)
+        rarity = 1 - sum(letterShare[letter] for letter in letters) / len(letters)
+        surprisal = sum(-math.log2(positionShare[position][letter]) for position, letter in enumerate(word)) / len(word)
+        parts.append((rarity, surprisal, len(word) - len(letters), code))
+    return parts
+
+
+def _percentiles(values: List[float]) -> List[float]:
+    '''the rank of every value as a fraction, ties share the lowest rank'''
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    scale = max(1, len(values) - 1)
+    previous, previousRank = None, 0.0
+    for rank, position in enumerate(order):
+        if values[position] != previous:
+            previous, previousRank = values[position], rank / scale
+        ranks[position] = previousRank
+    return ranks
+
+
+def scoreWords(words: List[str], opener: str, workers: Optional[int] = None) -> List[float]:
+    '''difficulty score in [0, 1] of every word (all of one length), the scoring is spread over a process pool'''
+    count = len(words)
+    letterCounts = Counter(letter for word in words for letter in set(word))
+    letterShare = {letter: seen / count for letter, seen in letterCounts.items()}
+    positionShare = [{letter: seen / count for letter, seen in Counter(word[position] for word in words).items()}
+                     for position in range(len(opener))]
+    stats = (letterShare, positionShare, opener)
+
+    chunks = [words[start:start + CHUNK_WORDS] for start in range(0, count, CHUNK_WORDS)]
+    if workers == 1 or len(chunks) <= 1:
+        _initWorker(stats)
+        parts = [part for chunk in chunks for part in _scoreChunk(chunk)]
+    else:
+        from concurrent.futures import ProcessPoolExecutor # imported here, it is slow to import and most runs never score
+        with ProcessPoolExecutor(workers, initializer=_initWorker, initargs=(stats,)) as pool:
+            parts = [part for chunkParts in pool.map(_scoreChunk, chunks) for part in chunkParts]
+
+    bucketSizes = Counter(part[3] for part in parts)
+    columns = [
+        _percentiles([part[0] for part in parts]),
+        _percentiles([part[1] for part in parts]),
+        _percentiles([part[2] for part in parts]),
+        _percentiles([math.log2(bucketSizes[part[3]]) for part in parts]),
+    ]
+    return [sum(weight * column[position] for weight, column in zip(WEIGHTS, columns)) for position in range(count)]
+
+
+class BandView:
+    '''The words of one band, with the len() and valueAt api of a word set so WordSampler picks from it in O(1)'''
+    def __init__(self, words, positions: memoryview) -> None:
+        self.words = words
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def valueAt(self, position: int) -> str:
+        return self.words.valueAt(self.positions[position])
+
+
+class DifficultyIndex:
+    '''Word positions of one length sorted by difficulty score, split into the DIFFICULTIES bands.
+    Positions refer to the word list the index was built from, words added after it just are not in any band'''
+
+    def __init__(self, count: int, bandEnds: Tuple[int, ...], positions: array, scores: array) -> None:
+        self.count = count
+        self.bandEnds = bandEnds
+        self.positions = positions
+        self.scores = scores
+
+    def band(self, difficulty: str) -> memoryview:
+        '''positions of the words of a band, ValueError is raised for an unknown difficulty'''
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f'difficulty must be one of {", ".join(DIFFICULTIES)}')
+        band = DIFFICULTIES.index(difficulty)
+        start = self.bandEnds[band - 1] if band else 0
+        return memoryview(self.positions)[start:self.bandEnds[band]]
+
+    def bandView(self, difficulty: str, words) -> BandView:
+        return BandView(words, self.band(difficulty))
+
+    @staticmethod
+    def pathFor(length: int, directory: str = '.') -> str:
+        return os.path.join(directory, f'difficulty{length}.idx')
+
+    @classmethod
+    def load(cls, path: str, words: List[str]) -> Optional["DifficultyIndex"]:
+        '''reads the index stored at path, None is returned if it is missing or was not built from the start of words'''
+        try:
+            with open(path, 'rb') as file:
+                magic, version, length, count, checksum = HEADER.unpack(file.read(HEADER.size))
+                bandEnds = BANDS.unpack(file.read(BANDS.size))
+                positions, scores = array('I'), array('f')
+                positions.fromfile(file, count)
+                scores.fromfile(file, count)
+        except (OSError, struct.error, EOFError):
+            return None
+
+        if magic != MAGIC or version != VERSION or count > len(words) or checksum != wordsChecksum(words[:count]):
+            return None
+        return cls(count, bandEnds, positions, scores)
+
+    @classmethod
+    def build(cls, path: str, words: List[str], opener: str, workers: Optional[int] = None) -> "DifficultyIndex":
+        '''scores every word, sorts them into bands and writes the index to path (temp file then rename)'''
+        scores = scoreWords(words, opener, workers) if words else []
+        order = sorted(range(len(words)), key=scores.__getitem__)
+        count = len(words)
+        bandEnds = tuple(count * (band + 1) // len(DIFFICULTIES) for band in range(len(DIFFICULTIES)))
+        positions = array('I', order)
+        sortedScores = array('f', (scores[position] for position in order))
+
+        tempPath = path + '.tmp'
+        with open(tempPath, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(words[0]) if words else 0, count, wordsChecksum(words)))
+            file.write(BANDS.pack(*bandEnds))
+            positions.tofile(file)
+            sortedScores.tofile(file)
+        os.replace(tempPath, path)
+        return cls(count, bandEnds, positions, sortedScores)
+
+    @staticmethod
+    def remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from wordleEngine import WordleEngine # the engine imports this module, so it is only needed when run as a script
+    parser = argparse.ArgumentParser(description='Score the difficulty of every word and write the band index of each length')
+    parser.add_argument('--lengths', type=int, nargs='+', default=list(range(3, 9)))
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    engine = WordleEngine()
+    for length in args.lengths:
+        words = engine.wordList(length)
+        if not words:
+            continue
+        DifficultyIndex.remove(DifficultyIndex.pathFor(length)) # always scored again from the current words
+        start = time.perf_counter()
+        index = engine.getDifficultyIndex(length, args.workers)
+        elapsed = time.perf_counter() - start
+        examples = ', '.join(f'{difficulty} {index.bandView(difficulty, engine.wordDict[length]).valueAt(0)}' for difficulty in DIFFICULTIES)
+        print(f'{length} letters: {len(words):7,d} words scored in {elapsed:6.2f} s  (easiest of each band: {examples})')
+
+
+if __name__ == '__main__':
+    main()
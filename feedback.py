@@ -0,0 +1,124 @@
+from array import array
+from typing import Iterable
+
+# A feedback code packs the hint for a guess into one integer, every position is a base 3 digit
+# (position 0 is the least significant digit): 0 letter not in the word, 1 letter misplaced, 2 letter correct
+ABSENT, MISPLACED, CORRECT = 0, 1, 2
+POWERS = tuple(3 ** i for i in range(16))
+
+GREEN = "\033[92m"
+YELLOW = "\033[93m"
+RESET = "\033[0m"
+RENDERED = ('-', f"{YELLOW}c{RESET}", f"{GREEN}C{RESET}") # how every digit is displayed
+
+
+def feedbackCode(secret: str, guess: str) -> int:
+    '''returns the feedback code of guess against secret, both must be lower case and of the same length.
+    A letter only counts as misplaced as many times as it is left over in the secret after the correct letters'''
+    if secret == guess:
+        return POWERS[len(secret)] - 1
+
+    code = 0
+    leftover = [] # secret letters that were not guessed in the right position
+    for i in range(len(secret)):
+        if secret[i] == guess[i]:
+            code += 2 * POWERS[i]
+        else:
+            leftover.append(secret[i])
+
+    if leftover:
+        for i in range(len(secret)):
+            letter = guess[i]
+            if letter != secret[i] and letter in leftover:
+                leftover.remove(letter)
+                code += POWERS[i]
+    return code
+
+
+def winningCode(length: int) -> int:
+    '''the code where every letter is correct'''
+    return POWERS[length] - 1
+
+
+def codeTypecode(length: int) -> str:
+    '''smallest array typecode that holds every code of this word length, uint8 up to 5 letters then uint16'''
+    return 'B' if POWERS[length] <= 256 else 'H'
+
+
+def decodeFeedback(code: int, length: int) -> list:
+    '''returns the list of digits (ABSENT, MISPLACED, CORRECT) of a code, position 0 first'''
+    digits = []
+    for _ in range(length):
+        code, digit = divmod(code, 3)
+        digits.append(digit)
+    return digits
+
+
+def renderFeedback(code: int, length: int) -> str:
+    '''turns a code into the coloured hint shown to the player, green C correct, yellow c misplaced, - not in word'''
+    return ''.join(RENDERED[digit] for digit in decodeFeedback(code, length))
+
+
+def parseHint(hint: str) -> int:
+    '''turns a coloured hint made by renderFeedback back into its code'''
+    digits = hint.replace(RENDERED[CORRECT], '2').replace(RENDERED[MISPLACED], '1').replace(RENDERED[ABSENT], '0')
+    return sum(int(digit) * POWERS[i] for i, digit in enumerate(digits))
+
+
+def scoreSecrets(guess: str, secrets: Iterable[str]) -> array:
+    '''scores one guess against many secrets of the guess' length, returns the codes in the order of secrets'''
+    length = len(guess)
+    codes = array(codeTypecode(length))
+    append = codes.append
+    win = POWERS[length] - 1
+    weighted = tuple(zip(guess, POWERS[:length])) # (letter, weight) of every guess position, built once for the whole batch
+
+    for secret in secrets: # same algorithm as feedbackCode, inlined so the batch pays no call overhead
+        if secret == guess:
+            append(win)
+            continue
+        code = 0
+        leftover = []
+        misses = []
+        for (letter, weight), secretLetter in zip(weighted, secret):
+            if letter == secretLetter:
+                code += weight + weight
+            else:
+                leftover.append(secretLetter)
+                misses.append((letter, weight))
+        for letter, weight in misses:
+            if letter in leftover:
+                leftover.remove(letter)
+                code += weight
+        append(code)
+    return codes
+
+
+def scoreGuesses(guesses: Iterable[str], secret: str) -> array:
+    '''scores many guesses against one secret of the same length, returns the codes in the order of guesses'''
+    length = len(secret)
+    codes = array(codeTypecode(length))
+    append = codes.append
+    win = POWERS[length] - 1
+    weighted = tuple(zip(secret, POWERS[:length])) # (letter, weight) of every secret position
+
+    for guess in guesses:
+        if guess == secret:
+            append(win)
+            continue
+        code = 0
+        leftover = []
+        misses = []
+        for (secretLetter, weight), letter in zip(weighted, guess):
+            if letter == secretLetter:
+                code += weight + weight
+            else:
+                leftover.append(secretLetter)
+                misses.append((letter, weight))
+        for letter, weight in misses:
+            if letter in leftover:
+                leftover.remove(letter)
+                code += weight
+        append(code)
+    return codes
+
@@ -0,0 +1,133 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, List, Optional
+from feedback import codeTypecode, scoreSecrets
+
+# Layout of a matrix file: header (magic, version, word length, word count, crc32 of the words)
+# followed by count * count codes, row = guess position, column = secret position, native byte order
+MAGIC = b'FMTX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+CHUNK_BYTES = 1 << 22 # rows are computed and written about 4 MiB at a time
+MAX_MATRIX_BYTES = 256 << 20 # largest matrix build will make, the whole bank's 5 letter words are about 100 MiB, 8 letters 1.8 GB
+
+_workerWords: List[str] = [] # set once per pool process by _initWorker
+
+
+def _initWorker(words: List[str]) -> None:
+    global _workerWords
+    _workerWords = words
+
+
+def _scoreRows(start: int, stop: int) -> tuple:
+    '''computes the rows [start, stop) of the matrix in a pool process, returns (start, bytes of the rows)'''
+    chunk = bytearray()
+    for guess in _workerWords[start:stop]:
+        chunk += scoreSecrets(guess, _workerWords).tobytes()
+    return start, bytes(chunk)
+
+
+class MatrixTooLarge(Exception):
+    pass
+
+
+def wordsChecksum(words: List[str]) -> int:
+    '''crc32 of the word list in order, a matrix is only valid for the exact list it was built from'''
+    checksum = 0
+    for word in words:
+        checksum = zlib.crc32(word.encode() + b'\n', checksum)
+    return checksum
+
+
+class FeedbackMatrix:
+    '''Memory mapped table of the feedback code of every guess against every secret of one word length.
+    Positions are the positions of the words in the list the matrix was built from, table[guess, secret] is one array index'''
+
+    def __init__(self, path: str, words: List[str]) -> None:
+        self.path = path
+        self.words = words
+        self.count = len(words)
+        self.positions: Dict[str, int] = {word: position for position, word in enumerate(words)}
+
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        typecode = codeTypecode(len(words[0]) if words else 3)
+        self.bytes = memoryview(self.data)[HEADER.size:]
+        self.codes = self.bytes.cast(typecode) # flat view, codes[guess * count + secret]
+        self.table = self.bytes.cast(typecode, [self.count, self.count]) if self.count else self.codes # table[guess, secret]
+
+    def pattern(self, guess: str, secret: str) -> int:
+        '''the feedback code of two words, KeyError is raised if either is not in the matrix'''
+        return self.table[self.positions[guess], self.positions[secret]]
+
+    def row(self, guessPosition: int) -> memoryview:
+        '''codes of one guess against every secret'''
+        return self.codes[guessPosition * self.count:(guessPosition + 1) * self.count]
+
+    def close(self) -> None:
+        self.table.release()
+        self.codes.release()
+        self.bytes.release()
+        self.data.close()
+        self.file.close()
+
+    @staticmethod
+    def pathFor(length: int, directory: str = '.') -> str:
+        return os.path.join(directory, f'feedbackMatrix{length}.bin')
+
+    @classmethod
+    def load(cls, path: str, words: List[str]) -> Optional["FeedbackMatrix"]:
+        '''opens the matrix stored at path, None is returned if it is missing or was built from other words'''
+        try:
+            with open(path, 'rb') as file:
+                magic, version, length, count, checksum = HEADER.unpack(file.read(HEADER.size))
+        except (OSError, struct.error):
+            return None
+
+        if magic != MAGIC or version != VERSION or count != len(words) or checksum != wordsChecksum(words):
+            return None
+        return cls(path, words)
+
+    @staticmethod
+    def sizeFor(words: List[str]) -> int:
+        '''bytes of the file of a matrix of these words'''
+        length = len(words[0]) if words else 3
+        return HEADER.size + len(words) ** 2 * (1 if codeTypecode(length) == 'B' else 2)
+
+    @classmethod
+    def build(cls, path: str, words: List[str], workers: Optional[int] = None, maxBytes: int = MAX_MATRIX_BYTES) -> "FeedbackMatrix":
+        '''computes the matrix in chunks of rows across a process pool and writes it to path (temp file then rename).
+        MatrixTooLarge is raised before anything is computed when the file would be over maxBytes'''
+        size = cls.sizeFor(words)
+        if size > maxBytes:
+            raise MatrixTooLarge(f'a feedback matrix of {len(words)} words is {size / 2 ** 20:,.0f} MiB, over the {maxBytes / 2 ** 20:,.0f} MiB limit')
+        length = len(words[0]) if words else 3
+        rowBytes = max(1, len(words) * (1 if codeTypecode(length) == 'B' else 2))
+        chunkRows = max(1, CHUNK_BYTES // rowBytes)
+        tempPath = path + '.tmp'
+
+        with open(tempPath, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, length, len(words), wordsChecksum(words)))
+            file.truncate(HEADER.size + rowBytes * len(words))
+
+            chunks = [(start, min(start + chunkRows, len(words))) for start in range(0, len(words), chunkRows)]
+            if workers == 1 or len(chunks) <= 1:
+                _initWorker(words)
+                results = (_scoreRows(start, stop) for start, stop in chunks)
+                cls.__writeChunks(file, results, rowBytes)
+            else:
+                from concurrent.futures import ProcessPoolExecutor, as_completed # imported here, it is slow to import and most runs never build
+                with ProcessPoolExecutor(workers, initializer=_initWorker, initargs=(words,)) as pool:
+                    futures = [pool.submit(_scoreRows, start, stop) for start, stop in chunks]
+                    cls.__writeChunks(file, (future.result() for future in as_completed(futures)), rowBytes)
+
+        os.replace(tempPath, path)
+        return cls(path, words)
+
+    @staticmethod
+    def __writeChunks(file, results, rowBytes: int) -> None:
+        for start, chunk in results: # chunks finish in any order so each is written at its own offset
+            file.seek(HEADER.size + start * rowBytes)
+            file.write(chunk)
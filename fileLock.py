@@ -0,0 +1,106 @@
+'''Advisory locks and version stamps for the files several game processes share (the user store and the word bank).
+
+The lock is taken on a separate path + '.lock' file, because the shared files themselves are replaced by renames
+and a lock on a replaced file protects nothing. The lock file also holds a version stamp, two little endian
+64 bit counters: the version, bumped by every write, and the generation, bumped when a file is rewritten from
+scratch (a journal compaction). A process compares the stamp with the one it saw last to find out cheaply
+whether anyone else changed the files, without reading them.
+Without fcntl (windows) the locks do nothing and only one process should use the files at a time'''
+import os
+import struct
+import threading
+from contextlib import contextmanager
+from typing import ContextManager, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+STAMP = struct.Struct('<QQ') # version, generation
+SHARED, EXCLUSIVE = (fcntl.LOCK_SH, fcntl.LOCK_EX) if fcntl is not None else (1, 2)
+
+
+class FileLock:
+    '''fcntl advisory lock on path + '.lock'. Holds nest: taking the lock again in the same process
+    (an exclusive write inside an exclusive batch, a shared read inside either) does not lock twice.
+    A shared hold can not be made exclusive, flock lets go of the shared lock before it takes the exclusive one
+    and another writer can get in between, so anything that may write takes the exclusive lock from the start.
+    Threads of one process take turns through an RLock, the file lock is between processes'''
+
+    def __init__(self, path: str) -> None:
+        self.path = path + LOCK_SUFFIX
+        self.threadLock = threading.RLock()
+        self.fd: Optional[int] = None
+        self.held: List[int] = [] # modes of the holds that are open, innermost last
+
+    def __fileno(self) -> int:
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        return self.fd
+
+    def exclusive(self) -> ContextManager[None]:
+        '''only this process reads or writes the files while it is held. RuntimeError is raised inside a shared hold'''
+        return self.__hold(EXCLUSIVE)
+
+    def shared(self) -> ContextManager[None]:
+        '''no process writes the files while it is held, others can read'''
+        return self.__hold(SHARED)
+
+    @contextmanager
+    def __hold(self, mode: int) -> Iterator[None]:
+        with self.threadLock:
+            if mode == EXCLUSIVE and self.held and EXCLUSIVE not in self.held:
+                raise RuntimeError(f'{self.path} is held shared, it can not be made exclusive without letting it go')
+            fd = self.__fileno()
+            if fcntl is not None and not self.held:
+                fcntl.flock(fd, mode)
+            self.held.append(mode)
+            try:
+                yield
+            finally:
+                self.held.pop()
+                if fcntl is not None and not self.held:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def stamp(self) -> Tuple[int, int]:
+        '''(version, generation), read without taking the lock. (0, 0) before anything was written'''
+        with self.threadLock:
+            fd = self.__fileno()
+            if hasattr(os, 'pread'):
+                data = os.pread(fd, STAMP.size, 0) # one system call, this runs before every write and refresh
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                data = os.read(fd, STAMP.size)
+        return STAMP.unpack(data) if len(data) == STAMP.size else (0, 0)
+
+    def bump(self, newGeneration: bool = False) -> Tuple[int, int]:
+        '''marks a write, called with the exclusive lock held. Returns the new stamp'''
+        with self.threadLock:
+            version, generation = self.stamp()
+            stamp = (version + 1, generation + 1 if newGeneration else generation)
+            if hasattr(os, 'pwrite'):
+                os.pwrite(self.fd, STAMP.pack(*stamp), 0)
+            else:
+                os.lseek(self.fd, 0, os.SEEK_SET)
+                os.write(self.fd, STAMP.pack(*stamp))
+        return stamp
+
+    def close(self) -> None:
+        with self.threadLock:
+            if self.fd is not None:
+                os.close(self.fd) # closing the descriptor also drops the lock
+                self.fd = None
+                self.held = []
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    '''holds the exclusive lock of path for a one off change, the lock file is closed again afterwards'''
+    lock = FileLock(path)
+    try:
+        with lock.exclusive():
+            yield
+    finally:
+        lock.close()
@@ -1,5 +1,7 @@
 import random
-from typing import Any
+from array import array
+from typing import Any, List
+from instrumentation import timed
 
 class ItemExistsException(Exception):
     pass
@@ -58,7 +60,98 @@ class Bucket:
 
         return prev, None
 
+EMPTY = -1 # marks an unused slot in the HashMap table
+
+
 class HashMap:
+    '''Open addressing hash map backed by flat arrays. Keys and values are kept in dense lists in insertion order,
+    the table only holds positions into those lists so there are no per entry objects'''
+    def __init__(self, size: int = 8, expectedItems: int = 0):
+        capacity = 8
+        while capacity < size or capacity * 2 < expectedItems * 3: # presize so expectedItems fit without a rebuild
+            capacity *= 2
+
+        self.table = array('l', [EMPTY]) * capacity
+        self.mask = capacity - 1
+        self.hashes = array('q')
+        self.keys: List[Any] = []
+        self.values: List[Any] = []
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def insert(self, key: Any, data: Any) -> None:
+        '''Insert key and data into the hash map, if key is already in the hashmap then nothing is changed'''
+        keyHash = hash(key)
+        slot = self.__findSlot(key, keyHash)
+        if self.table[slot] != EMPTY:
+            return # key already exists
+
+        self.table[slot] = self.size
+        self.hashes.append(keyHash)
+        self.keys.append(key)
+        self.values.append(data)
+        self.size += 1
+
+        if self.size * 3 > len(self.table) * 2: # keep the load factor under 2/3
+            self.__rebuild()
+
+    def contains(self, key: Any) -> bool:
+        '''Returns true iff the key is in the hash map, else false'''
+        return self.table[self.__findSlot(key, hash(key))] != EMPTY
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        '''returns the data stored for key, or default if the key is not in the hash map'''
+        position = self.table[self.__findSlot(key, hash(key))]
+        return default if position == EMPTY else self.values[position]
+
+    def __findSlot(self, key: Any, keyHash: int) -> int:
+        '''Linear probing, returns the slot holding key or the empty slot where it would be inserted'''
+        slot = keyHash & self.mask
+        table, hashes, keys = self.table, self.hashes, self.keys
+        while True:
+            position = table[slot]
+            if position == EMPTY or (hashes[position] == keyHash and keys[position] == key):
+                return slot
+            slot = (slot + 1) & self.mask
+
+    @timed('hashMap.rebuild')
+    def __rebuild(self):
+        '''Doubles the table, entries are reinserted from the stored hashes so keys are never rehashed'''
+        capacity = len(self.table) * 2
+        self.mask = capacity - 1
+        table = array('l', [EMPTY]) * capacity
+        for position, keyHash in enumerate(self.hashes):
+            slot = keyHash & self.mask
+            while table[slot] != EMPTY:
+                slot = (slot + 1) & self.mask
+            table[slot] = position
+        self.table = table
+
+    def copy(self) -> "HashMap":
+        '''an independent copy, the arrays and lists are copied whole so no key is rehashed'''
+        clone = HashMap.__new__(HashMap)
+        clone.table = array('l', self.table)
+        clone.mask = self.mask
+        clone.hashes = array('q', self.hashes)
+        clone.keys = list(self.keys)
+        clone.values = list(self.values)
+        clone.size = self.size
+        return clone
+
+    def valueAt(self, position: int) -> Any:
+        '''returns the data of the position'th inserted key, positions are dense so this is used for uniform sampling'''
+        return self.values[position]
+
+    def getRandomValue(self) -> Any:
+        if self.size == 0:
+            raise NotFoundException("HashMap is empty")
+        return self.values[random.randrange(self.size)]
+
+
+class ChainedHashMap:
+    '''The original separate chaining hash map, a Node object per key in linked list Buckets'''
     def __init__(self, size: int = 10):
         self.buckets = [Bucket() for _ in range(size)]
         self.bucketSize = size
@@ -70,7 +163,7 @@ class HashMap:
         try:
             self.buckets[index].insert(key, data)
         except ItemExistsException:
-            pass
+            return # nothing was added so the size stays the same
         
         self.size += 1
 
@@ -88,6 +181,7 @@ class HashMap:
     def _hash(self, key: Any):
         return hash(key) % self.bucketSize
 
+    @timed('chainedHashMap.rebuild')
     def __rebuild(self):
         '''Resizes the hash map list, creating a new list twice the size of the previous.'''
         self.bucketSize = self.bucketSize * 2
@@ -112,7 +206,3 @@ class HashMap:
         for _ in range(rand_index):
             current = current.next
         return current.data
-
-
-                    
-        
\ No newline at end of file
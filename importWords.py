@@ -0,0 +1,214 @@
+'''Bulk import of external word lists into the word bank, streamed line by line so lists much larger than memory work.
+
+    python importWords.py newWords.txt more.txt --min 3 --max 8
+    cat list.txt | python importWords.py - --dedupe bloom
+    python importWords.py --clean-bank
+    python importWords.py --export words5.txt --min 5 --max 5
+
+Every word is stripped and lower cased, words outside the length range or with characters outside the alphabet are
+dropped and words already in the bank (or earlier in the import) are skipped, with an exact set or a Bloom filter.
+The new bank is written to a temp file in large chunks and swapped in with one rename, so nothing ever reads a half
+written bank, and the word index is rebuilt the next time the game starts. Throughput and peak memory are reported'''
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+from bloomFilter import BloomFilter
+from fileLock import locked
+
+try:
+    import resource
+except ImportError: # not on windows
+    resource = None
+
+BANK_PATH = 'wordBankLarge.txt'
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz'
+CHUNK_WORDS = 65536 # words per write
+AVERAGE_LINE = 9 # bytes, to size the Bloom filter from the file sizes
+
+
+def readWords(paths: Iterable[str]) -> Iterator[str]:
+    '''every non empty line of the files (- is stdin), stripped and lower cased'''
+    for path in paths:
+        file = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8', errors='replace')
+        try:
+            for line in file:
+                word = line.strip().lower()
+                if word:
+                    yield word
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+
+def asciiLetters(value: str) -> str:
+    '''argparse type of --alphabet, lower cased. The bank and its index only hold ascii, other letters would be written as ?'''
+    letters = value.lower()
+    if not (letters.isascii() and letters.isalpha()):
+        raise argparse.ArgumentTypeError(f'{value!r}: the alphabet can only have the letters a-z')
+    return letters
+
+
+class WordFilter:
+    '''accepts the words of a length range that only use letters of the alphabet, which has to be ascii letters'''
+    def __init__(self, minLength: int = 3, maxLength: int = 8, alphabet: str = ALPHABET) -> None:
+        if not (alphabet.isascii() and alphabet.isalpha()):
+            raise ValueError(f'{alphabet!r}: the alphabet can only have the letters a-z')
+        self.minLength = minLength
+        self.maxLength = maxLength
+        self.deleteAlphabet = str.maketrans('', '', alphabet) # a word is valid iff nothing is left after deleting its letters
+
+    def accepts(self, word: str) -> bool:
+        return self.minLength <= len(word) <= self.maxLength and not word.translate(self.deleteAlphabet)
+
+
+class SeenSet:
+    '''exact dedupe, same addIfNew api as BloomFilter'''
+    def __init__(self) -> None:
+        self.items = set()
+
+    def addIfNew(self, item: str) -> bool:
+        if item in self.items:
+            return False
+        self.items.add(item)
+        return True
+
+
+class ChunkedWriter:
+    '''buffers lines and writes them CHUNK_WORDS at a time'''
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+        self.pending: List[str] = []
+        self.written = 0
+
+    def write(self, word: str) -> None:
+        self.pending.append(word)
+        if len(self.pending) >= CHUNK_WORDS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.file.write('\n'.join(self.pending) + '\n')
+            self.written += len(self.pending)
+            self.pending = []
+
+
+def makeDeduper(kind: str, expectedItems: int, errorRate: float):
+    return BloomFilter(expectedItems, errorRate) if kind == 'bloom' else SeenSet()
+
+
+def estimateWords(paths: Iterable[str]) -> int:
+    '''rough word count of files from their sizes, stdin counts as a million words'''
+    total = 0
+    for path in paths:
+        total += 1000000 if path == '-' else os.path.getsize(path) // AVERAGE_LINE
+    return total
+
+
+def _swapIn(tempPath: str, path: str, dryRun: bool) -> None:
+    if dryRun:
+        os.remove(tempPath)
+    else:
+        os.replace(tempPath, path)
+
+
+def importWords(sources: List[str], bankPath: str = BANK_PATH, wordFilter: Optional[WordFilter] = None,
+                dedupe: str = 'set', errorRate: float = 0.001, cleanBank: bool = False, dryRun: bool = False) -> Dict[str, int]:
+    '''streams the bank and then the sources into a new bank file and swaps it in, returns the counts.
+    Bank words are only lower cased unless cleanBank is set, then the filter and dedupe apply to them too.
+    With the Bloom filter a duplicate bank word is kept rather than risk dropping a word that only looks like one'''
+    wordFilter = wordFilter or WordFilter()
+    seen = makeDeduper(dedupe, estimateWords([bankPath] + sources), errorRate)
+    stats = {"bankWords": 0, "bankDropped": 0, "read": 0, "added": 0, "duplicates": 0, "rejected": 0}
+
+    with locked(bankPath): # a word a game appends meanwhile would be lost in the swap
+        tempPath = bankPath + '.tmp'
+        with open(tempPath, 'w', encoding='ascii', errors='replace') as file:
+            writer = ChunkedWriter(file)
+            for word in readWords([bankPath]):
+                isNew = seen.addIfNew(word)
+                if cleanBank and (not wordFilter.accepts(word) or not isNew and dedupe == 'set'):
+                    stats["bankDropped"] += 1
+                    continue
+                writer.write(word)
+                stats["bankWords"] += 1
+
+            for word in readWords(sources):
+                stats["read"] += 1
+                if not wordFilter.accepts(word):
+                    stats["rejected"] += 1
+                elif not seen.addIfNew(word):
+                    stats["duplicates"] += 1
+                else:
+                    writer.write(word)
+                    stats["added"] += 1
+            writer.flush()
+            file.flush()
+            os.fsync(file.fileno())
+        _swapIn(tempPath, bankPath, dryRun)
+    return stats
+
+
+def exportWords(outPath: str, bankPath: str = BANK_PATH, wordFilter: Optional[WordFilter] = None,
+                dedupe: str = 'set', errorRate: float = 0.001) -> Dict[str, int]:
+    '''writes the bank's words that pass the filter to outPath, lower cased and without duplicates'''
+    wordFilter = wordFilter or WordFilter()
+    seen = makeDeduper(dedupe, estimateWords([bankPath]), errorRate)
+    stats = {"read": 0, "exported": 0}
+
+    tempPath = outPath + '.tmp'
+    with open(tempPath, 'w', encoding='ascii', errors='replace') as file:
+        writer = ChunkedWriter(file)
+        for word in readWords([bankPath]):
+            stats["read"] += 1
+            if wordFilter.accepts(word) and seen.addIfNew(word):
+                writer.write(word)
+                stats["exported"] += 1
+        writer.flush()
+    _swapIn(tempPath, outPath, False)
+    return stats
+
+
+def peakMemory() -> str:
+    '''peak resident memory of the process'''
+    if resource is None:
+        return 'n/a'
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return f'{peak / (1024 * 1024 if sys.platform == "darwin" else 1024):.1f} MiB' # bytes on macos, KiB elsewhere
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, int]:
+    parser = argparse.ArgumentParser(description='Import word lists into the word bank, or export it')
+    parser.add_argument('sources', nargs='*', help='word list files, one word per line, - for stdin')
+    parser.add_argument('--bank', default=BANK_PATH)
+    parser.add_argument('--min', type=int, default=3, dest='minLength', help='shortest word length kept')
+    parser.add_argument('--max', type=int, default=8, dest='maxLength', help='longest word length kept')
+    parser.add_argument('--alphabet', type=asciiLetters, default=ALPHABET, help='the letters a word may use, a-z only')
+    parser.add_argument('--dedupe', choices=['set', 'bloom'], default='set', help='exact set, or a Bloom filter for lists that do not fit in memory')
+    parser.add_argument('--error-rate', type=float, default=0.001, help='Bloom filter false positive rate')
+    parser.add_argument('--clean-bank', action='store_true', help='also filter and dedupe the words already in the bank')
+    parser.add_argument('--export', metavar='PATH', help='write the filtered bank to PATH instead of importing')
+    parser.add_argument('--dry-run', action='store_true', help='count everything but leave the bank as it is')
+    args = parser.parse_args(argv)
+
+    wordFilter = WordFilter(args.minLength, args.maxLength, args.alphabet)
+    start = time.perf_counter()
+    if args.export:
+        stats = exportWords(args.export, args.bank, wordFilter, args.dedupe, args.error_rate)
+        processed = stats["read"]
+    else:
+        stats = importWords(args.sources, args.bank, wordFilter, args.dedupe, args.error_rate, args.clean_bank, args.dry_run)
+        processed = stats["bankWords"] + stats["bankDropped"] + stats["read"]
+    elapsed = time.perf_counter() - start
+
+    for name, count in stats.items():
+        print(f'   {name:<12}: {count:12,d}')
+    print(f'   {"seconds":<12}: {elapsed:12.2f}')
+    print(f'   {"words/sec":<12}: {processed / elapsed if elapsed else 0:12,.0f}')
+    print(f'   {"peak memory":<12}: {peakMemory():>12}')
+    return stats
+
+
+if __name__ == '__main__':
+    main()
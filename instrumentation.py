@@ -0,0 +1,192 @@
+'''Opt in timers and counters for the hot paths of the engine, the word sets, the user store and the UI.
+
+    WORDLE_PROFILE=1 python main.py                 (or python main.py --profile)
+    WORDLE_PROFILE=1 WORDLE_PROFILE_INTERVAL=5 python server.py
+    python main.py --profile-session session.prof   (cProfile of the whole session, read it with python -m pstats session.prof)
+
+When it is off, timed returns the function it decorates unchanged and increment returns straight away, so the
+only cost is one flag check per counter. When it is on every call is timed into a log scale histogram (bounded
+memory however long the session) and a report of counts, p50, p99 and max per timer is written to
+wordleProfile.txt every WORDLE_PROFILE_INTERVAL seconds and when the process exits. The report goes to a file so
+it never draws over the game. Decorators are applied at import time, so enable() must run before the modules
+that use them are imported, main.py does that for --profile'''
+import atexit
+import cProfile
+import functools
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+REPORT_PATH = 'wordleProfile.txt'
+BUCKETS_PER_OCTAVE = 8 # histogram resolution, a percentile is off by at most 2 ** (1 / 8), about 9%
+
+ENABLED = os.environ.get('WORDLE_PROFILE', '') not in ('', '0')
+
+
+class Histogram:
+    '''Counts of durations in log scale buckets, percentiles are read back as the bucket's upper bound'''
+    def __init__(self) -> None:
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        bucket = math.ceil(math.log2(seconds) * BUCKETS_PER_OCTAVE) if seconds > 0 else -1000
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        '''the duration fraction of the calls took at most, in seconds'''
+        wanted = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= wanted:
+                return min(self.max, 2 ** (bucket / BUCKETS_PER_OCTAVE))
+        return self.max
+
+
+_lock = threading.Lock() # timers are hit from the server's threads and the bank watcher too
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, int] = {}
+_reporter: Optional["Reporter"] = None
+_session: Optional[cProfile.Profile] = None
+
+
+def enable(interval: Optional[float] = None, path: str = REPORT_PATH) -> None:
+    '''turns the timers on and starts the periodic report, call it before importing the instrumented modules'''
+    global ENABLED, _reporter
+    ENABLED = True
+    if _reporter is None:
+        if interval is None:
+            interval = float(os.environ.get('WORDLE_PROFILE_INTERVAL', '10'))
+        _reporter = Reporter(interval, path)
+        _reporter.start()
+        atexit.register(_reporter.stop)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    '''decorator that records the duration of every call under name, it leaves the function as it is when disabled'''
+    def decorate(function: Callable) -> Callable:
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def record(name: str, seconds: float) -> None:
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def increment(name: str, amount: int = 1) -> None:
+    '''adds to a counter, nothing happens when disabled'''
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def snapshot() -> Dict[str, Dict[str, float]]:
+    '''count, total, p50, p99 and max (seconds) of every timer and the value of every counter'''
+    with _lock:
+        timers = {name: {"count": histogram.count, "total": histogram.total, "p50": histogram.percentile(0.5),
+                         "p99": histogram.percentile(0.99), "max": histogram.max}
+                  for name, histogram in _histograms.items()}
+        counters = dict(_counters)
+    return {"timers": timers, "counters": counters}
+
+
+def report() -> str:
+    '''the snapshot as a table, timers sorted by total time'''
+    current = snapshot()
+    lines = [f'{"timer":<32}{"count":>10}{"total ms":>12}{"p50 us":>10}{"p99 us":>10}{"max us":>10}']
+    for name, timer in sorted(current["timers"].items(), key=lambda item: -item[1]["total"]):
+        lines.append(f'{name:<32}{timer["count"]:>10,d}{timer["total"] * 1e3:>12.1f}'
+                     f'{timer["p50"] * 1e6:>10.1f}{timer["p99"] * 1e6:>10.1f}{timer["max"] * 1e6:>10.1f}')
+    if current["counters"]:
+        lines.append('')
+        lines.append(f'{"counter":<32}{"value":>10}')
+        for name, value in sorted(current["counters"].items()):
+            lines.append(f'{name:<32}{value:>10,d}')
+    return '\n'.join(lines) + '\n'
+
+
+def dump(path: str = REPORT_PATH) -> None:
+    '''writes the report to path, through a temp file so a reader never sees half of it'''
+    tempPath = path + '.tmp'
+    with open(tempPath, 'w') as file:
+        file.write(time.strftime('%Y-%m-%d %H:%M:%S\n'))
+        file.write(report())
+    os.replace(tempPath, path)
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+class Reporter(threading.Thread):
+    '''writes the report every interval seconds and once more when stopped'''
+    def __init__(self, interval: float, path: str) -> None:
+        super().__init__(name='profileReporter', daemon=True)
+        self.interval = interval
+        self.path = path
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            dump(self.path)
+
+    def stop(self) -> None:
+        self.stopped.set()
+        dump(self.path)
+
+
+def startSession() -> None:
+    '''starts a cProfile of everything this thread runs from now on'''
+    global _session
+    _session = cProfile.Profile()
+    _session.enable()
+
+
+def stopSession(path: str) -> None:
+    '''stops the session profile and writes it to path in pstats format (python -m pstats path, or snakeviz path)'''
+    global _session
+    if _session is not None:
+        _session.disable()
+        _session.dump_stats(path)
+        _session = None
+
+
+def parseFlags(argv: List[str]) -> Optional[str]:
+    '''handles --profile and --profile-session PATH, returns the session path if there is one'''
+    if '--profile' in argv:
+        enable()
+    if '--profile-session' in argv:
+        position = argv.index('--profile-session')
+        if position + 1 < len(argv):
+            return argv[position + 1]
+    return None
+
+
+if ENABLED: # turned on by the environment variable
+    enable()
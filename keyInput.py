@@ -0,0 +1,139 @@
+import os
+import select
+import sys
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, TextIO
+from feedback import ABSENT, CORRECT, MISPLACED, GREEN, YELLOW, RESET, decodeFeedback
+
+try:
+    import termios
+    import tty
+except ImportError: # windows, the UI falls back to input()
+    termios = None
+
+ENTER = 'enter'
+BACKSPACE = 'backspace'
+ESCAPE = 'escape'
+TAB = 'tab'
+GREY = '\033[90m'
+KEYBOARD_ROWS = ('qwertyuiop', 'asdfghjkl', 'zxcvbnm')
+
+
+class KeyEvent:
+    '''one key press, time is when it was read so the time until the screen shows it can be measured'''
+    __slots__ = ('key', 'time')
+
+    def __init__(self, key: str, time: float) -> None:
+        self.key = key
+        self.time = time
+
+
+def decodeKeys(data: str, now: float) -> List[KeyEvent]:
+    '''turns the characters of one read into key events, escape sequences (arrow keys and so on) are dropped'''
+    events = []
+    i = 0
+    while i < len(data):
+        character = data[i]
+        if character == '\x1b':
+            if i + 1 < len(data) and data[i + 1] in '[O': # skip to the final letter of the sequence
+                i += 2
+                while i < len(data) and not data[i].isalpha() and data[i] != '~':
+                    i += 1
+            else:
+                events.append(KeyEvent(ESCAPE, now))
+        elif character in '\r\n':
+            events.append(KeyEvent(ENTER, now))
+        elif character in '\x7f\x08':
+            events.append(KeyEvent(BACKSPACE, now))
+        elif character == '\t':
+            events.append(KeyEvent(TAB, now))
+        elif character.isprintable():
+            events.append(KeyEvent(character, now))
+        i += 1
+    return events
+
+
+class KeyReader:
+    '''Reads single key presses from a terminal in cbreak mode (no line buffering, no echo, ctrl-c still works).
+    Use it as a context manager around the reads, the terminal is put back the way it was on exit.
+    Keys that arrive together are queued and handed out one at a time'''
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdin
+        self.fd = self.stream.fileno()
+        self.queue: Deque[KeyEvent] = deque()
+        self.savedMode = None
+        self.latencyCount = 0
+        self.totalLatency = 0.0
+        self.lastLatency = 0.0
+        self.maxLatency = 0.0
+
+    @staticmethod
+    def supported(stream: Optional[TextIO] = None) -> bool:
+        '''true iff single keys can be read, so termios exists and the stream is a terminal'''
+        stream = stream if stream is not None else sys.stdin
+        try:
+            return termios is not None and stream.isatty()
+        except (AttributeError, ValueError):
+            return False
+
+    def __enter__(self) -> "KeyReader":
+        self.savedMode = termios.tcgetattr(self.fd)
+        tty.setcbreak(self.fd, termios.TCSANOW)
+        return self
+
+    def __exit__(self, *exception) -> None:
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.savedMode)
+        self.queue.clear()
+
+    def poll(self, timeout: Optional[float] = None) -> Optional[KeyEvent]:
+        '''the next key press, waits up to timeout seconds (forever when None), None if nothing was pressed'''
+        if not self.queue:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return None
+            data = os.read(self.fd, 64).decode('utf-8', 'ignore')
+            self.queue.extend(decodeKeys(data, time.perf_counter()))
+        return self.queue.popleft() if self.queue else None
+
+    def rendered(self, event: KeyEvent) -> None:
+        '''call once the screen shows the effect of event, records the key press to render latency'''
+        latency = time.perf_counter() - event.time
+        self.latencyCount += 1
+        self.totalLatency += latency
+        self.lastLatency = latency
+        self.maxLatency = max(self.maxLatency, latency)
+
+    def averageLatency(self) -> float:
+        return self.totalLatency / self.latencyCount if self.latencyCount else 0
+
+
+class KeyboardState:
+    '''What the player knows about every letter, shown as an on screen keyboard. A letter keeps the best state any
+    guess gave it (correct over misplaced over not in the word), so every guess only updates its own letters'''
+
+    def __init__(self) -> None:
+        self.states: Dict[str, int] = {}
+        self.rendered: List[str] = [self.__renderRow(row) for row in range(len(KEYBOARD_ROWS))] # only rows with a changed letter are rebuilt
+
+    def update(self, guess: str, code: int) -> None:
+        '''folds the feedback code of one guess into the keyboard'''
+        changedRows = set()
+        for letter, digit in zip(guess.lower(), decodeFeedback(code, len(guess))):
+            if digit > self.states.get(letter, -1):
+                self.states[letter] = digit
+                changedRows.update(row for row, letters in enumerate(KEYBOARD_ROWS) if letter in letters)
+        for row in changedRows:
+            self.rendered[row] = self.__renderRow(row)
+
+    def __renderRow(self, row: int) -> str:
+        colours = {ABSENT: GREY, MISPLACED: YELLOW, CORRECT: GREEN}
+        keys = []
+        for letter in KEYBOARD_ROWS[row]:
+            state = self.states.get(letter)
+            keys.append(letter.upper() if state is None else f'{colours[state]}{letter.upper()}{RESET}')
+        return ' ' * row + ' '.join(keys) # each row is indented one more like a real keyboard
+
+    def lines(self) -> List[str]:
+        return self.rendered
@@ -0,0 +1,54 @@
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+
+class LazyWordSets(dict):
+    '''word length -> word set, a length is loaded by loader(length) the first time it is looked up.
+    loader returns None for a length without words, those lookups raise KeyError like a plain dict.
+    Loading happens under lock (the engine's word bank lock) so two threads never load the same length twice'''
+
+    def __init__(self, loader: Callable[[int], Any], lock: threading.RLock) -> None:
+        super().__init__()
+        self.loader = loader
+        self.lock = lock
+        self.missing = set() # lengths the loader had no words for
+
+    def __missing__(self, length: int) -> Any:
+        with self.lock:
+            if dict.__contains__(self, length): # loaded by another thread while this one waited for the lock
+                return dict.__getitem__(self, length)
+            if length in self.missing:
+                raise KeyError(length)
+            wordSet = self.loader(length)
+            if wordSet is None:
+                self.missing.add(length)
+                raise KeyError(length)
+            self[length] = wordSet
+            return wordSet
+
+    def get(self, length: int, default: Any = None) -> Any:
+        try:
+            return self[length]
+        except KeyError:
+            return default
+
+    def copy(self) -> "LazyWordSets":
+        '''the loaded lengths are shared, the rest are loaded by the copy when asked for'''
+        clone = LazyWordSets(self.loader, self.lock)
+        clone.update(self)
+        clone.missing = set(self.missing)
+        return clone
+
+    def prefetch(self, lengths: Iterable[int], after: Optional[Callable[[int], Any]] = None) -> threading.Thread:
+        '''loads lengths one by one on a daemon thread and calls after(length) for each, returns the started thread'''
+        def run() -> None:
+            for length in lengths:
+                if self.get(length) is not None and after is not None:
+                    after(length)
+
+        thread = threading.Thread(target=run, name='wordSetPrefetch', daemon=True)
+        thread.start()
+        return thread
+
+    def loadedLengths(self) -> List[int]:
+        return sorted(dict.keys(self))
@@ -0,0 +1,126 @@
+import json
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+from userStorage import UserStore, scoreOf, writeJsonAtomic
+
+OVERALL = 'all' # board key of the scores over every word length
+
+
+def boardKey(wordLength: Optional[int] = None, day: Optional[str] = None) -> str:
+    '''key of the board overall or of one word length, daily challenge boards are prefixed with their iso date'''
+    key = OVERALL if wordLength is None else str(wordLength)
+    return key if day is None else f'{day}/{key}'
+
+
+class RankedBoard:
+    '''Best score of every player on one board, kept sorted so the top players and ranks are a slice or a bisect away'''
+    def __init__(self, bests: Optional[Dict[str, float]] = None) -> None:
+        self.bests: Dict[str, float] = bests or {}
+        self.order: List[Tuple[float, str]] = sorted((-score, name) for name, score in self.bests.items()) # best first, ties by name
+
+    def offer(self, name: str, score: float) -> bool:
+        '''records a score of the player, true is returned iff it is the player's new best'''
+        old = self.bests.get(name)
+        if old is not None and score <= old:
+            return False
+        if old is not None:
+            del self.order[bisect_left(self.order, (-old, name))]
+        insort(self.order, (-score, name))
+        self.bests[name] = score
+        return True
+
+    def top(self, count: int) -> List[Tuple[str, float]]:
+        return [(name, -negativeScore) for negativeScore, name in self.order[:count]]
+
+    def rank(self, name: str) -> Optional[int]:
+        '''1 based rank of the player, None if they have no score on this board'''
+        if name not in self.bests:
+            return None
+        return bisect_left(self.order, (-self.bests[name], name)) + 1
+
+    def best(self) -> float:
+        return -self.order[0][0] if self.order else 0
+
+
+class Leaderboard:
+    '''Top players overall and per word length, updated with every record and saved to disk so start up never rescans history.
+    The saved file is only trusted when it has seen as many records as the store holds, otherwise it is rebuilt in one pass'''
+    def __init__(self, path: str = 'leaderboard.json', saveEvery: int = 500) -> None:
+        self.path = path
+        self.saveEvery = saveEvery
+        self.boards: Dict[str, RankedBoard] = {}
+        self.recordsSeen = 0
+        self.storeName = ''
+        self.unsaved = 0
+
+    @classmethod
+    def open(cls, store: UserStore, path: str = 'leaderboard.json') -> "Leaderboard":
+        '''loads the saved leaderboard of the store, or rebuilds it from the store's records if it is missing or out of date'''
+        leaderboard = cls(path)
+        leaderboard.storeName = type(store).__name__
+        if not leaderboard.__load(store.totalRecords()):
+            leaderboard.rebuild(store)
+        return leaderboard
+
+    def __load(self, totalRecords: int) -> bool:
+        try:
+            with open(self.path, 'r') as file:
+                data: Dict[str, Any] = json.load(file)
+        except (OSError, ValueError):
+            return False
+        if data.get("store") != self.storeName or data.get("records") != totalRecords:
+            return False
+        self.boards = {key: RankedBoard(bests) for key, bests in data["boards"].items()}
+        self.recordsSeen = totalRecords
+        return True
+
+    def rebuild(self, store: UserStore) -> None:
+        '''recomputes every board with a single streaming pass over the store'''
+        self.boards = {}
+        self.recordsSeen = 0
+        for name, record in store.iterAllRecords():
+            self.__offer(name, record)
+        self.save()
+
+    def __offer(self, name: str, record: Dict[str, Any]) -> None:
+        score = scoreOf(record)
+        keys = [OVERALL, str(record.get("wordLength"))]
+        day = record.get("daily")
+        if day: # a daily challenge game also counts on the boards of its day
+            keys += [boardKey(None, day), boardKey(record.get("wordLength"), day)]
+        for key in keys:
+            board = self.boards.get(key)
+            if board is None:
+                board = self.boards[key] = RankedBoard()
+            board.offer(name, score)
+        self.recordsSeen += 1
+
+    def addRecord(self, name: str, record: Dict[str, Any]) -> None:
+        '''updates the boards with a record that was just added to the store'''
+        self.__offer(name, record)
+        self.unsaved += 1
+        if self.unsaved >= self.saveEvery:
+            self.save()
+
+    def top(self, count: int = 10, wordLength: Optional[int] = None, day: Optional[str] = None) -> List[Tuple[str, float]]:
+        '''the count best (name, score) pairs overall or for one word length, of all time or of one daily challenge day'''
+        board = self.boards.get(boardKey(wordLength, day))
+        return board.top(count) if board else []
+
+    def rank(self, name: str, wordLength: Optional[int] = None, day: Optional[str] = None) -> Optional[int]:
+        board = self.boards.get(boardKey(wordLength, day))
+        return board.rank(name) if board else None
+
+    def best(self, wordLength: Optional[int] = None, day: Optional[str] = None) -> float:
+        board = self.boards.get(boardKey(wordLength, day))
+        return board.best() if board else 0
+
+    def hasPlayed(self, name: str, wordLength: int, day: str) -> bool:
+        '''true iff the player already has a result for the daily challenge of that length and day'''
+        board = self.boards.get(boardKey(wordLength, day))
+        return board is not None and name in board.bests
+
+    def save(self) -> None:
+        boards = {key: board.bests for key, board in self.boards.items()}
+        writeJsonAtomic(self.path, {"store": self.storeName, "records": self.recordsSeen, "boards": boards})
+        self.unsaved = 0
@@ -1,5 +1,13 @@
-from UI import UI
+import sys
+import instrumentation
 
 if __name__ == '__main__':
-    UI().gameMenu()
-    
+    sessionPath = instrumentation.parseFlags(sys.argv[1:]) # before the game modules are imported, their timers are set up on import
+    from UI import UI
+    if sessionPath:
+        instrumentation.startSession()
+    try:
+        UI().gameMenu()
+    finally:
+        if sessionPath:
+            instrumentation.stopSession(sessionPath)
@@ -0,0 +1,85 @@
+import os
+import re
+import shutil
+import sys
+import time
+import unicodedata
+from typing import List, Optional, TextIO
+
+CLEAR = '\033[H\033[2J' # cursor home and erase the screen, no clear subprocess needed
+ANSI = re.compile(r'\033\[[0-9;]*[A-Za-z]')
+
+
+def visibleWidth(line: str) -> int:
+    '''columns the line takes on the terminal, colour codes take none and wide characters like emoji take two'''
+    line = ANSI.sub('', line)
+    if line.isascii():
+        return len(line)
+    width = 0
+    for character in line:
+        if unicodedata.combining(character) or character == '\ufe0f':
+            continue
+        width += 2 if unicodedata.east_asian_width(character) in 'WF' else 1
+    return width
+
+
+class Screen:
+    '''Virtual copy of what is on the terminal. Every frame only the lines that differ from the last frame are rewritten,
+    with cursor moves, and the whole frame goes out in one write. The last line is the input prompt and is always rewritten
+    so the cursor ends up right after it and whatever the user typed there last time is erased'''
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.lines: List[str] = [] # what the terminal shows now, empty forces a full redraw
+        self.size = (0, 0)
+        self.frames = 0
+        self.fullFrames = 0
+        self.bytesWritten = 0
+        self.totalFrameTime = 0.0
+        self.lastFrameTime = 0.0
+        self.maxFrameTime = 0.0
+        if os.name == 'nt':
+            os.system('') # turns on ansi escape handling in the windows console
+
+    def render(self, text: str) -> None:
+        '''draws text as the new frame, the cursor is left at the end of its last line'''
+        start = time.perf_counter()
+        lines = text.split('\n')
+        size = shutil.get_terminal_size()
+
+        # the row a line is on is only known while nothing wraps or scrolls, otherwise the frame is drawn from scratch
+        # (a line that is unchanged since the last frame was already measured then)
+        old = self.lines
+        if (not old or size != self.size or len(lines) >= size.lines
+                or any(visibleWidth(line) >= size.columns for row, line in enumerate(lines) if row >= len(old) or old[row] != line)):
+            frame = CLEAR + text
+            self.fullFrames += 1
+        else:
+            parts = []
+            last = len(lines) - 1
+            for row, line in enumerate(lines[:last]):
+                if row >= len(self.lines) - 1 or self.lines[row] != line: # the old prompt row always changes, the user typed on it
+                    parts.append(f'\033[{row + 1};1H{line}\033[K')
+            if len(lines) < len(self.lines): # the old frame was longer, wipe what is left of it
+                parts.append(f'\033[{len(lines) + 1};1H\033[J')
+            parts.append(f'\033[{last + 1};1H{lines[last]}\033[K')
+            frame = ''.join(parts)
+
+        self.stream.write(frame)
+        self.stream.flush()
+        self.lines = lines
+        self.size = size
+
+        elapsed = time.perf_counter() - start
+        self.frames += 1
+        self.bytesWritten += len(frame.encode('utf-8'))
+        self.totalFrameTime += elapsed
+        self.lastFrameTime = elapsed
+        self.maxFrameTime = max(self.maxFrameTime, elapsed)
+
+    def invalidate(self) -> None:
+        '''the next frame is drawn in full, for when something else wrote to the terminal'''
+        self.lines = []
+
+    def averageFrameTime(self) -> float:
+        return self.totalFrameTime / self.frames if self.frames else 0
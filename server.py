@@ -0,0 +1,246 @@
+'''Multiplayer server, hosts many wordle sessions over a line based TCP protocol with one shared WordleEngine and Users store.
+
+    python server.py --host 127.0.0.1 --port 7777
+
+Every request is one line, every reply is one line:
+    LOGIN <name>              -> OK LOGIN <name>              (the user is created if it does not exist)
+    NEW <length> <guesses>    -> OK NEW <length> <guesses>
+    GUESS <word>              -> HINT <digits> <guesses left>  (one digit per letter: 2 correct, 1 misplaced, 0 not in word)
+                                 WIN <guesses needed> <score> | LOSE <secret>   when the game is over
+    QUIT                      -> BYE
+Anything that goes wrong is answered with ERR <message>'''
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from feedback import decodeFeedback
+from users import Users, userNameExists, invalidUserName
+from wordBankWatcher import WordBankWatcher
+from wordleEngine import WordleEngine, NoWordExists, wordNotInDict
+
+
+class GameSession:
+    '''State of one connection, slots keep it small when there are thousands of them'''
+    __slots__ = ('userName', 'secret', 'length', 'guessesAllowed', 'guessesUsed', 'guessWords')
+
+    def __init__(self) -> None:
+        self.userName: Optional[str] = None
+        self.secret: Optional[str] = None
+        self.length = 0
+        self.guessesAllowed = 0
+        self.guessesUsed = 0
+        self.guessWords: List[str] = [] # kept for the game's transcript
+
+
+class RecordBatcher:
+    '''Collects new users and finished games and writes them to Users in batches on one worker thread, so neither a
+    login nor a game ever waits on the disk on the event loop. Everything that touches the store runs on that worker'''
+    def __init__(self, users: Users, interval: float = 0.5, maxBatch: int = 1000) -> None:
+        self.users = users
+        self.interval = interval
+        self.maxBatch = maxBatch
+        self.pending: List[Tuple] = []
+        self.newUsers: Dict[str, asyncio.Future] = {} # user name -> future set when the user is written
+        self.wakeUp = asyncio.Event()
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix='store') # one writer keeps Users single threaded
+
+    def add(self, game: Tuple) -> None:
+        self.pending.append(game)
+        if len(self.pending) >= self.maxBatch:
+            self.wakeUp.set()
+
+    async def addUser(self, userName: str) -> None:
+        '''creates the user with the next flush, which starts right away. Logins that come in while a flush is
+        running share the one after it, so a burst of new users costs one write. invalidUserName is raised here'''
+        future = self.newUsers.get(userName)
+        if future is None:
+            future = self.newUsers[userName] = asyncio.get_running_loop().create_future()
+            self.wakeUp.set()
+        await asyncio.shield(future)
+
+    def __write(self, userNames: List[str], games: List[Tuple]) -> Dict[str, Exception]:
+        '''runs on the worker: the users and games go out in one store batch, then what other processes wrote is merged.
+        Returns the errors of the users that could not be made'''
+        errors: Dict[str, Exception] = {}
+        with self.users.store.batch():
+            for userName in userNames:
+                try:
+                    self.users.addNewUser(userName)
+                except userNameExists:
+                    pass # made by another process since the last refresh
+                except invalidUserName as error:
+                    errors[userName] = error
+            if games:
+                self.users.addNewRecords(games)
+        self.users.refresh()
+        return errors
+
+    def flush(self) -> None:
+        '''writes what is waiting from the calling thread, only once the worker is shut down'''
+        if self.pending:
+            batch, self.pending = self.pending, []
+            self.users.addNewRecords(batch)
+
+    async def run(self) -> None:
+        '''flushes every interval seconds, or sooner when a full batch or a new user is waiting. Users and records other
+        processes wrote to the store are merged on the same beat, so the server's leaderboard follows games played elsewhere'''
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await asyncio.wait_for(self.wakeUp.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeUp.clear()
+            newUsers, self.newUsers = self.newUsers, {}
+            games, self.pending = self.pending, []
+            try:
+                errors = await loop.run_in_executor(self.worker, self.__write, list(newUsers), games)
+            except Exception as error: # the store failed, the logins waiting on it get the error
+                print(f'writing to the user store failed: {error!r}', flush=True)
+                errors = {userName: error for userName in newUsers}
+            for userName, future in newUsers.items():
+                if userName in errors:
+                    future.set_exception(errors[userName])
+                else:
+                    future.set_result(None)
+
+    def close(self) -> None:
+        '''waits for the write in progress and writes the games that are left'''
+        self.worker.shutdown(wait=True)
+        self.flush()
+
+
+class WordleServer:
+    def __init__(self, engine: WordleEngine, users: Users) -> None:
+        self.engine = engine
+        self.users = users
+        self.batcher = RecordBatcher(users)
+        self.sessions = 0
+        self.players: Dict[str, int] = {} # user name -> connections logged in as them
+
+    def __join(self, session: GameSession, userName: str) -> None:
+        if session.userName is not None:
+            self.__leave(session)
+        session.userName = userName
+        self.players[userName] = self.players.get(userName, 0) + 1
+
+    def __leave(self, session: GameSession) -> None:
+        '''once a player's last connection is gone their no repeat decks are dropped, or every bot ever seen would keep its decks'''
+        connections = self.players.pop(session.userName) - 1
+        if connections:
+            self.players[session.userName] = connections
+        else:
+            self.engine.sampler.forget(session.userName)
+        session.userName = None
+
+    async def handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        session = GameSession()
+        self.sessions += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+                reply = await self.handleCommand(session, command.upper(), argument.strip())
+                writer.write(reply.encode() + b'\n')
+                if reply == 'BYE':
+                    break
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions -= 1
+            if session.userName is not None:
+                self.__leave(session)
+            writer.close()
+
+    async def handleCommand(self, session: GameSession, command: str, argument: str) -> str:
+        '''runs one protocol command and returns the reply line, only a new user's LOGIN waits (on the batcher)'''
+        if command == 'LOGIN':
+            if argument not in self.users.usersDict:
+                try:
+                    await self.batcher.addUser(argument)
+                except invalidUserName as error:
+                    return f'ERR {error}'
+            self.__join(session, argument)
+            return f'OK LOGIN {argument}'
+
+        if command == 'NEW':
+            if session.userName is None:
+                return 'ERR log in first'
+            parts = argument.split()
+            if len(parts) != 2 or not self.engine.validateWordLength(parts[0]) or not self.engine.validateGuessCount(parts[1]):
+                return 'ERR usage: NEW <length 3-8> <guesses 1-10>'
+            try:
+                session.secret = self.engine.getWord(int(parts[0]), session.userName)
+            except NoWordExists:
+                return 'ERR no words of that length'
+            session.length, session.guessesAllowed, session.guessesUsed = int(parts[0]), int(parts[1]), 0
+            session.guessWords = []
+            return f'OK NEW {parts[0]} {parts[1]}'
+
+        if command == 'GUESS':
+            return self.__guess(session, argument.lower())
+
+        if command == 'QUIT':
+            return 'BYE'
+        return 'ERR unknown command'
+
+    def __guess(self, session: GameSession, word: str) -> str:
+        if session.secret is None:
+            return 'ERR start a game with NEW first'
+        try:
+            if not self.engine.validateGuess(word, session.length):
+                return f'ERR guess must be {session.length} letters'
+        except wordNotInDict:
+            return 'ERR not in word bank'
+
+        code = self.engine.generateFeedbackCode(session.secret, word)
+        session.guessesUsed += 1
+        session.guessWords.append(word)
+        isWinner = self.engine.isWinningCode(code, session.length)
+        if not isWinner and session.guessesUsed < session.guessesAllowed:
+            digits = ''.join(str(digit) for digit in decodeFeedback(code, session.length))
+            return f'HINT {digits} {session.guessesAllowed - session.guessesUsed}'
+
+        self.batcher.add((session.userName, session.length, session.guessesAllowed, session.guessesUsed, isWinner,
+                          None, session.secret, session.guessWords))
+        secret, session.secret = session.secret, None
+        if isWinner:
+            return f'WIN {session.guessesUsed} {session.length ** 2 / session.guessesUsed:.3f}'
+        return f'LOSE {secret}'
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.handleClient, host, port, backlog=4096)
+        flusher = asyncio.create_task(self.batcher.run())
+        print(f'wordle server listening on {host}:{port}', flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flusher.cancel()
+            self.batcher.close()
+            self.users.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Wordle multiplayer server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    args = parser.parse_args(argv)
+
+    engine = WordleEngine()
+    engine.prefetch() # every length is loaded before the first players are likely to ask for it
+    watcher = WordBankWatcher(engine, onReload=lambda metrics: print(
+        f'word bank reloaded in {metrics["lastReloadMs"]:.1f} ms, {metrics["wordsAdded"]} words added so far', flush=True))
+    watcher.start()
+    server = WordleServer(engine, Users())
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
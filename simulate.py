@@ -0,0 +1,243 @@
+'''Headless batch simulation, plays many games with a guessing strategy against WordleEngine without the UI.
+
+    python simulate.py --lengths 5 --guesses 6 --strategy solver --out results.jsonl
+    python simulate.py --lengths 3 4 5 6 7 8 --all-secrets --workers 8 --out results.csv
+    python simulate.py --lengths 3 4 5 --strategy random --feedback-matrix
+
+Strategies are 'random', 'solver' or 'module:Class' for any class with the Guesser interface.
+Games are sharded across a process pool, every worker opens the word bank once. The bank is the memory mapped
+index so all workers share the same pages through the os page cache instead of holding a copy each.
+Results are streamed to the output file as they come in and the aggregate stats are printed at the end.
+With --feedback-matrix the solvers narrow their candidates with the precomputed feedback matrix of each length
+(built once, then memory mapped by every worker) instead of scoring every guess again'''
+import argparse
+import csv
+import importlib
+import json
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from feedback import feedbackCode, winningCode
+from solver import Solver
+from wordleEngine import MatrixTooLarge, WordleEngine
+
+
+class Guesser(ABC):
+    '''Strategy interface, one instance plays one game. words is the engine's word list of the game's length'''
+    def __init__(self, engine: WordleEngine, length: int, words: List[str], rng: random.Random) -> None:
+        self.engine = engine
+        self.length = length
+        self.words = words
+        self.rng = rng
+
+    @abstractmethod
+    def nextGuess(self) -> str:
+        '''the word to guess next'''
+
+    def observe(self, guess: str, code: int) -> None:
+        '''called with the feedback code of every guess'''
+        pass
+
+
+class RandomGuesser(Guesser):
+    '''Guesses a random word that is still consistent with the feedback. The first guess of a length is the same in
+    every game of a run, main draws it from --seed and hands it to every worker so results do not depend on the workers'''
+    firstGuesses: Dict[int, str] = {} # length -> first guess, a length missing here starts with a random word
+
+    def __init__(self, engine: WordleEngine, length: int, words: List[str], rng: random.Random) -> None:
+        super().__init__(engine, length, words, rng)
+        self.solver = Solver(engine, length, words)
+
+    def nextGuess(self) -> str:
+        if not self.solver.guesses:
+            return self.firstGuesses.get(self.length) or self.rng.choice(self.words)
+        return self.rng.choice(self.solver.candidates)
+
+    def observe(self, guess: str, code: int) -> None:
+        self.solver.update(guess, code)
+
+
+class SolverGuesser(Guesser):
+    '''Plays the solver's suggestions. Suggestions only depend on the guesses and codes so far, so they are memoized
+    per worker and games that start the same way share them'''
+    suggestions: Dict[tuple, str] = {}
+
+    def __init__(self, engine: WordleEngine, length: int, words: List[str], rng: random.Random) -> None:
+        super().__init__(engine, length, words, rng)
+        self.solver = Solver(engine, length, words, guessPool=40, secretSample=300)
+        self.history: tuple = (length,)
+
+    def nextGuess(self) -> str:
+        suggestion = self.suggestions.get(self.history)
+        if suggestion is None:
+            suggestion = self.solver.suggest() or self.rng.choice(self.words)
+            if len(self.suggestions) > 200000:
+                self.suggestions.clear()
+            self.suggestions[self.history] = suggestion
+        return suggestion
+
+    def observe(self, guess: str, code: int) -> None:
+        self.solver.update(guess, code)
+        self.history += (guess, code)
+
+
+STRATEGIES = {'random': RandomGuesser, 'solver': SolverGuesser}
+
+
+def loadStrategy(spec: str) -> type:
+    '''a strategy name from STRATEGIES or module:Class'''
+    if spec in STRATEGIES:
+        return STRATEGIES[spec]
+    moduleName, _, className = spec.partition(':')
+    return getattr(importlib.import_module(moduleName), className)
+
+
+def playGame(guesser: Guesser, secret: str, guessesAllowed: int) -> Dict[str, Any]:
+    '''plays one game and returns its result'''
+    win = winningCode(len(secret))
+    guesses = []
+    code = -1
+    while len(guesses) < guessesAllowed and code != win:
+        guess = guesser.nextGuess()
+        code = feedbackCode(secret, guess)
+        guesses.append(guess)
+        guesser.observe(guess, code)
+    return {"wordLength": len(secret), "secret": secret, "win": code == win, "guessesNeeded": len(guesses), "guesses": guesses}
+
+
+_engine: Optional[WordleEngine] = None # set once per worker process
+_strategy: Optional[type] = None
+_words: Dict[int, List[str]] = {}
+
+
+def _initWorker(strategySpec: str, matrixLengths: List[int], firstGuesses: Dict[int, str]) -> None:
+    global _engine, _strategy
+    _engine = WordleEngine()
+    _strategy = loadStrategy(strategySpec)
+    RandomGuesser.firstGuesses = firstGuesses
+    for length in matrixLengths: # built by main already, only opened here
+        _engine.getFeedbackMatrix(length)
+
+
+def _playShard(task: Tuple[int, List[int], int, int]) -> List[Dict[str, Any]]:
+    '''plays the secrets at the given positions of one word length'''
+    length, positions, guessesAllowed, seed = task
+    if length not in _words:
+        _words[length] = _engine.wordList(length)
+    words = _words[length]
+    rng = random.Random(seed)
+    return [playGame(_strategy(_engine, length, words, rng), words[position], guessesAllowed) for position in positions]
+
+
+def makeShards(engine: WordleEngine, lengths: List[int], games: Optional[int], guessesAllowed: int,
+               seed: int, shardSize: int) -> Iterator[Tuple[int, List[int], int, int]]:
+    '''every secret of every length when games is None, else games random secrets per length'''
+    rng = random.Random(seed)
+    for length in lengths:
+        count = len(engine.wordDict.get(length, []))
+        if count == 0:
+            continue
+        positions = list(range(count)) if games is None else [rng.randrange(count) for _ in range(games)]
+        for start in range(0, len(positions), shardSize):
+            yield length, positions[start:start + shardSize], guessesAllowed, rng.randrange(2 ** 32)
+
+
+class ResultWriter:
+    '''streams results to a .jsonl or .csv file'''
+    def __init__(self, path: Optional[str]) -> None:
+        self.file = open(path, 'w', newline='') if path else None
+        self.csv = csv.writer(self.file) if path and path.endswith('.csv') else None
+        if self.csv:
+            self.csv.writerow(["wordLength", "secret", "win", "guessesNeeded", "guesses"])
+
+    def write(self, results: List[Dict[str, Any]]) -> None:
+        if self.file is None:
+            return
+        if self.csv:
+            self.csv.writerows([r["wordLength"], r["secret"], r["win"], r["guessesNeeded"], ' '.join(r["guesses"])] for r in results)
+        else:
+            self.file.write(''.join(json.dumps(result) + '\n' for result in results))
+        self.file.flush()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+
+
+def summarize(stats: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    for length, lengthStats in sorted(stats.items()):
+        wins = lengthStats["wins"]
+        summary[str(length)] = {
+            "games": lengthStats["games"],
+            "winRate": round(wins / lengthStats["games"], 4),
+            "averageGuesses": round(lengthStats["winGuesses"] / wins, 3) if wins else None,
+            "guessDistribution": {str(guesses): count for guesses, count in sorted(lengthStats["distribution"].items())},
+        }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description='Play many wordle games headless and report win rate and guess distribution')
+    parser.add_argument('--lengths', type=int, nargs='+', default=[5])
+    parser.add_argument('--guesses', type=int, default=6, help='guesses allowed per game')
+    parser.add_argument('--games', type=int, default=1000, help='random secrets per length')
+    parser.add_argument('--all-secrets', action='store_true', help='play every secret of every length once instead of --games')
+    parser.add_argument('--strategy', default='solver', help="'random', 'solver' or module:Class")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--shard-size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='stream every game to this .jsonl or .csv file')
+    parser.add_argument('--feedback-matrix', action='store_true',
+                        help='load or build the guess x secret feedback matrix of every length first, lengths whose matrix is too large are skipped')
+    args = parser.parse_args(argv)
+
+    engine = WordleEngine() # the first length looked up below compiles the index, before any worker starts, so they never race to build it
+    if issubclass(loadStrategy(args.strategy), SolverGuesser):
+        for length in args.lengths: # same for the cached openers
+            if engine.wordDict.get(length):
+                Solver(engine, length).opener()
+    matrixLengths = []
+    if args.feedback_matrix:
+        for length in args.lengths:
+            if not engine.wordDict.get(length):
+                continue
+            try:
+                engine.getFeedbackMatrix(length, args.workers)
+                matrixLengths.append(length)
+            except MatrixTooLarge as error:
+                print(f'no feedback matrix for length {length}: {error}', file=sys.stderr)
+    rng = random.Random(f'{args.seed}:first guesses')
+    firstGuesses = {length: rng.choice(engine.wordList(length)) for length in args.lengths if engine.wordDict.get(length)}
+    shards = makeShards(engine, args.lengths, None if args.all_secrets else args.games, args.guesses, args.seed, args.shard_size)
+    stats: Dict[int, Dict[str, Any]] = {}
+    writer = ResultWriter(args.out)
+    start = time.perf_counter()
+    played = 0
+
+    with Pool(args.workers, initializer=_initWorker, initargs=(args.strategy, matrixLengths, firstGuesses)) as pool:
+        for results in pool.imap_unordered(_playShard, shards):
+            writer.write(results)
+            for result in results:
+                lengthStats = stats.setdefault(result["wordLength"], {"games": 0, "wins": 0, "winGuesses": 0, "distribution": {}})
+                lengthStats["games"] += 1
+                if result["win"]:
+                    lengthStats["wins"] += 1
+                    lengthStats["winGuesses"] += result["guessesNeeded"]
+                    lengthStats["distribution"][result["guessesNeeded"]] = lengthStats["distribution"].get(result["guessesNeeded"], 0) + 1
+            played += len(results)
+            print(f'\r{played} games  {played / (time.perf_counter() - start):8.1f} games/s', end='', file=sys.stderr)
+    writer.close()
+    print(file=sys.stderr)
+
+    summary = summarize(stats)
+    print(json.dumps(summary, indent=4))
+    return summary
+
+
+if __name__ == '__main__':
+    main()
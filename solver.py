@@ -0,0 +1,165 @@
+import heapq
+import json
+import math
+import os
+import random
+from collections import Counter
+from typing import Dict, List, Optional
+from feedback import parseHint, scoreSecrets
+from feedbackMatrix import wordsChecksum
+
+GUESS_POOL = 150 # most promising guesses that get their expected information computed
+SECRET_SAMPLE = 600 # candidates the information of a guess is measured against when there are more
+PROBE_SAMPLE = 2000 # non candidate words that are ranked as possible probing guesses
+OPENERS_PATH = 'openers.json'
+
+_openers: Dict[int, tuple] = {} # length -> (checksum of the word list, opener), shared by every solver in the process
+_checksums: Dict[int, tuple] = {} # length -> (word list, its checksum) so the checksum is not recomputed for the same list
+_firstGuessSplits: Dict[tuple, tuple] = {} # (length, first guess) -> (word list, {code: words giving that code})
+
+
+class Solver:
+    '''Keeps the set of secrets that are still possible for a game and suggests the guess that is expected
+    to give the most information (largest entropy of the feedback codes over the remaining candidates)'''
+
+    def __init__(self, engine, length: int, words: Optional[List[str]] = None,
+                 guessPool: int = GUESS_POOL, secretSample: int = SECRET_SAMPLE) -> None:
+        '''words is engine.wordList(length), pass it in when many solvers are made for the same words.
+        Smaller guessPool and secretSample make suggestions faster but a little worse'''
+        self.engine = engine
+        self.length = length
+        self.words: List[str] = words if words is not None else engine.wordList(length)
+        self.candidates: List[str] = self.words # narrowed after every update, never rescans the whole bank
+        self.guesses: List[str] = []
+        self.guessPool = guessPool
+        self.secretSample = secretSample
+
+    def update(self, guess: str, code: int) -> None:
+        '''removes every candidate that would not have given this feedback code for guess'''
+        guess = guess.lower()
+        isFirstGuess = not self.guesses
+        self.guesses.append(guess)
+        matrix = self.engine.feedbackMatrices.get(self.length) # use the precomputed codes when they are around
+        if isFirstGuess:
+            self.candidates = self.__firstGuessSplit(guess).get(code, [])
+        elif matrix is not None and guess in matrix.positions:
+            row = matrix.row(matrix.positions[guess])
+            positions = matrix.positions
+            self.candidates = [word for word in self.candidates if row[positions[word]] == code]
+        else:
+            codes = scoreSecrets(guess, self.candidates)
+            self.candidates = [word for word, wordCode in zip(self.candidates, codes) if wordCode == code]
+
+    def updateFromHint(self, hint: str, guess: str) -> None:
+        '''same as update but takes the coloured hint the game showed, like the (hint, guess) pairs the UI keeps'''
+        self.update(guess, parseHint(hint))
+
+    def suggest(self) -> Optional[str]:
+        '''returns the best next guess, None if no word is consistent with the feedback so far'''
+        if not self.candidates:
+            return None
+        if len(self.candidates) <= 2:
+            return self.candidates[0]
+        if not self.guesses:
+            return self.opener()
+        return bestGuess(self.words, self.candidates, self.guesses, self.guessPool, self.secretSample)
+
+    def __firstGuessSplit(self, guess: str) -> Dict[int, List[str]]:
+        '''groups every word by the code it gives for guess, cached because most games open with the same word'''
+        cached = _firstGuessSplits.get((self.length, guess))
+        if cached is None or cached[0] is not self.words:
+            split: Dict[int, List[str]] = {}
+            for word, code in zip(self.words, scoreSecrets(guess, self.words)):
+                split.setdefault(code, []).append(word)
+            if len(_firstGuessSplits) > 64:
+                _firstGuessSplits.clear()
+            cached = _firstGuessSplits[(self.length, guess)] = (self.words, split)
+        return cached[1]
+
+    def opener(self) -> str:
+        '''the best first guess of this length, computed once and cached in memory and in openers.json'''
+        known = _checksums.get(self.length)
+        if known is None or known[0] is not self.words:
+            known = _checksums[self.length] = (self.words, wordsChecksum(self.words))
+        checksum = known[1]
+        cached = _openers.get(self.length)
+        if cached is None or cached[0] != checksum:
+            cached = _loadOpener(self.length, checksum)
+        if cached is None:
+            cached = (checksum, bestGuess(self.words, self.words, []))
+            _saveOpener(self.length, cached)
+        _openers[self.length] = cached
+        return cached[1]
+
+
+def bestGuess(words: List[str], candidates: List[str], guessed: List[str],
+              guessPool: int = GUESS_POOL, secretSample: int = SECRET_SAMPLE) -> str:
+    '''the guess with the highest expected information over the candidates. Only the guessPool most promising guesses by
+    letter frequency are scored and very large candidate sets are sampled, so a suggestion takes well under a second'''
+    if len(candidates) > secretSample:
+        secrets = random.Random(len(candidates)).sample(candidates, secretSample) # seeded so suggestions are repeatable
+    else:
+        secrets = candidates
+
+    bestWord, bestScore = candidates[0], -1.0
+    candidateSet = set(candidates)
+    for guess in _guessPool(words, candidates, guessed, guessPool):
+        counts = Counter(scoreSecrets(guess, secrets)).values()
+        total = len(secrets)
+        entropy = math.log2(total) - sum(count * math.log2(count) for count in counts) / total
+        if guess in candidateSet:
+            entropy += 1 / total # a guess that could be the secret wins ties
+        if entropy > bestScore:
+            bestWord, bestScore = guess, entropy
+    return bestWord
+
+
+def _guessPool(words: List[str], candidates: List[str], guessed: List[str], size: int) -> List[str]:
+    '''ranks words by how many candidates share their (distinct) letters and keeps the top ones,
+    half of the pool comes from the candidates so a suggestion can still win the game'''
+    letterCounts = Counter()
+    for word in candidates:
+        letterCounts.update(set(word))
+
+    def coverage(word: str) -> int:
+        return sum(letterCounts[letter] for letter in set(word))
+
+    used = set(guessed)
+    if len(words) > PROBE_SAMPLE and candidates is not words: # words that are not candidates are only probes, a sample of them is enough
+        words = random.Random(len(candidates)).sample(words, PROBE_SAMPLE)
+    fromCandidates = heapq.nlargest(size // 2, (word for word in candidates if word not in used), key=coverage)
+    fromWords = heapq.nlargest(size - len(fromCandidates), (word for word in words if word not in used), key=coverage)
+    return list(dict.fromkeys(fromCandidates + fromWords))
+
+
+def _loadOpener(length: int, checksum: int) -> Optional[tuple]:
+    try:
+        with open(OPENERS_PATH, 'r') as file:
+            stored = json.load(file).get(str(length))
+    except (OSError, ValueError):
+        return None
+    if not stored or stored.get('checksum') != checksum:
+        return None
+    return (checksum, stored['opener'])
+
+
+def _saveOpener(length: int, cached: tuple) -> None:
+    try:
+        with open(OPENERS_PATH, 'r') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        data = {}
+    data[str(length)] = {'checksum': cached[0], 'opener': cached[1]}
+
+    tempPath = f'{OPENERS_PATH}.{os.getpid()}.tmp' # per process so simulation workers never share a temp file
+    with open(tempPath, 'w') as file:
+        json.dump(data, file, indent=4)
+    os.replace(tempPath, OPENERS_PATH)
+
+
+def suggestGuess(engine, length: int, history: List[tuple]) -> Optional[str]:
+    '''headless helper, history is a list of (guess, feedback code) pairs in the order they were played'''
+    solver = Solver(engine, length)
+    for guess, code in history:
+        solver.update(guess, code)
+    return solver.suggest()
@@ -0,0 +1,294 @@
+'''Full game transcripts (secret and every guess) in a compact append only binary log, with a streaming JSONL export.
+
+    python transcripts.py --export games.jsonl
+    python transcripts.py --export - --user helgi | head
+
+Every game is one frame, about 20-30 bytes for a five letter game, so millions of games stay small:
+    varint  payload size
+    varint  user id (line number of the user's name in transcripts.names)
+    varint  unix time the game ended
+    varint  daily challenge day (date ordinal), 0 when it was not a daily
+    bits    3 bits word length - 3, 4 bits guesses allowed, 4 bits guesses made,
+            then the secret and every guess at 5 bits per letter (a-z), packed little endian
+Feedback codes are not stored, they follow from the secret and the guess and are worked out again when a game is read.
+Games are written a batch at a time with one write, under the exclusive lock of fileLock (on transcripts.bin.lock)
+like the user store, so several processes can append to the same log. The lock's version stamp tells a process
+whether anyone added names since it last read them'''
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from feedback import decodeFeedback, scoreGuesses, winningCode
+from fileLock import FileLock
+
+TRANSCRIPTS_PATH = 'transcripts.bin'
+NAMES_SUFFIX = '.names' # user names, one per line, a user's id is its line number
+LETTER_BITS = 5
+MAX_FRAME = 128 # bytes, the largest game (10 guesses of 8 letters) is well under this
+A = ord('a')
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _readVarint(data: bytes, position: int) -> Tuple[int, int]:
+    '''the value and the position after it, IndexError if data ends inside it'''
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def canEncode(word: str) -> bool:
+    return word.isascii() and word.isalpha() and word.islower()
+
+
+def encodeGame(userId: int, secret: str, guesses: List[str], guessesAllowed: int,
+               daily: Optional[str] = None, playedAt: Optional[int] = None) -> bytes:
+    '''one frame of the log, ValueError is raised for words that are not lower case a-z'''
+    length = len(secret)
+    if not 3 <= length <= 10 or len(guesses) > 15 or not 0 <= guessesAllowed <= 15:
+        raise ValueError('game does not fit the transcript format')
+    bits = (length - 3) | guessesAllowed << 3 | len(guesses) << 7
+    shift = 11
+    for word in [secret] + guesses:
+        if len(word) != length or not canEncode(word):
+            raise ValueError(f'{word!r} can not be stored in a transcript')
+        for letter in word:
+            bits |= (ord(letter) - A) << shift
+            shift += LETTER_BITS
+
+    day = datetime.date.fromisoformat(daily).toordinal() if daily else 0
+    payload = (_varint(userId) + _varint(int(time.time() if playedAt is None else playedAt)) + _varint(day)
+               + bits.to_bytes((shift + 7) // 8, 'little'))
+    return _varint(len(payload)) + payload
+
+
+def decodeGame(data: bytes, position: int = 0) -> Tuple[Dict[str, Any], int]:
+    '''the game of the frame at position (user is the user id) and the position of the next frame.
+    IndexError or ValueError is raised when the frame is cut short'''
+    size, start = _readVarint(data, position)
+    end = start + size
+    if end > len(data):
+        raise IndexError('frame is cut short')
+    userId, cursor = _readVarint(data, start)
+    playedAt, cursor = _readVarint(data, cursor)
+    day, cursor = _readVarint(data, cursor)
+    bits = int.from_bytes(data[cursor:end], 'little')
+
+    length = (bits & 0b111) + 3
+    guessesAllowed = bits >> 3 & 0b1111
+    guessCount = bits >> 7 & 0b1111
+    bits >>= 11
+    letters = bytes(A + (bits >> shift & 0b11111) for shift in range(0, LETTER_BITS * length * (guessCount + 1), LETTER_BITS)).decode('ascii')
+    secret = letters[:length]
+    guesses = [letters[start:start + length] for start in range(length, len(letters), length)]
+    codes = scoreGuesses(guesses, secret).tolist()
+    game = {
+        "user": userId,
+        "playedAt": playedAt,
+        "daily": datetime.date.fromordinal(day).isoformat() if day else None,
+        "secret": secret,
+        "guessesAllowed": guessesAllowed,
+        "guesses": guesses,
+        "codes": codes,
+        "win": bool(codes) and codes[-1] == winningCode(length),
+    }
+    return game, end
+
+
+class TranscriptLog:
+    '''Append only log of game transcripts. appendGames writes a batch with one write and returns the offset
+    of every game, which the user records keep so a game is read back with one seek'''
+
+    def __init__(self, path: str = TRANSCRIPTS_PATH) -> None:
+        self.path = path
+        self.namesPath = path + NAMES_SUFFIX
+        self.names: List[str] = []
+        self.userIds: Dict[str, int] = {}
+        self.namesOffset = 0 # bytes of the names file that have been read
+        self.bytesWritten = 0
+        self.lock = FileLock(path) # ids and offsets are only handed out by one process at a time
+        self.stamp: Optional[Tuple[int, int]] = None # version stamp when the names were last read
+
+    def __readNames(self, force: bool = False) -> None:
+        '''reads the names other processes (or this one) added since the last time, only when the stamp moved
+        unless forced (a writer that died before its bump leaves names the stamp does not show)'''
+        stamp = self.lock.stamp()
+        if stamp == self.stamp and not force:
+            return
+        self.stamp = stamp
+        try:
+            with open(self.namesPath, 'rb') as file:
+                file.seek(self.namesOffset)
+                data = file.read()
+        except FileNotFoundError:
+            return
+        end = data.rfind(b'\n') + 1
+        for name in data[:end].decode('utf-8').split('\n')[:-1]:
+            self.userIds[name] = len(self.names)
+            self.names.append(name)
+        self.namesOffset += end
+
+    def __userId(self, userName: str, newNames: List[str]) -> int:
+        userId = self.userIds.get(userName)
+        if userId is None:
+            userId = self.userIds[userName] = len(self.names)
+            self.names.append(userName)
+            newNames.append(userName)
+        return userId
+
+    def appendGames(self, games: Iterable[Tuple]) -> List[Optional[int]]:
+        '''writes (userName, secret, guesses, guessesAllowed[, daily]) games in one batch, returns the offset of
+        every game in order, None for a game with words that can not be stored'''
+        with self.lock.exclusive(), open(self.path, 'ab') as file, open(self.namesPath, 'ab') as namesFile:
+            self.__readNames()
+            offset = os.fstat(file.fileno()).st_size
+            frames, offsets, newNames = [], [], []
+            for userName, secret, guesses, guessesAllowed, *daily in games:
+                try:
+                    frame = encodeGame(self.__userId(userName, newNames), secret, guesses, guessesAllowed, *daily)
+                except (ValueError, TypeError):
+                    offsets.append(None)
+                    continue
+                offsets.append(offset)
+                frames.append(frame)
+                offset += len(frame)
+
+            if newNames:
+                data = ''.join(name + '\n' for name in newNames).encode('utf-8')
+                namesFile.write(data)
+                namesFile.flush()
+                self.namesOffset += len(data)
+            batch = b''.join(frames)
+            file.write(batch)
+            file.flush()
+            self.bytesWritten += len(batch)
+            if batch or newNames:
+                self.stamp = self.lock.bump()
+        return offsets
+
+    def read(self, offset: int) -> Optional[Dict[str, Any]]:
+        '''the game stored at offset with the user's name, None if there is no whole game there'''
+        with self.reader(MAX_FRAME) as read:
+            return read(offset)
+
+    @contextmanager
+    def reader(self, chunkSize: int = 1 << 20) -> Iterator[Callable[[int], Optional[Dict[str, Any]]]]:
+        '''yields a read(offset) for reading many games, it keeps the log open and reads chunkSize bytes at a time,
+        so games asked for in the order they were written cost one read per chunk instead of an open and a seek each'''
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            yield lambda offset: None
+            return
+        start, data = 0, b'' # the chunk in memory and its offset in the log
+
+        def read(offset: int) -> Optional[Dict[str, Any]]:
+            nonlocal start, data
+            for refilled in (False, True):
+                position = offset - start
+                if 0 <= position < len(data):
+                    try:
+                        game, _ = decodeGame(data, position)
+                        return self.__named(game)
+                    except IndexError: # runs past the end of the chunk
+                        pass
+                    except ValueError:
+                        return None
+                if not refilled:
+                    try:
+                        file.seek(offset)
+                        start, data = offset, file.read(max(chunkSize, MAX_FRAME))
+                    except (OSError, ValueError):
+                        return None
+            return None
+
+        with file:
+            yield read
+
+    def iterGames(self, userName: Optional[str] = None, chunkSize: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+        '''every game in the log (or only the user's) oldest first, read chunkSize bytes at a time'''
+        self.__readNames()
+        userId = self.userIds.get(userName) if userName is not None else None
+        if userName is not None and userId is None:
+            return
+        try:
+            file = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+        with file:
+            data = b''
+            while True:
+                chunk = file.read(chunkSize)
+                if not chunk:
+                    return # a frame cut short by a crash is left out
+                data += chunk
+                position = 0
+                while True:
+                    try:
+                        game, nextPosition = decodeGame(data, position)
+                    except IndexError:
+                        break
+                    position = nextPosition
+                    if userId is None or game["user"] == userId:
+                        yield self.__named(game)
+                data = data[position:]
+
+    def close(self) -> None:
+        self.lock.close()
+
+    def __named(self, game: Dict[str, Any]) -> Dict[str, Any]:
+        if game["user"] >= len(self.names):
+            self.__readNames(force=True) # written by another process
+        game["user"] = self.names[game["user"]] if game["user"] < len(self.names) else None
+        return game
+
+
+def exportJsonl(log: TranscriptLog, out, userName: Optional[str] = None) -> int:
+    '''streams the games to out as one json object per line, codes as digit strings (2 correct, 1 misplaced, 0 wrong).
+    Returns the number of games written'''
+    count = 0
+    for game in log.iterGames(userName):
+        length = len(game["secret"])
+        game["codes"] = [''.join(str(digit) for digit in decodeFeedback(code, length)) for code in game["codes"]]
+        out.write(json.dumps(game) + '\n')
+        count += 1
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Export game transcripts to JSONL')
+    parser.add_argument('--log', default=TRANSCRIPTS_PATH)
+    parser.add_argument('--export', required=True, metavar='PATH', help='.jsonl file to write, - for stdout')
+    parser.add_argument('--user', help='only the games of this user')
+    args = parser.parse_args(argv)
+
+    log = TranscriptLog(args.log)
+    start = time.perf_counter()
+    if args.export == '-':
+        count = exportJsonl(log, sys.stdout, args.user)
+    else:
+        with open(args.export, 'w') as out:
+            count = exportJsonl(log, out, args.user)
+    elapsed = time.perf_counter() - start
+    print(f'{count:,d} games exported in {elapsed:.2f} s ({os.path.getsize(args.log) if os.path.exists(args.log) else 0:,d} bytes of transcripts)', file=sys.stderr)
+    return count
+
+
+if __name__ == '__main__':
+    main()
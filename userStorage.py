@@ -0,0 +1,761 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from typing import Any, BinaryIO, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
+from fileLock import FileLock
+
+SEGMENT_SLACK = 10000 # segments over two per user the records file may have before it is rewritten with one per user
+
+# Snapshot file: {"seq": last journal entry folded into it, "recordsGeneration": n,
+#                 "users": {userName: {"games": n, "maxScore": x, "segments": [[offset, bytes, records], ...], "stats": {...}}}}
+# Records file:  users.records.<recordsGeneration>, one json record per line, a segment is a run of lines of one user
+# Journal file:  one json object per line, {"seq": n, "op": "user", "name": ...}, {"seq": n, "op": "record", "name": ..., "record": {...}}
+#                or {"seq": n, "op": "stats", "name": ..., "stats": {...}}
+# Several processes can share a store: writes happen under the store's FileLock and bump its version stamp,
+# refresh compares the stamp (for sqlite the database's data_version) to hand back what other processes added
+
+
+def writeJsonAtomic(path: str, data: Any, indent: Any = None) -> None:
+    '''writes data to a temp file, flushes it to disk and renames it over path so readers never see half a file'''
+    tempPath = f'{path}.{os.getpid()}.tmp' # per process, two processes saving the same file never share a temp file
+    with open(tempPath, 'w') as file:
+        file.write(json.dumps(data, indent=indent)) # dumps uses the C encoder, dump writes in small pure python chunks
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tempPath, path)
+
+
+def migrateFromJson(jsonPath: str, snapshotPath: str) -> int:
+    '''converts a users.json file ({userName: {"records": [...]}}) into a journal snapshot, returns the number of users'''
+    with open(jsonPath, 'r') as file:
+        data: Dict[str, Any] = json.load(file)
+    users = {userName: {"records": userData.get("records", [])} for userName, userData in data.items()}
+    writeJsonAtomic(snapshotPath, {"seq": 0, "users": users})
+    return len(users)
+
+
+def scoreOf(record: Dict[str, Any]) -> float:
+    '''score of one game record, 0 for a loss or a broken record'''
+    try:
+        if not record['win']:
+            return 0
+        return int(record["wordLength"]) ** 2 / int(record["guessesNeeded"]) # same formula Users uses
+    except (KeyError, TypeError, ValueError, ZeroDivisionError):
+        return 0
+
+
+class UserStore(ABC):
+    '''Interface every user storage backend implements. Users only asks for per user summaries up front,
+    the records of a user are streamed when they are needed. A backend missing a method fails when it is created'''
+
+    @abstractmethod
+    def userSummaries(self) -> Dict[str, float]:
+        '''returns every user name with the user's best score'''
+
+    @abstractmethod
+    def iterRecords(self, userName: str, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        '''yields the records [start, stop) of a user, oldest first'''
+
+    @abstractmethod
+    def iterAllRecords(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        '''yields (userName, record) for every record in the store in one streaming pass'''
+
+    @abstractmethod
+    def recordCount(self, userName: str) -> int:
+        '''number of records of a user'''
+
+    @abstractmethod
+    def totalRecords(self) -> int:
+        '''number of records of every user together'''
+
+    @abstractmethod
+    def addUser(self, userName: str) -> None:
+        '''adds a user with no records'''
+
+    @abstractmethod
+    def appendRecords(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        '''adds many (userName, record) pairs at once, records of users that do not exist are ignored'''
+
+    def appendRecord(self, userName: str, record: Dict[str, Any]) -> None:
+        '''adds a game record to the user, users that do not exist are ignored'''
+        self.appendRecords([(userName, record)])
+
+    def loadStats(self, userNames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        '''the saved statistics of the users that are up to date with the records (their "games" is the record count).
+        Users rebuilds the rest from the records, a backend that can not keep statistics returns nothing'''
+        return {}
+
+    def saveStats(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        '''stores the statistics of the users in stats, replacing what was saved for them'''
+        pass
+
+    def batch(self) -> ContextManager:
+        '''changes made inside are coalesced and written together when it ends, with one lock and one write
+        where the backend can. Nothing else is written in the meantime so the lock is held for as short as possible'''
+        return nullcontext()
+
+    def refresh(self) -> Tuple[List[str], List[Tuple[str, Dict[str, Any]]]]:
+        '''(new user names, new (userName, record) pairs) that other processes added since the last refresh,
+        cheap when nothing changed. A backend that can not tell returns nothing'''
+        return [], []
+
+    def close(self) -> None:
+        pass
+
+
+class JournalStore(UserStore):
+    '''Users and their game records stored as a snapshot, a records file and an append only journal. Every change is one
+    appended line, the journal is folded in every compactEvery entries: its records are appended to the records file as
+    one segment per user and the snapshot is rewritten. The snapshot only has each user's game count, best score, segments
+    and statistics, so start up reads the snapshot and at most compactEvery journal entries however many games were played,
+    and only the records since the last compaction are kept in memory. A user's history is read from their segments when
+    it is asked for. On start up a half written last journal line (crash mid write) is dropped.
+    Several processes can use the same files: each keeps the offset of the journal it has applied, reads what the
+    others appended before it writes (so seqs stay in order) and when refresh sees the version stamp move'''
+
+    def __init__(self, snapshotPath: str = 'users.snapshot.json', journalPath: str = 'users.journal',
+                 legacyPath: str = 'users.json', compactEvery: int = 1000, recordsPath: str = 'users.records') -> None:
+        self.snapshotPath = snapshotPath
+        self.journalPath = journalPath
+        self.recordsPath = recordsPath
+        self.compactEvery = compactEvery
+        self.users: Dict[str, Dict[str, Any]] = {} # userName -> {"games", "maxScore", "segments": [[offset, bytes, records], ...]}
+        self.recent: Dict[str, List[Dict[str, Any]]] = {} # records from the journal, not in the records file yet
+        self.stats: Dict[str, Dict[str, Any]] = {} # the statistics Users saved for every user
+        self.records: Optional[BinaryIO] = None # the records file of recordsGeneration, None before the first compaction
+        self.recordsGeneration = 0 # bumped when the records file is rewritten into a new one
+        self.segmentCount = 0
+        self.seq = 0 # seq of the last change, in the snapshot or the journal
+        self.journalEntries = 0
+        self.recordTotal = 0
+        self.journalOffset = 0 # bytes of the journal that are applied
+        self.lock = FileLock(journalPath)
+        self.stamp = (0, 0) # version stamp of the files as this process last saw them
+        self.newUsers: List[str] = [] # what other processes added, handed out by refresh
+        self.newRecords: List[Tuple[str, Dict[str, Any]]] = []
+        self.pending: Optional[List[Dict[str, Any]]] = None # entries of the open batch
+
+        self.journal = open(journalPath, 'a')
+        with self.lock.exclusive(): # recovery may cut off a torn line, no one can be appending meanwhile
+            if not os.path.exists(snapshotPath) and os.path.exists(legacyPath):
+                migrateFromJson(legacyPath, snapshotPath) # first start after switching from users.json
+            if self.__recover(canTruncate=True):
+                self.compact() # a snapshot with the records in it (users.json or before the records file), moved out once
+
+    def __recordsFile(self, generation: int) -> str:
+        return f'{self.recordsPath}.{generation}'
+
+    def __recover(self, canTruncate: bool) -> bool:
+        '''reads the snapshot and replays the journal, true iff the snapshot still has the records in it'''
+        self.stamp = self.lock.stamp()
+        legacy = False
+        try:
+            with open(self.snapshotPath, 'r') as file:
+                snapshot = json.load(file)
+        except FileNotFoundError:
+            snapshot = {"seq": 0, "users": {}}
+        self.seq = snapshot["seq"]
+        self.recordsGeneration = snapshot.get("recordsGeneration", 0)
+        if "recordsGeneration" in snapshot:
+            self.records = open(self.__recordsFile(self.recordsGeneration), 'r+b')
+        for userName, userData in snapshot["users"].items():
+            if "records" in userData: # the old layout, the records are treated like journal records until compacted
+                legacy = True
+                records = userData["records"]
+                self.users[userName] = {"games": len(records), "maxScore": max(map(scoreOf, records), default=0), "segments": []}
+                if records:
+                    self.recent[userName] = records
+            else:
+                self.users[userName] = {"games": userData["games"], "maxScore": userData["maxScore"], "segments": userData["segments"]}
+            if "stats" in userData:
+                self.stats[userName] = userData["stats"]
+        self.recordTotal = sum(user["games"] for user in self.users.values())
+        self.segmentCount = sum(len(user["segments"]) for user in self.users.values())
+        self.__readJournal(canTruncate)
+        return legacy
+
+    def __readJournal(self, canTruncate: bool) -> Optional[List[Dict[str, Any]]]:
+        '''applies the journal entries after journalOffset and returns them, None if the journal is shorter than
+        the offset (emptied by a compaction). A torn last line is cut off when canTruncate (the exclusive lock is held)'''
+        applied = []
+        try:
+            file = open(self.journalPath, 'rb')
+        except FileNotFoundError:
+            return applied
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            if size < self.journalOffset:
+                return None
+            file.seek(self.journalOffset)
+            validBytes = self.journalOffset
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break # torn write, everything after it is discarded
+                if not line.endswith(b'\n'):
+                    break
+                validBytes += len(line)
+                if entry["seq"] > self.seq: # older entries are already in the snapshot
+                    self.__apply(entry)
+                    self.seq = entry["seq"]
+                    self.journalEntries += 1
+                    applied.append(entry)
+        if canTruncate and validBytes != size:
+            with open(self.journalPath, 'r+b') as file:
+                file.truncate(validBytes) # the next append would otherwise be glued to the torn line
+        self.journalOffset = validBytes
+        return applied
+
+    def __catchUp(self, exclusive: bool) -> None:
+        '''applies what other processes wrote since this one last looked and keeps their new users and records
+        for refresh. Called with the lock held, a writer (exclusive) always reads the journal tail because a
+        process that died between its write and its version bump leaves entries the stamp does not show'''
+        stamp = self.lock.stamp()
+        if stamp == self.stamp and (not exclusive or os.fstat(self.journal.fileno()).st_size == self.journalOffset):
+            return # nothing new, the common case
+        applied = self.__readJournal(exclusive) if stamp[1] == self.stamp[1] else None
+        if applied is None: # compacted by another process, the journal this one was reading is gone
+            self.__reload(exclusive)
+            return
+        self.stamp = stamp
+        for entry in applied:
+            if entry["op"] == "user":
+                self.newUsers.append(entry["name"])
+            elif entry["op"] == "record" and entry["name"] in self.users:
+                self.newRecords.append((entry["name"], entry["record"]))
+
+    def __reload(self, canTruncate: bool) -> None:
+        '''reads the snapshot and the journal again, what is new to this process is kept for refresh'''
+        counts = {userName: user["games"] for userName, user in self.users.items()}
+        self.users, self.recent, self.stats, self.records = {}, {}, {}, None
+        self.seq, self.journalEntries, self.journalOffset = 0, 0, 0
+        self.__recover(canTruncate)
+        for userName, user in self.users.items():
+            if userName not in counts:
+                self.newUsers.append(userName)
+            if user["games"] > counts.get(userName, 0):
+                self.newRecords.extend((userName, record) for record in self.iterRecords(userName, counts.get(userName, 0)))
+
+    def __apply(self, entry: Dict[str, Any]) -> None:
+        if entry["op"] == "user":
+            self.users.setdefault(entry["name"], {"games": 0, "maxScore": 0, "segments": []})
+        elif entry["op"] == "record" and entry["name"] in self.users:
+            user = self.users[entry["name"]]
+            user["games"] += 1
+            user["maxScore"] = max(user["maxScore"], scoreOf(entry["record"]))
+            self.recent.setdefault(entry["name"], []).append(entry["record"])
+            self.recordTotal += 1
+        elif entry["op"] == "stats" and entry["name"] in self.users:
+            self.stats[entry["name"]] = entry["stats"]
+
+    def __append(self, entries: List[Dict[str, Any]]) -> None:
+        if self.pending is not None:
+            self.pending.extend(entries) # written when the batch ends
+        else:
+            self.__write(entries)
+
+    def __write(self, entries: List[Dict[str, Any]]) -> None:
+        '''writes the entries with one write under the exclusive lock, then applies them in memory. They are serialised
+        before the lock is taken and the fsync happens after it is released, so the lock is only held for catching up
+        and the write itself. Entries of users that do not exist (here or in another process) are dropped'''
+        bodies = [json.dumps(entry) for entry in entries]
+        with self.lock.exclusive():
+            self.__catchUp(exclusive=True)
+            lines, written, created = [], [], set()
+            for entry, body in zip(entries, bodies):
+                if entry["op"] == "user":
+                    created.add(entry["name"])
+                elif entry["name"] not in self.users and entry["name"] not in created:
+                    continue
+                self.seq += 1
+                entry["seq"] = self.seq
+                lines.append(f'{{"seq": {self.seq}, {body[1:]}\n')
+                written.append(entry)
+            if not written:
+                return
+            self.journal.write(''.join(lines))
+            self.journal.flush()
+            self.journalOffset = os.fstat(self.journal.fileno()).st_size
+            self.stamp = self.lock.bump()
+            for entry in written:
+                self.__apply(entry)
+
+            self.journalEntries += len(written)
+            if self.journalEntries >= self.compactEvery:
+                self.compact()
+        os.fsync(self.journal.fileno())
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        '''every entry appended inside is written with one lock, one write and one fsync when it ends'''
+        if self.pending is not None:
+            yield # already inside a batch
+            return
+        self.pending = []
+        try:
+            yield
+        finally:
+            entries, self.pending = self.pending, None
+            if entries:
+                self.__write(entries)
+
+    def refresh(self) -> Tuple[List[str], List[Tuple[str, Dict[str, Any]]]]:
+        if self.lock.stamp() != self.stamp:
+            with self.lock.shared():
+                self.__catchUp(exclusive=False)
+        changes = (self.newUsers, self.newRecords)
+        self.newUsers, self.newRecords = [], []
+        return changes
+
+    def userSummaries(self) -> Dict[str, float]:
+        return {userName: user["maxScore"] for userName, user in self.users.items()}
+
+    def iterRecords(self, userName: str, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        user = self.users.get(userName)
+        if user is None:
+            return iter(())
+        stop = user["games"] if stop is None else min(stop, user["games"])
+        return self.__readRecords(self.records, user["segments"], self.recent.get(userName, []), start, stop)
+
+    @staticmethod
+    def __readRecords(file: Optional[BinaryIO], segments: List[List[int]], recent: List[Dict[str, Any]],
+                      start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        '''the records [start, stop) of a user, only the segments that hold some of them are read'''
+        position = 0
+        for offset, size, count in segments:
+            if position >= stop:
+                return
+            if position + count > start:
+                file.seek(offset)
+                lines = file.read(size).splitlines()
+                for line in lines[max(0, start - position):stop - position]:
+                    yield json.loads(line)
+            position += count
+        yield from recent[max(0, start - position):max(0, stop - position)]
+
+    def iterAllRecords(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return ((userName, record) for userName in list(self.users) for record in self.iterRecords(userName))
+
+    def recordCount(self, userName: str) -> int:
+        user = self.users.get(userName)
+        return user["games"] if user else 0
+
+    def totalRecords(self) -> int:
+        return self.recordTotal
+
+    def addUser(self, userName: str) -> None:
+        self.__append([{"op": "user", "name": userName}])
+
+    def appendRecords(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        entries = [{"op": "record", "name": userName, "record": record} for userName, record in records]
+        if entries:
+            self.__append(entries)
+
+    def loadStats(self, userNames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return {userName: self.stats[userName] for userName in userNames
+                if userName in self.stats and self.stats[userName].get("games") == self.recordCount(userName)}
+
+    def saveStats(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        '''one journal line per user, folded into the user's entry of the snapshot when it is compacted'''
+        entries = [{"op": "stats", "name": userName, "stats": userStats} for userName, userStats in stats.items()]
+        if entries:
+            self.__append(entries)
+
+    def compact(self) -> None:
+        '''moves the records of the journal into the records file, writes the new snapshot and empties the journal.
+        The new generation in the version stamp tells the other processes to read the snapshot again'''
+        with self.lock.exclusive():
+            self.__catchUp(exclusive=True)
+            oldRecords = None
+            if self.segmentCount + len(self.recent) > 2 * len(self.users) + SEGMENT_SLACK:
+                oldRecords = self.__rewriteRecords()
+            elif self.recent:
+                self.__appendSegments()
+            users = {userName: dict(user) for userName, user in self.users.items()}
+            for userName, userStats in self.stats.items():
+                users[userName]["stats"] = userStats
+            snapshot = {"seq": self.seq, "users": users}
+            if self.records is not None:
+                snapshot["recordsGeneration"] = self.recordsGeneration
+            writeJsonAtomic(self.snapshotPath, snapshot)
+            if oldRecords is not None:
+                try:
+                    os.remove(oldRecords) # processes that still have it open keep reading it until they reload
+                except OSError:
+                    pass # already gone, or open elsewhere on a system that does not allow that, it is only wasted space
+            self.journal.truncate(0) # if we crash before this the old entries are skipped by seq on replay
+            self.journalEntries = 0
+            self.journalOffset = 0
+            self.stamp = self.lock.bump(newGeneration=True)
+
+    def __appendSegments(self) -> None:
+        '''appends the journal's records to the records file, one segment per user. Bytes a crash left after the last
+        segment are never referenced, new segments go after them'''
+        if self.records is None:
+            self.records = open(self.__recordsFile(self.recordsGeneration), 'w+b')
+        self.records.seek(0, os.SEEK_END)
+        offset = self.records.tell()
+        chunks = []
+        for userName, records in self.recent.items():
+            data = ''.join(json.dumps(record) + '\n' for record in records).encode()
+            self.users[userName]["segments"].append([offset, len(data), len(records)])
+            chunks.append(data)
+            offset += len(data)
+        self.records.write(b''.join(chunks))
+        self.records.flush()
+        os.fsync(self.records.fileno()) # before the snapshot that points at it
+        self.segmentCount += len(self.recent)
+        self.recent = {}
+
+    def __rewriteRecords(self) -> Optional[str]:
+        '''copies every user's records into a new records file as one segment each, when users have played in so many
+        compactions that the segments would make the snapshot big. The old file is replaced only by the snapshot that
+        names the new one, so a crash in between leaves the old pair intact. Returns the old file's path'''
+        oldPath = self.__recordsFile(self.recordsGeneration) if self.records is not None else None
+        generation = self.recordsGeneration + 1
+        records = open(self.__recordsFile(generation), 'w+b')
+        offset = 0
+        for userName, user in self.users.items():
+            data = b''
+            for segmentOffset, size, _ in user["segments"]:
+                self.records.seek(segmentOffset)
+                data += self.records.read(size)
+            data += ''.join(json.dumps(record) + '\n' for record in self.recent.get(userName, ())).encode()
+            user["segments"] = [[offset, len(data), user["games"]]] if data else []
+            records.write(data)
+            offset += len(data)
+        records.flush()
+        os.fsync(records.fileno())
+        self.records, self.recordsGeneration = records, generation # the old file is left to be closed when nothing reads it
+        self.segmentCount = sum(len(user["segments"]) for user in self.users.values())
+        self.recent = {}
+        return oldPath
+
+    def close(self) -> None:
+        self.journal.close()
+        if self.records is not None:
+            self.records.close()
+        self.lock.close()
+
+
+class JsonStore(UserStore):
+    '''The original users.json layout ({userName: {"records": [...]}}), the whole file is rewritten on every change.
+    Kept for compatibility with tools that read users.json directly.
+    Changes read, change and rewrite the file under the exclusive lock. The parsed file is kept and only parsed again,
+    by a change or refresh, when the version stamp or the file itself (someone editing it by hand) changed, so reads in
+    between see the same users and records refresh handed out'''
+
+    def __init__(self, path: str = 'users.json') -> None:
+        self.path = path
+        self.lock = FileLock(path)
+        self.data: Dict[str, Any] = {}
+        self.dataVersion: Optional[tuple] = None # (stamp, file identity) self.data was read at
+        self.counts: Optional[Dict[str, int]] = None # records per user this process knows about, None before the first read
+        self.newUsers: List[str] = [] # what other processes added, handed out by refresh
+        self.newRecords: List[Tuple[str, Dict[str, Any]]] = []
+        self.changing: Optional[Dict[str, Any]] = None # the data a change (or batch of changes) is making, written when it ends
+
+    def __version(self) -> tuple:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return self.lock.stamp(), None
+        return self.lock.stamp(), (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    def __read(self) -> Dict[str, Any]:
+        if self.changing is not None:
+            return self.changing
+        if self.counts is None:
+            self.__load()
+        return self.data
+
+    def __load(self) -> Dict[str, Any]:
+        '''the data of users.json, parsed again if it changed since it was last read'''
+        version = self.__version()
+        if version != self.dataVersion:
+            try:
+                with open(self.path, 'r') as file:
+                    data = json.load(file)
+            except FileNotFoundError:
+                data = {}
+            self.__noteChanges(data)
+            self.data, self.dataVersion = data, version
+        return self.data
+
+    def __noteChanges(self, data: Dict[str, Any]) -> None:
+        '''keeps the users and records of data this process did not know about for refresh'''
+        if self.counts is None:
+            self.counts = {userName: len(userData["records"]) for userName, userData in data.items()}
+            return
+        for userName, userData in data.items():
+            known = self.counts.get(userName)
+            if known is None:
+                self.newUsers.append(userName)
+            self.newRecords.extend((userName, record) for record in userData["records"][known or 0:])
+            self.counts[userName] = len(userData["records"])
+
+    @contextmanager
+    def __change(self) -> Iterator[Dict[str, Any]]:
+        '''the data to change, read fresh under the exclusive lock and written back once when the outermost change ends'''
+        if self.changing is not None:
+            yield self.changing
+            return
+        with self.lock.exclusive():
+            self.changing = data = self.__load()
+            try:
+                yield data
+                writeJsonAtomic(self.path, data, indent=4)
+                self.lock.bump()
+                self.dataVersion = self.__version()
+            except BaseException:
+                self.dataVersion = None # data may be half changed, read the file again
+                raise
+            finally:
+                self.changing = None
+
+    def batch(self) -> ContextManager:
+        '''one read and one rewrite of users.json for every change made inside'''
+        return self.__change()
+
+    def refresh(self) -> Tuple[List[str], List[Tuple[str, Dict[str, Any]]]]:
+        self.__load()
+        changes = (self.newUsers, self.newRecords)
+        self.newUsers, self.newRecords = [], []
+        return changes
+
+    def userSummaries(self) -> Dict[str, float]:
+        return {userName: max((scoreOf(record) for record in userData["records"]), default=0)
+                for userName, userData in self.__read().items()}
+
+    def iterRecords(self, userName: str, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        return iter(self.__read().get(userName, {"records": []})["records"][start:stop])
+
+    def iterAllRecords(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return ((userName, record) for userName, userData in self.__read().items() for record in userData["records"])
+
+    def recordCount(self, userName: str) -> int:
+        return len(self.__read().get(userName, {"records": []})["records"])
+
+    def totalRecords(self) -> int:
+        return sum(len(userData["records"]) for userData in self.__read().values())
+
+    def addUser(self, userName: str) -> None:
+        with self.__change() as data:
+            data.setdefault(userName, {"records": []}) # another process may have made the same user already
+            self.counts.setdefault(userName, len(data[userName]["records"]))
+
+    def appendRecords(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        with self.__change() as data:
+            for userName, record in records:
+                if userName in data:
+                    data[userName]["records"].append(record)
+                    self.counts[userName] = len(data[userName]["records"])
+
+    def loadStats(self, userNames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        data = self.__read()
+        return {userName: data[userName]["stats"] for userName in userNames
+                if "stats" in data.get(userName, {}) and data[userName]["stats"].get("games") == len(data[userName]["records"])}
+
+    def saveStats(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        with self.__change() as data:
+            for userName, userStats in stats.items():
+                if userName in data:
+                    data[userName]["stats"] = userStats # kept in the user's entry, next to the records
+
+    def close(self) -> None:
+        self.lock.close()
+
+
+class SqliteStore(UserStore):
+    '''Users and records in an SQLite database (WAL mode). The users table keeps each user's best score and game count
+    so start up never touches the records, which are indexed by (userName, gameNumber) for paging.
+    SQLite does the locking between processes, refresh uses PRAGMA data_version to see that another connection wrote
+    and then reads only the users and records rows past the last rowid it saw (rows are never deleted, rowids only grow)'''
+
+    def __init__(self, path: str = 'users.sqlite3', legacyPath: str = 'users.json') -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL') # WAL stays consistent after a crash, only the last commits can be lost on power loss
+        with self.connection:
+            self.connection.executescript('''
+                CREATE TABLE IF NOT EXISTS users (
+                    name TEXT PRIMARY KEY,
+                    maxScore REAL NOT NULL DEFAULT 0,
+                    games INTEGER NOT NULL DEFAULT 0,
+                    stats TEXT
+                );
+                CREATE TABLE IF NOT EXISTS records (
+                    userName TEXT NOT NULL,
+                    gameNumber INTEGER NOT NULL,
+                    wordLength INTEGER,
+                    win INTEGER,
+                    score REAL NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (userName, gameNumber)
+                );
+            ''')
+
+        columns = [row[1] for row in self.connection.execute('PRAGMA table_info(users)')]
+        if 'stats' not in columns: # databases made before statistics were kept
+            with self.connection:
+                self.connection.execute('ALTER TABLE users ADD COLUMN stats TEXT')
+
+        self.counts: Dict[str, int] = {} # records per user this process knows about
+        self.newUsers: List[str] = [] # what other processes added, handed out by refresh
+        self.newRecords: List[Tuple[str, Dict[str, Any]]] = []
+        self.userRow = self.recordRow = 0 # rowids refresh has looked at up to
+        isEmpty = self.connection.execute('SELECT 1 FROM users LIMIT 1').fetchone() is None
+        if isEmpty and os.path.exists(legacyPath):
+            self.importFrom(JsonStore(legacyPath)) # first start after switching from users.json
+        self.dataVersion = self.__dataVersion()
+        with self.connection:
+            self.connection.execute('BEGIN') # one snapshot, a commit between the reads would be missed or counted twice
+            self.counts = dict(self.connection.execute('SELECT name, games FROM users'))
+            self.userRow = self.__lastRow('users')
+            self.recordRow = self.__lastRow('records')
+
+    def __dataVersion(self) -> int:
+        return self.connection.execute('PRAGMA data_version').fetchone()[0] # changes when another connection commits
+
+    def __lastRow(self, table: str) -> int:
+        return self.connection.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM {table}').fetchone()[0]
+
+    def __noteRecords(self, userName: str, games: int) -> None:
+        '''keeps the records [known, games) of the user, written by other processes, for refresh'''
+        known = self.counts.get(userName)
+        if known is None:
+            self.newUsers.append(userName)
+            known = 0
+        if games > known:
+            self.newRecords.extend((userName, record) for record in self.__readRecords(userName, known, games))
+        self.counts[userName] = max(known, games)
+
+    def refresh(self) -> Tuple[List[str], List[Tuple[str, Dict[str, Any]]]]:
+        dataVersion = self.__dataVersion()
+        if dataVersion != self.dataVersion:
+            self.dataVersion = dataVersion
+            with self.connection:
+                self.connection.execute('BEGIN')
+                users = self.connection.execute('SELECT rowid, name FROM users WHERE rowid > ? ORDER BY rowid', (self.userRow,))
+                for rowid, userName in users.fetchall():
+                    self.userRow = rowid
+                    if userName not in self.counts:
+                        self.newUsers.append(userName)
+                        self.counts[userName] = 0
+                rows = self.connection.execute(
+                    'SELECT rowid, userName, gameNumber, data FROM records WHERE rowid > ? ORDER BY rowid', (self.recordRow,))
+                for rowid, userName, gameNumber, data in rows.fetchall():
+                    self.recordRow = rowid
+                    if gameNumber >= self.counts.get(userName, 0): # lower ones were written or read by appendRecords already
+                        self.newRecords.append((userName, json.loads(data)))
+                        self.counts[userName] = gameNumber + 1
+        changes = (self.newUsers, self.newRecords)
+        self.newUsers, self.newRecords = [], []
+        return changes
+
+    def userSummaries(self) -> Dict[str, float]:
+        return dict(self.connection.execute('SELECT name, maxScore FROM users'))
+
+    def iterRecords(self, userName: str, start: int = 0, stop: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        '''only the records refresh has handed out, the ones other processes added since come with the next refresh'''
+        known = self.counts.get(userName, 0)
+        return self.__readRecords(userName, start, known if stop is None else min(stop, known))
+
+    def __readRecords(self, userName: str, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        rows = self.connection.execute(
+            'SELECT data FROM records WHERE userName = ? AND gameNumber >= ? AND gameNumber < ? ORDER BY gameNumber',
+            (userName, start, stop)
+        )
+        return (json.loads(data) for data, in rows)
+
+    def iterAllRecords(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self.connection.execute('SELECT userName, data FROM records ORDER BY userName, gameNumber')
+        return ((userName, json.loads(data)) for userName, data in rows)
+
+    def recordCount(self, userName: str) -> int:
+        return self.counts.get(userName, 0)
+
+    def totalRecords(self) -> int:
+        return self.connection.execute('SELECT COALESCE(SUM(games), 0) FROM users').fetchone()[0]
+
+    def addUser(self, userName: str) -> None:
+        self.addUsers([userName])
+
+    def addUsers(self, userNames: Iterable[str]) -> None:
+        userNames = list(userNames)
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            caughtUp = self.__lastRow('users') == self.userRow
+            self.connection.executemany('INSERT OR IGNORE INTO users (name) VALUES (?)', ((userName,) for userName in userNames))
+            if caughtUp: # only our own rows are new, refresh does not have to look at them
+                self.userRow = self.__lastRow('users')
+        for userName in userNames:
+            self.counts.setdefault(userName, 0) # records another process gave the user already are found by refresh
+
+    def appendRecords(self, records: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        '''inserts the whole batch in one transaction'''
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE') # takes the write lock now, the game numbers read below stay ours
+            caughtUp = self.__lastRow('records') == self.recordRow
+            games: Dict[str, int] = {}
+            best: Dict[str, float] = {}
+            rows = []
+            for userName, record in records:
+                if userName not in games:
+                    row = self.connection.execute('SELECT games, maxScore FROM users WHERE name = ?', (userName,)).fetchone()
+                    if row is None:
+                        continue # unknown user
+                    games[userName], best[userName] = row
+                    self.__noteRecords(userName, row[0])
+                score = scoreOf(record)
+                rows.append((userName, games[userName], record.get("wordLength"), int(bool(record.get("win"))), score, json.dumps(record)))
+                games[userName] += 1
+                best[userName] = max(best[userName], score)
+
+            self.connection.executemany('INSERT INTO records VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.connection.executemany(
+                'UPDATE users SET games = ?, maxScore = ? WHERE name = ?',
+                ((games[userName], best[userName], userName) for userName in games)
+            )
+            if caughtUp:
+                self.recordRow = self.__lastRow('records')
+        self.counts.update(games)
+
+    def loadStats(self, userNames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for userName in userNames:
+            row = self.connection.execute('SELECT stats, games FROM users WHERE name = ?', (userName,)).fetchone()
+            if row and row[0]:
+                userStats = json.loads(row[0])
+                if userStats.get("games") == row[1] == self.counts.get(userName):
+                    stats[userName] = userStats
+        return stats
+
+    def saveStats(self, stats: Dict[str, Dict[str, Any]]) -> None:
+        with self.connection:
+            self.connection.executemany('UPDATE users SET stats = ? WHERE name = ?',
+                                        ((json.dumps(userStats), userName) for userName, userStats in stats.items()))
+
+    def importFrom(self, source: UserStore) -> None:
+        '''copies every user and record from another store'''
+        self.addUsers(source.userSummaries())
+        self.appendRecords(source.iterAllRecords())
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def openStore(kind: Optional[str] = None) -> UserStore:
+    '''opens the storage backend named by kind or the WORDLE_STORE environment variable: journal (default), sqlite or json'''
+    kind = (kind or os.environ.get('WORDLE_STORE') or 'journal').lower()
+    if kind == 'sqlite':
+        return SqliteStore()
+    if kind == 'json':
+        return JsonStore()
+    if kind == 'journal':
+        return JournalStore()
+    raise ValueError(f"Unknown user store '{kind}', use journal, sqlite or json")
@@ -1,5 +1,11 @@
-import json
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
+from userStorage import UserStore, openStore, scoreOf
+from leaderboard import Leaderboard
+from instrumentation import timed
+from transcripts import TranscriptLog
+from feedback import decodeFeedback, scoreGuesses
+
+STATS_SAVE_EVERY = 50 # games between saves of the user statistics, they are rebuilt from the records if the last ones are lost
 
 class userNameExists(Exception):
     pass
@@ -8,30 +14,43 @@ class invalidUserName(Exception):
     pass
 
 class Users:
-    def __init__(self) -> None:
+    def __init__(self, store: Optional[UserStore] = None, transcripts: Optional[TranscriptLog] = None) -> None:
+        self.store = store if store is not None else openStore() # where users and records are persisted, picked by WORDLE_STORE
+        self.transcripts = transcripts if transcripts is not None else TranscriptLog() # the words of every game, records point into it
         self.usersDict: Dict[str, "account"] = self.__readAllUsers() # A dictionary of account instances, 
-        
-        if self.usersDict:
-            self.recordScore: float = max(account.maxScore for account in self.usersDict.values())
-        else:
-            self.recordScore = 0
+        self.leaderboard = Leaderboard.open(self.store) # best players overall and per word length, kept up to date with every record
+        self.recordScore: float = self.leaderboard.best()
+        self.statsCache: Dict[str, UserStats] = {} # statistics of the users that were looked at or played this session
+        self.unsavedStats = set() # users whose statistics changed since they were last saved
+        self.unsavedGames = 0
 
     def __readAllUsers(self) -> Dict[str, "account"]:
         '''read all users into a dictionary, where the usernames are the keys and the values are instances of the account class'''
         userDict = {}
-        try:
-            with open('users.json', 'r') as file: #
-                data = json.load(file)
-                for userName, userData in data.items(): # for all key(username) value(records) pairs in the json file, set the key to username and value to a instance of accounts
-                    records = userData["records"]
-                    userDict[userName] = account(userName, records)
-        except FileNotFoundError:
-            pass
-        
+        for userName, maxScore in self.store.userSummaries().items(): # only the best score is read now, the records are loaded when the account needs them
+            userDict[userName] = account(userName, maxScore=maxScore, loadRecords=self.store.iterRecords)
         return userDict
 
+    def refresh(self) -> bool:
+        '''merges the users and records other processes (another game, the server) added to the store since the last look
+        into usersDict, the record score, the leaderboard and the statistics. Only a version check when nothing changed.
+        True is returned iff anything was merged'''
+        newUsers, newRecords = self.store.refresh()
+        for userName in newUsers:
+            if userName not in self.usersDict:
+                self.usersDict[userName] = account(userName, maxScore=0, loadRecords=self.store.iterRecords)
+        for username, record in newRecords:
+            if username not in self.usersDict:
+                continue
+            if username in self.statsCache:
+                game = self.transcripts.read(record["transcript"]) if "transcript" in record else None
+                self.statsCache[username].add(record, game and game["guesses"], game and game["codes"])
+            self.__addScore(username, record)
+        return bool(newUsers or newRecords)
+
     def addNewUser(self, userName: str) -> None:
-        '''adds a new user to the json file and users.usersDict, if username already exists, a error userNameExists is raised, if username is empty a invalidUserName is raised'''
+        '''adds a new user to the store and users.usersDict, if username already exists, a error userNameExists is raised, if username is empty a invalidUserName is raised'''
+        self.refresh() # the name may have been taken by another process
         if userName in self.usersDict:
             raise userNameExists(f"User '{userName}' already exists.")
 
@@ -40,60 +59,167 @@ class Users:
 
         new_account = account(userName, [])
         self.usersDict[userName] = new_account # add to the userDict
-        self.__saveUsers(userName) # call a function that stores the new user perminently in a json file
+        self.store.addUser(userName) # store the new user perminently
+        self.refresh() # what the store read from other processes while writing
+            
+    @timed('users.addNewRecordToUser')
+    def addNewRecordToUser(self, username: str, wordLength: int, guesses: List[Any],guessesNeeded: int, isWinner: bool,
+                           daily: Optional[str] = None, secret: Optional[str] = None, guessWords: Optional[List[str]] = None) -> None:
+        '''adds a new record to the user pased in , if the userName does not exist then nothing is done.
+        guesses is the number of guesses the game allowed. daily is the iso date of the daily challenge the game was, it puts the game on that day's leaderboard.
+        When the secret and the words guessed are passed in the game's transcript is stored too, for replays'''
+        self.addNewRecords([(username, wordLength, guesses, guessesNeeded, isWinner, daily, secret, guessWords)])
 
-    def __saveUsers(self, userName: str) -> None:
-        with open('users.json', 'r') as file:
-            data: Dict[str, Any] = json.load(file) # load the intire json file
+    def addNewRecords(self, games: List[Tuple]) -> None:
+        '''adds many (username, wordLength, guesses, guessesNeeded, isWinner[, daily[, secret, guessWords]]) records with one write to the store
+        and one write of the transcripts of the games that have their words, records of users that do not exist are skipped'''
+        self.refresh() # users made by other processes can get records too
+        records, transcripts = [], []
+        for username, wordLength, guesses, guessesNeeded, isWinner, *extra in games:
+            if username not in self.usersDict:
+                continue
+            daily, secret, guessWords = (list(extra) + [None, None, None])[:3]
+            record = {
+                "wordLength": wordLength,
+                "guesses": guesses,
+                "guessesNeeded": guessesNeeded,
+                "win": isWinner
+            }
+            if daily:
+                record["daily"] = daily
+            if secret and guessWords is not None:
+                transcripts.append((record, (username, secret, guessWords, guesses, daily)))
+            records.append((username, record, secret, guessWords))
 
-        data[userName] = {"records": []} # add the record to the data and then dump that data into the file again
+        if transcripts: # written first so the records can keep where their transcript is
+            offsets = self.transcripts.appendGames(game for _, game in transcripts)
+            for (record, _), offset in zip(transcripts, offsets):
+                if offset is not None:
+                    record["transcript"] = offset
+        self.__loadStats({username for username, *_ in records}) # before the new records are in the store, or the saved counters would look behind
+        with self.store.batch(): # the records and any statistics saved with them go out in one write
+            if records:
+                self.store.appendRecords((username, record) for username, record, *_ in records) ## appended to the journal/database instead of rewriting every user
 
-        with open('users.json', 'w') as file:
-            json.dump(data, file, indent=4)
-            
-    def addNewRecordToUser(self, username: str, wordLength: int, guesses: List[Any],guessesNeeded: int, isWinner: bool) -> None:
-        '''adds a new record to the user pased in , if the userName does not exist then nothing is done'''
-        with open('users.json', 'r') as file:
-            data: Dict[str, Any] = json.load(file) # load the entire file
-        
-        if username not in data:
-            return
-        
-        if not isWinner: 
-            newScore = 0
-        else:
-            newScore = (wordLength ** 2) / guessesNeeded # SCORE IS CALCULATED WWITH THE FOLLOWING FORMULA
+            for username, record, secret, guessWords in records:
+                codes = scoreGuesses(guessWords, secret) if secret and guessWords else None
+                self.statsCache[username].add(record, guessWords, codes) # O(1), the counters never rescan old games
+                self.unsavedStats.add(username)
+                self.__addScore(username, record)
+
+            self.unsavedGames += len(records)
+            if self.unsavedGames >= STATS_SAVE_EVERY:
+                self.saveStats()
+        self.refresh() # merged now, before anything reads the store's records that came in with the write
 
-        data[username]['records'].append({ ## add new record to the data
-            "wordLength": wordLength,
-            "guesses": guesses,
-            "guessesNeeded": guessesNeeded,
-            "win": isWinner
-        })
+    def __addScore(self, username: str, record: Dict[str, Any]) -> None:
+        '''puts a new record of the user on the leaderboard, the record score and the user's scores'''
+        self.leaderboard.addRecord(username, record)
+        newScore = scoreOf(record) # SCORE IS (wordLength ** 2) / guessesNeeded FOR A WIN, ELSE 0
 
         if newScore > self.recordScore: # update record score and user record score if it applies
             self.recordScore = newScore
         if newScore > self.usersDict[username].maxScore:
             self.usersDict[username].maxScore = newScore
-            
-        with open('users.json', 'w') as file: # dump data back into file
-            json.dump(data, file, indent=4)
-        
-        recordScore = newScore  
-        newGameKey = f'game {len(self.usersDict[username].scores)}' #update userDict
-        self.usersDict[username].scores[newGameKey] = recordScore
+
+        self.usersDict[username].addScore(newScore) #update userDict
+
+    def gameCount(self, username: str) -> int:
+        '''number of games the user has played'''
+        return self.store.recordCount(username)
+
+    def iterGames(self, username: str, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, Dict[str, Any], float]]:
+        '''yields (game number, record, score) for the games [start, stop) of the user, only that range is read from the store'''
+        for gameNumber, record in enumerate(self.store.iterRecords(username, start, stop), start):
+            yield gameNumber, record, scoreOf(record)
+
+    def stats(self, username: str) -> "UserStats":
+        '''the statistics of a user, read from the store, or rebuilt from the user's records if the stored ones are
+        missing or behind (a crash between saves)'''
+        self.refresh() # games the user played in another process count too
+        self.__loadStats([username])
+        return self.statsCache[username]
+
+    def __loadStats(self, usernames: Iterable[str]) -> None:
+        '''puts the statistics of the users in statsCache, the saved ones are read with one call to the store'''
+        missing = [username for username in usernames if username not in self.statsCache]
+        if not missing:
+            return
+        stored = self.store.loadStats(missing)
+        with self.transcripts.reader() as readGame: # one open transcript file for every user that is rebuilt
+            for username in missing:
+                if username in stored:
+                    self.statsCache[username] = UserStats(stored[username])
+                else:
+                    self.statsCache[username] = UserStats()
+                    for record in self.store.iterRecords(username):
+                        self.__addToStats(self.statsCache[username], record, readGame)
+                    self.unsavedStats.add(username)
+
+    @staticmethod
+    def __addToStats(userStats: "UserStats", record: Dict[str, Any], readGame: Callable[[int], Optional[Dict[str, Any]]]) -> None:
+        game = readGame(record["transcript"]) if "transcript" in record else None
+        userStats.add(record, game and game["guesses"], game and game["codes"])
+
+    def rebuildStats(self) -> None:
+        '''recomputes every user's statistics with a single streaming pass over the store's records and saves them.
+        Their transcripts are read through one open file a chunk at a time, records mostly come in the order the games were played'''
+        self.refresh() # records merged later would otherwise be counted twice
+        rebuilt: Dict[str, UserStats] = {userName: UserStats() for userName in self.usersDict}
+        with self.transcripts.reader() as readGame:
+            for userName, record in self.store.iterAllRecords():
+                if userName in rebuilt:
+                    self.__addToStats(rebuilt[userName], record, readGame)
+        self.statsCache = rebuilt
+        self.unsavedStats = set(rebuilt)
+        self.saveStats()
+
+    def saveStats(self) -> None:
+        '''persists the statistics that changed since the last save'''
+        if self.unsavedStats:
+            self.store.saveStats({username: self.statsCache[username].toDict() for username in self.unsavedStats})
+            self.unsavedStats = set()
+        self.unsavedGames = 0
+
+    def getTranscript(self, username: str, gameNumber: int) -> Optional[Dict[str, Any]]:
+        '''the secret, guesses and feedback codes of one game of the user, None if the game has no transcript'''
+        for record in self.store.iterRecords(username, gameNumber, gameNumber + 1):
+            if "transcript" in record:
+                return self.transcripts.read(record["transcript"])
+        return None
+
+    def close(self) -> None:
+        '''saves the leaderboard and the statistics and closes the store and the transcript log'''
+        self.leaderboard.save()
+        self.saveStats()
+        self.store.close()
+        self.transcripts.close()
 
 class account:
-    def __init__(self, userName: str, records: List[Dict[str, Any]]) -> None:
+    def __init__(self, userName: str, records: Optional[List[Dict[str, Any]]] = None, maxScore: float = 0,
+                 loadRecords: Optional[Callable[[str], Iterable[Dict[str, Any]]]] = None) -> None:
+        '''records can be passed in directly, otherwise they are read with loadRecords(userName) the first time scores is used'''
         self.userName: str = userName
-        self.scores = self.__getScores(records)
+        self.maxScore = maxScore
+        self.__loadRecords = loadRecords
+        self.__scores: Optional[Dict[str, float]] = self.__getScores(records) if records is not None else None
+
+    @property
+    def scores(self) -> Dict[str, float]:
+        '''every game of the user and its score, loaded lazily'''
+        if self.__scores is None:
+            maxScore = self.maxScore
+            self.__scores = self.__getScores(self.__loadRecords(self.userName) if self.__loadRecords else [])
+            self.maxScore = max(maxScore, self.maxScore)
+        return self.__scores
+
+    def addScore(self, score: float) -> None:
+        '''adds the score of a new game, if the scores have not been loaded yet they will include it when they are'''
+        if self.__scores is not None:
+            self.__scores[f'game {len(self.__scores)}'] = score
     
-    def __getScores(self, records: List[Dict[str, Any]]) -> Dict[str, float]:
+    def __getScores(self, records: Iterable[Dict[str, Any]]) -> Dict[str, float]:
         '''all scores are returned for a users records that are passed in, a dictionary is returned with the keys being the games, and values score'''
-        if not records: # no records -> empty dict returned
-            self.maxScore = 0
-            return {}
-
         recordsDict = {}
         maxScore = 0
         gameNum = 0 # counter too keep track of games
@@ -118,3 +244,87 @@ class account:
 
         self.maxScore = maxScore
         return recordsDict
+
+
+class GameAggregate:
+    '''Running totals over a stream of game records, every add is O(1) so a page or a whole history is summed in one pass'''
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = 0
+        self.totalScore = 0.0
+        self.guessDistribution: Dict[int, int] = {} # guesses needed -> number of games won with that many guesses
+
+    def add(self, record: Dict[str, Any], score: float) -> None:
+        self.games += 1
+        self.totalScore += score
+        if record.get("win"):
+            self.wins += 1
+            guessesNeeded = record.get("guessesNeeded")
+            self.guessDistribution[guessesNeeded] = self.guessDistribution.get(guessesNeeded, 0) + 1
+
+    def winRate(self) -> float:
+        return self.wins / self.games if self.games else 0
+
+    def averageScore(self) -> float:
+        return self.totalScore / self.games if self.games else 0
+
+
+class UserStats:
+    '''Running counters of one user's games: win rate, streaks, guess distribution per word length and how often each
+    guessed letter came back green, yellow or grey. add is O(1) per game (plus one step per guessed letter), the counters
+    are a plain dict so the store can persist them with the user, and "games" tells whether they are behind the records'''
+    def __init__(self, data: Optional[Dict[str, Any]] = None) -> None:
+        self.data: Dict[str, Any] = data if data is not None else {
+            "games": 0, "wins": 0, "streak": 0, "bestStreak": 0,
+            "lengths": {}, # word length -> {"games", "wins", "guesses": {guesses needed: wins}}
+            "letters": {}, # letter -> [green, yellow, grey] over every guess that had a transcript
+        }
+
+    @property
+    def games(self) -> int:
+        return self.data["games"]
+
+    def add(self, record: Dict[str, Any], guesses: Optional[List[str]] = None, codes: Optional[Iterable[int]] = None) -> None:
+        '''counts one game record, guesses and their feedback codes add to the letter counters when they are known'''
+        data = self.data
+        won = bool(record.get("win"))
+        data["games"] += 1
+        length = data["lengths"].setdefault(str(record.get("wordLength")), {"games": 0, "wins": 0, "guesses": {}})
+        length["games"] += 1
+        if won:
+            data["wins"] += 1
+            data["streak"] += 1
+            data["bestStreak"] = max(data["bestStreak"], data["streak"])
+            length["wins"] += 1
+            needed = str(record.get("guessesNeeded"))
+            length["guesses"][needed] = length["guesses"].get(needed, 0) + 1
+        else:
+            data["streak"] = 0
+
+        if guesses and codes is not None:
+            letters = data["letters"]
+            for guess, code in zip(guesses, codes):
+                for letter, digit in zip(guess, decodeFeedback(code, len(guess))):
+                    counts = letters.get(letter)
+                    if counts is None:
+                        counts = letters[letter] = [0, 0, 0]
+                    counts[2 - digit] += 1 # digit 2 is green, 1 yellow, 0 grey
+
+    def winRate(self, wordLength: Optional[int] = None) -> float:
+        counts = self.data if wordLength is None else self.data["lengths"].get(str(wordLength), {"games": 0, "wins": 0})
+        return counts["wins"] / counts["games"] if counts["games"] else 0
+
+    def guessDistribution(self, wordLength: int) -> Dict[int, int]:
+        '''guesses needed -> games won with that many, for one word length'''
+        length = self.data["lengths"].get(str(wordLength), {"guesses": {}})
+        return {int(needed): count for needed, count in length["guesses"].items()}
+
+    def letterAccuracy(self, letter: str) -> Optional[float]:
+        '''the share of the user's guesses of a letter that were in the secret (green or yellow), None if never guessed'''
+        counts = self.data["letters"].get(letter)
+        if not counts or not sum(counts):
+            return None
+        return (counts[0] + counts[1]) / sum(counts)
+
+    def toDict(self) -> Dict[str, Any]:
+        return self.data
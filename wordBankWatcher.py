@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+BANK_PATH = 'wordBankLarge.txt'
+
+
+class WordBankWatcher(threading.Thread):
+    '''Background thread that polls the word bank file and brings a running WordleEngine up to date with it.
+    Appended lines are read from the last byte offset that was applied, so only the new words are parsed.
+    A file that was replaced (different inode, like importWords.py does) or got shorter is loaded again in full.
+    Every reload updates metrics and calls onReload(metrics) when it is given'''
+
+    def __init__(self, engine, path: str = BANK_PATH, interval: float = 1.0,
+                 onReload: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        super().__init__(name='wordBankWatcher', daemon=True)
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.onReload = onReload
+        self.offset: Optional[int] = None # the engine's words come from the first offset bytes of the file
+        self.identity: Optional[tuple] = None
+        self.__follow()
+        self.stopped = threading.Event()
+        self.metrics: Dict[str, Any] = {
+            "reloads": 0, "fullReloads": 0, "wordsAdded": 0, "bytesRead": 0,
+            "lastReloadMs": 0.0, "maxReloadMs": 0.0, "totalReloadMs": 0.0,
+        }
+
+    def __follow(self) -> bool:
+        '''starts following the file from where the engine read up to, false if the engine has not opened the bank yet'''
+        if self.engine.bankOffset is None:
+            return False # it will read the whole file when it does, nothing to apply before that
+        self.offset, self.identity = self.engine.bankOffset, self.__identity()
+        return True
+
+    def __identity(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return (stat.st_dev, stat.st_ino)
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def poll(self) -> bool:
+        '''checks the file once and applies any change, true is returned iff the engine was updated'''
+        if self.offset is None and not self.__follow():
+            return False
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False # being replaced right now, the next poll sees the new file
+        identity = (stat.st_dev, stat.st_ino)
+        if identity == self.identity and stat.st_size == self.offset:
+            return False
+
+        start = time.perf_counter()
+        if identity != self.identity or stat.st_size < self.offset:
+            self.engine.reloadWordBank()
+            self.identity, self.offset = identity, self.engine.bankOffset
+            self.metrics["fullReloads"] += 1
+            added = 0
+        else:
+            with open(self.path, 'rb') as file:
+                file.seek(self.offset)
+                data = file.read(stat.st_size - self.offset)
+            end = data.rfind(b'\n') + 1 # a line that is still being written is left for the next poll
+            if end == 0:
+                return False
+            added = self.engine.applyNewWords(data[:end].decode('utf-8', 'replace').split('\n'))
+            self.offset += end
+            self.metrics["bytesRead"] += end
+
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics["reloads"] += 1
+        self.metrics["wordsAdded"] += added
+        self.metrics["lastReloadMs"] = elapsed
+        self.metrics["maxReloadMs"] = max(self.metrics["maxReloadMs"], elapsed)
+        self.metrics["totalReloadMs"] += elapsed
+        if self.onReload is not None:
+            self.onReload(dict(self.metrics))
+        return True
@@ -0,0 +1,167 @@
+import mmap
+import os
+import random
+import struct
+from typing import Any, Dict, List, Tuple
+from fileLock import locked
+from hashMap import NotFoundException
+
+# Layout of the compiled index file:
+#   header     -> magic, version, partition count, source size, source mtime (ns)
+#   partitions -> (word length, word count, byte offset) for every length
+#   data       -> every partition's words, lower case, sorted and fixed width (no separators)
+MAGIC = b'WIDX'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQ')
+PARTITION = struct.Struct('<III')
+
+
+class IndexedWordSet:
+    '''A single word length of the compiled index, words are read straight out of the mmap.
+    It has the same insert/contains/getRandomValue api as HashMap so the engine can use either one'''
+
+    def __init__(self, data: mmap.mmap, offset: int, count: int, length: int) -> None:
+        self.data = data
+        self.offset = offset
+        self.count = count
+        self.length = length
+        self.extraWords: List[str] = [] # words added after the index was built, they only live in memory
+        self.extraSet = set()
+
+    def __len__(self) -> int:
+        return self.count + len(self.extraWords)
+
+    def valueAt(self, position: int) -> str:
+        '''returns the word at position, indexed words come first (sorted) then the extra words'''
+        if position < 0:
+            position += len(self)
+        if 0 <= position < self.count:
+            start = self.offset + position * self.length
+            return self.data[start:start + self.length].decode('ascii')
+        if self.count <= position < len(self):
+            return self.extraWords[position - self.count]
+        raise IndexError('word position out of range')
+
+    __getitem__ = valueAt
+
+    def contains(self, key: Any) -> bool:
+        '''Returns true iff the word is in the index or has been inserted since, binary search over the fixed width records'''
+        if not isinstance(key, str) or len(key) != self.length:
+            return False
+        if key in self.extraSet:
+            return True
+
+        try:
+            target = key.encode('ascii')
+        except UnicodeEncodeError:
+            return False
+
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            start = self.offset + mid * self.length
+            word = self.data[start:start + self.length]
+            if word < target:
+                low = mid + 1
+            elif word > target:
+                high = mid
+            else:
+                return True
+        return False
+
+    def insert(self, key: Any, data: Any) -> None:
+        '''Adds a word that is not in the compiled index, existing words are ignored like in HashMap'''
+        if self.contains(key):
+            return
+        self.extraWords.append(key)
+        self.extraSet.add(key)
+
+    def copy(self) -> "IndexedWordSet":
+        '''a copy that shares the mmap, only the inserted words are copied'''
+        clone = IndexedWordSet(self.data, self.offset, self.count, self.length)
+        clone.extraWords = list(self.extraWords)
+        clone.extraSet = set(self.extraSet)
+        return clone
+
+    def getRandomValue(self) -> str:
+        '''returns a uniformly random word of this length'''
+        if len(self) == 0:
+            raise NotFoundException("Word set is empty")
+        return self.valueAt(random.randrange(len(self)))
+
+
+class WordIndex:
+    '''Memory mapped, length partitioned index compiled from the word bank text file'''
+
+    def __init__(self, sourcePath: str = 'wordBankLarge.txt', indexPath: str = 'wordBankLarge.idx') -> None:
+        self.sourcePath = sourcePath
+        self.indexPath = indexPath
+
+        if self.isStale(sourcePath, indexPath):
+            with locked(sourcePath): # one process compiles, the others wait and use its index
+                if self.isStale(sourcePath, indexPath):
+                    self.build(sourcePath, indexPath)
+
+        self.file = open(indexPath, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.partitions, self.sourceSize = self.__readPartitions()
+
+    def __readPartitions(self) -> Tuple[Dict[int, IndexedWordSet], int]:
+        magic, version, partitionCount, sourceSize, _ = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{self.indexPath} is not a word index')
+
+        partitions = {}
+        position = HEADER.size
+        for _ in range(partitionCount):
+            length, count, offset = PARTITION.unpack_from(self.data, position)
+            partitions[length] = IndexedWordSet(self.data, offset, count, length)
+            position += PARTITION.size
+        return partitions, sourceSize
+
+    @staticmethod
+    def isStale(sourcePath: str, indexPath: str) -> bool:
+        '''true iff the index is missing, unreadable or was compiled from a different version of the text file'''
+        try:
+            with open(indexPath, 'rb') as file:
+                header = file.read(HEADER.size)
+            magic, version, _, sourceSize, sourceMtime = HEADER.unpack(header)
+        except (OSError, struct.error):
+            return True
+
+        source = os.stat(sourcePath)
+        if magic != MAGIC or version != VERSION:
+            return True
+        return source.st_size != sourceSize or source.st_mtime_ns > sourceMtime
+
+    @staticmethod
+    def build(sourcePath: str, indexPath: str) -> None:
+        '''compiles the text word bank into the binary index, the file is written to a temp file and renamed in place'''
+        source = os.stat(sourcePath)
+        wordsByLength: Dict[int, set] = {}
+
+        with open(sourcePath, 'r') as file:
+            for line in file:
+                word = line.strip().lower()
+                if not word or not word.isascii():
+                    continue
+                wordsByLength.setdefault(len(word), set()).add(word)
+
+        lengths = sorted(wordsByLength)
+        offset = HEADER.size + PARTITION.size * len(lengths)
+        table = []
+        for length in lengths:
+            table.append(PARTITION.pack(length, len(wordsByLength[length]), offset))
+            offset += length * len(wordsByLength[length])
+
+        tempPath = indexPath + '.tmp'
+        with open(tempPath, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(lengths), source.st_size, source.st_mtime_ns))
+            file.write(b''.join(table))
+            for length in lengths:
+                file.write(''.join(sorted(wordsByLength[length])).encode('ascii'))
+        os.replace(tempPath, indexPath)
+
+    def close(self) -> None:
+        self.data.close()
+        self.file.close()
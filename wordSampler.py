@@ -0,0 +1,64 @@
+import random
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ShuffledDeck:
+    '''Hands out every position of a word set once, in random order, before any position repeats.
+    The shuffle is lazy (one Fisher-Yates swap per draw) and only the swapped positions are stored, so a deck
+    costs memory for the words drawn this round, not for the whole word set'''
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+        self.swapped: Dict[int, int] = {} # position -> what is there now, any position not in here still holds itself
+        self.cursor = 0 # positions before the cursor have been drawn this round
+
+    def draw(self, size: int) -> int:
+        '''returns the next position in [0, size), size may grow between draws when words are added.
+        New words join the part of the deck that has not been drawn yet since their positions are past the cursor'''
+        if self.cursor >= size: # deck exhausted, start a new round
+            self.cursor = 0
+            self.swapped.clear()
+
+        swap = self.rng.randrange(self.cursor, size)
+        swapped = self.swapped
+        drawn = swapped.pop(swap, swap)
+        if swap != self.cursor: # the word at the cursor takes the drawn word's place, the cursor position is never read again this round
+            swapped[swap] = swapped.pop(self.cursor, self.cursor)
+        self.cursor += 1
+        return drawn
+
+
+class WordSampler:
+    '''Uniform, constant time random picks over dense word sets (anything with len() and valueAt(position)).
+    Pass a seed for reproducible draws. Decks are kept for the maxOwners owners that drew most recently,
+    an owner that was pushed out starts over with fresh decks'''
+    def __init__(self, seed: Optional[Any] = None, maxOwners: int = 100000) -> None:
+        self.rng = random.Random(seed)
+        self.maxOwners = maxOwners
+        self.decks: 'OrderedDict[Hashable, Dict[Hashable, ShuffledDeck]]' = OrderedDict() # owner -> their decks, least recent first
+
+    def seed(self, seed: Any) -> None:
+        '''reseeds the sampler, decks that are already dealt keep their order but draw from the new sequence'''
+        self.rng.seed(seed)
+
+    def pick(self, words: Any) -> str:
+        '''returns a uniformly random word, words must not be empty'''
+        return words.valueAt(self.rng.randrange(len(words)))
+
+    def draw(self, owner: Hashable, words: Any, deckKey: Hashable = None) -> str:
+        '''returns a word from the owner's deck stored under deckKey, no word repeats until every word has been drawn'''
+        decks = self.decks.get(owner)
+        if decks is None:
+            decks = self.decks[owner] = {}
+            if len(self.decks) > self.maxOwners:
+                self.decks.popitem(last=False)
+        else:
+            self.decks.move_to_end(owner)
+        deck = decks.get(deckKey)
+        if deck is None:
+            deck = decks[deckKey] = ShuffledDeck(self.rng)
+        return words.valueAt(deck.draw(len(words)))
+
+    def forget(self, owner: Hashable) -> None:
+        '''drops every deck of an owner, for when they leave'''
+        self.decks.pop(owner, None)
@@ -0,0 +1,184 @@
+import copy
+from array import array
+from typing import Dict, Iterable, List, Optional, Set
+
+WILDCARDS = '?._' # pattern characters that match any letter
+
+
+class WordTrie:
+    '''Prefix tree of the words of one length, stored in two flat arrays instead of a node object per letter.
+    Nodes are numbered in breadth first order, so the children of a node are consecutive and the child reached
+    by edge e is node e + 1. The edges of node n are edges[firstEdge[n]:firstEdge[n + 1]] and letters[e] is the
+    letter of edge e. Every word has the same length so a node at depth length is the end of a word.
+    Words inserted after the trie was built are kept in a set next to it, like the extra words of IndexedWordSet.
+    Pattern queries use letter bitsets over the leaves that are only built the first time they are needed'''
+
+    def __init__(self, length: int, words: Iterable[str]) -> None:
+        '''words are lower case words of the length, duplicates are fine and words that are not ascii are left out'''
+        self.length = length
+        ordered = sorted(set(word.encode('ascii') for word in words if len(word) == length and word.isascii()))
+        self.count = len(ordered)
+        firstEdge = array('I', [0])
+        letters = bytearray()
+
+        ranges = [(0, len(ordered))] if ordered else [] # every node of the current depth is the range of words below it
+        for depth in range(length):
+            childRanges = []
+            for start, end in ranges:
+                position = start
+                while position < end: # the words are sorted, so the words of a child are one run of the same letter
+                    letter = ordered[position][depth]
+                    runEnd = position + 1
+                    while runEnd < end and ordered[runEnd][depth] == letter:
+                        runEnd += 1
+                    letters.append(letter)
+                    childRanges.append((position, runEnd))
+                    position = runEnd
+                firstEdge.append(len(letters))
+            ranges = childRanges
+        firstEdge.extend([len(letters)] * (len(ranges) + 1)) # the leaves have no edges
+
+        self.firstEdge = firstEdge
+        self.letters = bytes(letters)
+        self.extraWords: Set[str] = set()
+        self.__positionMasks: List[Dict[str, int]] = []
+        self.__letterMasks: Optional[Dict[str, int]] = None
+        self.__words = b''
+
+    def __len__(self) -> int:
+        return self.count + len(self.extraWords)
+
+    def __walk(self, prefix: str) -> int:
+        '''node reached by the letters of prefix, -1 if no word starts with it'''
+        node = 0
+        firstEdge, letters = self.firstEdge, self.letters
+        for letter in prefix:
+            edge = letters.find(ord(letter), firstEdge[node], firstEdge[node + 1])
+            if edge < 0:
+                return -1
+            node = edge + 1
+        return node
+
+    def contains(self, word: str) -> bool:
+        '''true iff word is one of the words'''
+        if len(word) != self.length or not word.isascii():
+            return False
+        return self.count > 0 and self.__walk(word) >= 0 or word in self.extraWords
+
+    def hasPrefix(self, prefix: str) -> bool:
+        '''true iff some word starts with prefix'''
+        if len(prefix) > self.length or not prefix.isascii():
+            return False
+        if self.count > 0 and self.__walk(prefix) >= 0:
+            return True
+        return any(word.startswith(prefix) for word in self.extraWords)
+
+    def insert(self, word: str) -> None:
+        if not self.contains(word):
+            self.extraWords.add(word)
+
+    def copy(self) -> "WordTrie":
+        '''a copy that shares the arrays and pattern bitsets, only the inserted words are copied'''
+        clone = copy.copy(self)
+        clone.extraWords = set(self.extraWords)
+        return clone
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        '''the words that start with prefix in alphabetical order, at most limit of them'''
+        if len(prefix) > self.length or not prefix.isascii():
+            return []
+        node = self.__walk(prefix) if self.count else -1
+        found = self.__wordsBelow(node, prefix.encode('ascii'), limit) if node >= 0 else []
+        extra = [word for word in self.extraWords if word.startswith(prefix)]
+        if extra:
+            found = sorted(found + extra)
+        return found[:limit] if limit is not None else found
+
+    def match(self, pattern: str, include: str = '', exclude: str = '', limit: Optional[int] = None) -> List[str]:
+        '''the words that fit pattern, like 'c?a?e' where ? (or . or _) is any letter, contain every letter of include
+        and none of exclude, in alphabetical order and at most limit of them'''
+        pattern = pattern.lower()
+        if len(pattern) != self.length or not pattern.isascii():
+            return []
+        include, exclude = include.lower(), exclude.lower()
+
+        found: List[str] = []
+        if self.count:
+            if self.__letterMasks is None:
+                self.__buildMasks()
+            everything = (1 << self.count) - 1
+            matches = everything # bit i is set while word i (in sorted order) still fits
+            for position, wanted in enumerate(pattern):
+                if wanted not in WILDCARDS:
+                    matches &= self.__positionMasks[position].get(wanted, 0)
+            for letter in include:
+                matches &= self.__letterMasks.get(letter, 0)
+            for letter in exclude:
+                matches &= everything ^ self.__letterMasks.get(letter, 0)
+            found = self.__wordsOf(matches, limit)
+
+        if self.extraWords:
+            extra = [word for word in self.extraWords if _fits(word, pattern, set(include), set(exclude))]
+            found = sorted(found + extra)
+        return found[:limit] if limit is not None else found
+
+    def __buildMasks(self) -> None:
+        '''bitsets over the words in sorted order (the order of the leaves): one per letter at every position and
+        one per letter anywhere in the word, made the first time a pattern is matched'''
+        size = (self.count + 7) // 8
+        positionBits = [{} for _ in range(self.length)]
+        letterBits = {}
+        words = self.__sortedWords()
+        for index in range(self.count):
+            byte, bit = index >> 3, 1 << (index & 7)
+            word = words[index * self.length:(index + 1) * self.length]
+            for position, letter in enumerate(word):
+                bits = positionBits[position].get(letter)
+                if bits is None:
+                    bits = positionBits[position][letter] = bytearray(size)
+                bits[byte] |= bit
+                bits = letterBits.get(letter)
+                if bits is None:
+                    bits = letterBits[letter] = bytearray(size)
+                bits[byte] |= bit
+        self.__positionMasks = [{chr(letter): int.from_bytes(bits, 'little') for letter, bits in masks.items()} for masks in positionBits]
+        self.__letterMasks = {chr(letter): int.from_bytes(bits, 'little') for letter, bits in letterBits.items()}
+        self.__words = words
+
+    def __sortedWords(self) -> bytes:
+        '''every word in sorted order packed back to back, read off the trie'''
+        return ''.join(self.__wordsBelow(0, b'', None)).encode('ascii')
+
+    def __wordsBelow(self, node: int, prefix: bytes, limit: Optional[int]) -> List[str]:
+        '''the words under node (reached by prefix) in order, walking depth first until limit words are found'''
+        found = []
+        firstEdge, letters, length = self.firstEdge, self.letters, self.length
+        stack = [(node, prefix)]
+        while stack and (limit is None or len(found) < limit):
+            node, word = stack.pop()
+            if len(word) == length:
+                found.append(word.decode('ascii'))
+                continue
+            for edge in range(firstEdge[node + 1] - 1, firstEdge[node] - 1, -1): # reversed so the smallest letter is popped first
+                stack.append((edge + 1, word + letters[edge:edge + 1]))
+        return found
+
+    def __wordsOf(self, matches: int, limit: Optional[int]) -> List[str]:
+        '''the words whose bits are set, the bits are found by searching the binary string in C instead of bit by bit'''
+        if not matches:
+            return []
+        bits = bin(matches)[:1:-1] # bit 0 first
+        length, words = self.length, self.__words
+        found = []
+        index = bits.find('1')
+        while index >= 0 and (limit is None or len(found) < limit):
+            found.append(words[index * length:(index + 1) * length].decode('ascii'))
+            index = bits.find('1', index + 1)
+        return found
+
+
+def _fits(word: str, pattern: str, required: Set[str], excluded: Set[str]) -> bool:
+    '''the same test as WordTrie.match for one word'''
+    if any(wanted not in WILDCARDS and wanted != letter for wanted, letter in zip(pattern, word)):
+        return False
+    return required.issubset(word) and excluded.isdisjoint(word)
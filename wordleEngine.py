@@ -1,5 +1,21 @@
+import datetime
+import os
 import random
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional
+from daily import DailySchedule
+from difficulty import DifficultyIndex
+from feedback import feedbackCode, renderFeedback, scoreGuesses, scoreSecrets, winningCode
+from feedbackMatrix import MAX_MATRIX_BYTES, FeedbackMatrix, MatrixTooLarge
+from fileLock import locked
 from hashMap import HashMap
+from instrumentation import increment, timed
+from lazyWordSets import LazyWordSets
+from solver import Solver
+from wordIndex import WordIndex
+from wordSampler import WordSampler
+from wordTrie import WordTrie
 
 class NoWordExists(Exception):
     pass
@@ -12,77 +28,198 @@ class wordNotInDict(Exception):
 
 
 class WordleEngine:
-    def __init__(self) -> None:
-        self.wordDict = self.__readWordBank()
+    def __init__(self, useIndex: bool = True, seed: Any = None) -> None:
+        '''useIndex loads the words from the compiled binary index (rebuilt when the text file changes), otherwise the text file is hashed word by word.
+        Nothing is read here, the bank is opened and each length's word set is made the first time that length is asked for (see prefetch).
+        seed makes the secret words reproducible'''
+        self.wordBankLock = threading.RLock() # held while the word sets change, the bank watcher thread changes them too
+        self.useIndex = useIndex
+        self.wordIndex: Optional[WordIndex] = None
+        self.bankWords: Dict[int, List[str]] = {} # text bank words of the lengths that have not been hashed yet
+        self.bankOffset: Optional[int] = None # bytes of wordBankLarge.txt that are in wordDict, None until the bank is opened
+        self.wordDict = LazyWordSets(self.__loadWordSet, self.wordBankLock)
+        self.sampler = WordSampler(seed)
+        self.feedbackMatrices: Dict[int, FeedbackMatrix] = {} # built on demand by getFeedbackMatrix
+        self.dailySchedule: Optional[DailySchedule] = None # opened the first time a daily word is asked for
+        self.tries: Dict[int, WordTrie] = {} # prefix index per length for validation, autocomplete and patterns, built on first use
+        self.difficultyIndexes: Dict[int, DifficultyIndex] = {} # difficulty bands per length, loaded or built on first use
         
-    def getWord(self, length: int) -> str:
-        '''returns a word from word bank that matches the length entered, A NoWordExists error is raised if nothing is found '''
-        try:
-            return self.wordDict[length].getRandomValue()
-        except NoWordExists:
+    def getWord(self, length: int, player: Optional[str] = None, day: Optional[datetime.date] = None,
+                difficulty: Optional[str] = None) -> str:
+        '''returns a uniformly random word from word bank that matches the length entered, A NoWordExists error is raised if nothing is found.
+        When a player is passed in they get no repeats until they have been given every word of that length.
+        When a difficulty ('easy', 'medium' or 'hard') is passed in the word is drawn from that band only.
+        When a day is passed in the daily challenge word of that day is returned instead, the same for every player'''
+        if day is not None:
+            if self.dailySchedule is None:
+                self.dailySchedule = DailySchedule(self.wordList)
+            word = self.dailySchedule.wordFor(length, day)
+            if word is None:
+                raise NoWordExists()
+            return word
+
+        words = self.wordDict.get(length)
+        if words is None or len(words) == 0:
             raise NoWordExists()
+        if difficulty is not None:
+            words = self.getDifficultyIndex(length).bandView(difficulty, words)
+            if len(words) == 0:
+                raise NoWordExists()
+
+        if player is None:
+            return self.sampler.pick(words)
+        return self.sampler.draw(player, words, (length, difficulty))
                 
-    def __readWordBank(self) -> dict:
-        wordLengthDict: dict[int, HashMap] = {}
+    def __readWordBank(self) -> Dict[int, List[str]]:
+        '''the words of the text bank by length, only split into lists, the hash maps are made per length when needed'''
+        wordsByLength: dict[int, list] = {}
 
         with open('wordBankLarge.txt', 'r') as file:
+            self.bankOffset = os.fstat(file.fileno()).st_size # lines appended while reading are read again later, inserts ignore repeats
             for line in file:
                 word = line.strip().lower()
-                length = len(word)
-                
-                if length not in wordLengthDict:
-                    wordLengthDict[length] = HashMap()
-                
-                wordLengthDict[length].insert(word, word)
-        
-        return wordLengthDict
+                wordsByLength.setdefault(len(word), []).append(word)
+
+        return wordsByLength
+
+    @timed('engine.openBank')
+    def __openBank(self) -> None:
+        '''opens the index (compiling it if the text file changed) or reads the text file, sets bankOffset'''
+        if self.useIndex:
+            wordIndex = WordIndex() # an index being replaced stays valid for whoever still reads the old mmap
+            self.wordIndex, self.bankOffset = wordIndex, wordIndex.sourceSize
+        else:
+            self.bankWords = self.__readWordBank()
+
+    @timed('engine.loadWordSet')
+    def __loadWordSet(self, length: int) -> Any:
+        '''makes the word set of one length, None if the bank has no words of that length. Called by wordDict with the lock held'''
+        if self.bankOffset is None:
+            self.__openBank()
+        if self.useIndex:
+            return self.wordIndex.partitions.get(length)
+
+        words = self.bankWords.pop(length, None)
+        if words is None:
+            return None
+        wordSet = HashMap(expectedItems=len(words)) # the word count is known so the map is presized and never rebuilt
+        for word in words:
+            wordSet.insert(word, word)
+        return wordSet
+
+    def prefetch(self, lengths: Iterable[int] = (5, 4, 6, 3, 7, 8)) -> threading.Thread:
+        '''loads the word sets and prefix indexes of lengths on a background thread, most played lengths first,
+        so they are ready by the time a game asks for them. Returns the started thread'''
+        return self.wordDict.prefetch(lengths, self.getTrie)
+
+
+    def applyNewWords(self, words: Iterable[str]) -> int:
+        '''adds words that were appended to the bank file by someone else, returns how many were new.
+        The word sets and tries of the lengths that change are copied, updated and swapped in with one assignment,
+        so a game in progress only ever sees the old or the new words, never a set that is half updated'''
+        with self.wordBankLock:
+            newWords: Dict[int, Dict[str, None]] = {}
+            for word in words:
+                word = word.strip().lower()
+                current = self.wordDict.get(len(word))
+                if word and (current is None or not current.contains(word)):
+                    newWords.setdefault(len(word), {})[word] = None
+            if not newWords:
+                return 0
+
+            wordDict, tries = self.wordDict.copy(), dict(self.tries)
+            for length, lengthWords in newWords.items():
+                current = wordDict.get(length)
+                wordSet = current.copy() if current is not None else HashMap(expectedItems=len(lengthWords))
+                trie = tries[length].copy() if length in tries else None
+                for word in lengthWords:
+                    wordSet.insert(word, word)
+                    if trie is not None:
+                        trie.insert(word)
+                wordDict[length] = wordSet
+                if trie is not None:
+                    tries[length] = trie
+
+            self.wordDict, self.tries = wordDict, tries
+            # the matrices of these lengths are missing the new words, their files fail the checksum and are rebuilt on load
+            self.feedbackMatrices = {length: matrix for length, matrix in self.feedbackMatrices.items() if length not in newWords}
+            return sum(len(lengthWords) for lengthWords in newWords.values())
+
+    def reloadWordBank(self) -> None:
+        '''loads the whole bank again, for when the file was replaced or cut short instead of appended to'''
+        with self.wordBankLock:
+            self.__openBank() # recompiled since the text file changed, lengths are loaded again when they are asked for
+            self.wordDict = LazyWordSets(self.__loadWordSet, self.wordBankLock)
+            self.tries = {}
+            self.feedbackMatrices = {}
+            self.difficultyIndexes = {} # their positions refer to the old order, the files fail the checksum and are rebuilt
+            self.sampler.decks.clear() # word positions have moved
+
+    def getTrie(self, length: int) -> Optional[WordTrie]:
+        '''the prefix index of the words of a length, None if there are none. It is built with the lock held, so a
+        trie of the old words never lands in the tries applyNewWords swapped in, and two threads never build the same one'''
+        trie = self.tries.get(length)
+        if trie is None:
+            with self.wordBankLock:
+                trie = self.tries.get(length) # another thread may have built it while this one waited
+                if trie is None:
+                    words = self.wordDict.get(length)
+                    if words is None or len(words) == 0:
+                        return None
+                    trie = self.tries[length] = WordTrie(length, self.wordList(length))
+        return trie
+
+    def isValidPrefix(self, prefix: str, length: int) -> bool:
+        '''returns true iff some word of the length starts with prefix, used to check a guess while it is typed'''
+        trie = self.getTrie(length)
+        return trie is not None and trie.hasPrefix(prefix.lower())
+
+    def completeWord(self, prefix: str, length: int, limit: int = 5) -> List[str]:
+        '''the first limit words of the length (alphabetically) that start with prefix'''
+        trie = self.getTrie(length)
+        return trie.complete(prefix.lower(), limit) if trie else []
 
+    def matchPattern(self, pattern: str, include: str = '', exclude: str = '', limit: Optional[int] = None) -> List[str]:
+        '''the words that fit a pattern like 'c?a?e' (? is any letter), contain every letter of include and none of exclude'''
+        trie = self.getTrie(len(pattern))
+        return trie.match(pattern, include, exclude, limit) if trie else []
 
+    @timed('engine.validateGuess')
     def validateGuess(self, word: str, lettersCount: int) -> bool:
         '''validates guess, true is returned if the guess is of correct length and is only letters, else false'''
-        if not self.wordDict[lettersCount].contains(word):
+        trie = self.getTrie(lettersCount)
+        if trie is None or not trie.contains(word):
+            increment('engine.guessNotInDict')
             raise wordNotInDict()
             
         return len(word) == lettersCount and word.isalpha()
     
     @staticmethod
     def generateHint(secret: str, guess: str) -> str:
-        '''Generates a wordle hint, C is in correct position, c not correct position, - not in word'''
+        '''Generates a coloured wordle hint, C is in correct position, c not correct position, - not in word'''
         secret, guess = secret.lower(), guess.lower()
-        hint = ['-'] * len(secret)
-        letterCount = {}
-
-        for ch in secret: # dictionary that counts how many times each letter appears
-            if ch in letterCount:
-                letterCount[ch] += 1
-            else:
-                letterCount[ch] = 1
-
-        for i in range(len(secret)): # loop trough word and add a upper case C if letter is in correct position and also subtract from the dictionary
-            if guess[i] == secret[i]:
-                hint[i] = 'C'
-                letterCount[guess[i]] -= 1
-                
-        for i in range(len(secret)): # loop trough word again, add a lowercase c iff word is in secret and the dictionary number for letter is larger than 0
-            if hint[i] != 'C' and guess[i] in letterCount and letterCount[guess[i]] > 0:
-                hint[i] = 'c'
-                letterCount[guess[i]] -= 1
-                
-        # ---- Here below I turn the hint genereated into a hint that has colours----
-        GREEN = "\033[92m" 
-        YELLOW = "\033[93m"
-        RESET = "\033[0m" 
-
-        coloredHint = "" 
-        for ch in hint:
-            if ch == 'C':
-                coloredHint += f"{GREEN}C{RESET}"
-            elif ch == 'c':
-                coloredHint += f"{YELLOW}c{RESET}"
-            else:
-                coloredHint += ch
-
-        return coloredHint
+        return renderFeedback(feedbackCode(secret, guess), len(secret))
+
+    @staticmethod
+    @timed('engine.generateFeedbackCode')
+    def generateFeedbackCode(secret: str, guess: str) -> int:
+        '''returns the raw base 3 feedback code of a guess, no strings are built. Render it with renderHint when it has to be displayed'''
+        return feedbackCode(secret.lower(), guess.lower())
+
+    @staticmethod
+    def renderHint(code: int, letterCount: int) -> str:
+        '''the coloured hint for a feedback code, the same string generateHint returns'''
+        return renderFeedback(code, letterCount)
+
+    @staticmethod
+    def scoreGuessAgainstSecrets(guess: str, secrets: Iterable[str]) -> array:
+        '''feedback codes of one lower case guess against many lower case secrets, in one call'''
+        return scoreSecrets(guess, secrets)
+
+    @staticmethod
+    def scoreGuessesAgainstSecret(guesses: Iterable[str], secret: str) -> array:
+        '''feedback codes of many lower case guesses against one lower case secret, in one call'''
+        return scoreGuesses(guesses, secret)
     
     @staticmethod
     def isWinner(wordHint: str, letterCount: int) -> bool:
@@ -90,6 +227,49 @@ class WordleEngine:
         GREEN_C = "\033[92mC\033[0m" # this is basically what a green C represents, word is correct if it is this times the word length
         return wordHint == GREEN_C * letterCount
 
+    @staticmethod
+    def isWinningCode(code: int, letterCount: int) -> bool:
+        '''returns true iff every letter of the feedback code is correct'''
+        return code == winningCode(letterCount)
+
+    def wordList(self, length: int) -> List[str]:
+        '''every word of the length in word set order (the order feedback matrix positions refer to), empty list if there are none'''
+        words = self.wordDict.get(length)
+        if words is None:
+            return []
+        return [words.valueAt(position) for position in range(len(words))]
+
+    def getFeedbackMatrix(self, length: int, workers: Optional[int] = None, maxBytes: int = MAX_MATRIX_BYTES) -> FeedbackMatrix:
+        '''returns the guess x secret feedback matrix of a word length. It is loaded from disk when a valid one is stored,
+        else it is built across a process pool of workers processes (default one per core) and saved.
+        MatrixTooLarge is raised instead of building one over maxBytes, the solver works without it'''
+        matrix = self.feedbackMatrices.get(length)
+        if matrix is None:
+            words = self.wordList(length)
+            path = FeedbackMatrix.pathFor(length)
+            matrix = FeedbackMatrix.load(path, words) or FeedbackMatrix.build(path, words, workers, maxBytes)
+            self.feedbackMatrices[length] = matrix
+        return matrix
+
+    def getDifficultyIndex(self, length: int, workers: Optional[int] = None) -> DifficultyIndex:
+        '''returns the difficulty bands of a word length. They are loaded from disk when a valid index is stored,
+        else every word is scored across a process pool of workers processes (default one per core) and the index saved.
+        Words added later are kept out of the bands until the index is built again'''
+        index = self.difficultyIndexes.get(length)
+        if index is None:
+            words = self.wordList(length)
+            path = DifficultyIndex.pathFor(length)
+            index = DifficultyIndex.load(path, words)
+            if index is None:
+                index = DifficultyIndex.build(path, words, Solver(self, length, words).opener(), workers)
+            self.difficultyIndexes[length] = index
+        return index
+
+    def invalidateFeedbackMatrix(self, length: int) -> None:
+        '''drops the matrix of a length from memory. The file is left alone, the checksum of the words in its header
+        no longer matches so it is rebuilt the next time the matrix is asked for, not on every added word'''
+        self.feedbackMatrices.pop(length, None) # not closed, a solver may still be reading it
+
     def validateWordLength(self, value: str) -> bool:
         'validates the word length of a game, returns true iff word length is 3-8 '
         if not value.isdigit():
@@ -110,20 +290,25 @@ class WordleEngine:
         if not newWord: 
             return
         
-        if self.wordDict[len(newWord)].contains(newWord):
+        trie = self.getTrie(len(newWord))
+        if trie is not None and trie.contains(newWord):
             raise wordAlreadyExists()
         
         newWordLength = len(newWord)
         
-        try:
-            self.wordDict[newWordLength].insert(newWord, newWord) # add word to Worddict
-        except KeyError:
-            pass
+        with self.wordBankLock:
+            try:
+                self.wordDict[newWordLength].insert(newWord, newWord) # add word to Worddict
+            except KeyError:
+                pass
+            trie = self.tries.get(newWordLength) # applyNewWords may have swapped in a new one since the check above
+            if trie is not None:
+                trie.insert(newWord)
+            self.invalidateFeedbackMatrix(newWordLength) # the matrix of this length is missing the new word
             
-        
-        # Append the new word to the file
-        with open('wordBankLarge.txt', 'a') as file:
-            file.write(newWord + '\n')
+            # Append the new word to the file, under the bank's file lock so it never lands in the middle of an import by another process
+            with locked('wordBankLarge.txt'), open('wordBankLarge.txt', 'a') as file:
+                file.write(newWord + '\n')
 
         
     @staticmethod